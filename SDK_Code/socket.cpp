@@ -13,6 +13,25 @@
 
 #include "socket.hpp"
 
+// Session handshake, must match utils/protocol.py on the host
+static const char     SESSION_MAGIC[4]          = {'A', 'D', 'S', 'S'};
+static const char     FRAME_MAGIC[4]            = {'A', 'D', 'F', 'R'};
+static const uint32_t PROTOCOL_VERSION_SESSION  = 1;
+static const uint32_t PROTOCOL_VERSION_ENVELOPE = 2;
+static const uint32_t PROTOCOL_VERSION_DEVICE_ID = 3;
+static const size_t   DEVICE_ID_MAX_SIZE        = 255;
+static const size_t   ENVELOPE_HEADER_SIZE      = 32;
+static const int      SESSION_ACK_TIMEOUT_MS    = 1000;
+static const int      SESSION_RETRY_MIN_MS      = 5000;   // First retry after a failed session request
+static const int      SESSION_RETRY_MAX_MS      = 60000;  // Retries back off up to this interval
+
+static uint64_t now_ms()
+{
+    struct timeval now;
+    gettimeofday(&now, nullptr);
+    return static_cast<uint64_t>(now.tv_sec) * 1000ULL + now.tv_usec / 1000;
+}
+
 // SOCKET::SOCKET(ADAS_Config_S *m_config)
 // {
 //     m_serverIP   = m_config->HistoricalFeedModeConfig.serverIP;
@@ -25,6 +44,7 @@ SOCKET::SOCKET()
 
 SOCKET::~SOCKET()
 {
+    close_session();
 }
 
 int SOCKET::create_socket()
@@ -123,9 +143,192 @@ void SOCKET::close_socket(int sock)
     std::cout << "Connection closed.\n";
 }
 
+bool SOCKET::send_all(int sock, const void *data, size_t size)
+{
+    const char *ptr = static_cast<const char *>(data);
+    while (size > 0)
+    {
+        ssize_t sent = send(sock, ptr, size, MSG_NOSIGNAL);
+        if (sent <= 0)
+            return false;
+        ptr += sent;
+        size -= sent;
+    }
+    return true;
+}
+
+bool SOCKET::recv_all(int sock, void *data, size_t size)
+{
+    char *ptr = static_cast<char *>(data);
+    while (size > 0)
+    {
+        ssize_t received = recv(sock, ptr, size, 0);
+        if (received <= 0)
+            return false;
+        ptr += received;
+        size -= received;
+    }
+    return true;
+}
+
+bool SOCKET::open_session(const char *server_ip, int server_port)
+{
+    if (m_sessionSock >= 0 && m_sessionIP == server_ip && m_sessionPort == server_port)
+        return true;
+
+    close_session();
+
+    int sock = create_socket();
+    if (sock < 0)
+        return false;
+
+    if (!connect_to_server(sock, server_ip, server_port))
+    {
+        close(sock);
+        return false;
+    }
+
+    // Request a session and wait for the accepted version. A legacy host never answers,
+    // so the acknowledgement is bounded by a receive timeout.
+    uint32_t requested = htonl(PROTOCOL_VERSION_DEVICE_ID);
+    uint32_t accepted  = 0;
+
+    struct timeval timeout;
+    timeout.tv_sec  = SESSION_ACK_TIMEOUT_MS / 1000;
+    timeout.tv_usec = (SESSION_ACK_TIMEOUT_MS % 1000) * 1000;
+    setsockopt(sock, SOL_SOCKET, SO_RCVTIMEO, &timeout, sizeof(timeout));
+
+    if (!send_all(sock, SESSION_MAGIC, sizeof(SESSION_MAGIC)) || !send_all(sock, &requested, sizeof(requested))
+        || !recv_all(sock, &accepted, sizeof(accepted)))
+    {
+        // No answer (legacy or busy host) or I/O error: send one frame per connection for a
+        // while and ask again later, backing off while the host keeps not answering
+        m_sessionRetryDelayMs = m_sessionRetryDelayMs ? std::min(2 * m_sessionRetryDelayMs, SESSION_RETRY_MAX_MS)
+                                                      : SESSION_RETRY_MIN_MS;
+        m_sessionRetryAtMs    = now_ms() + m_sessionRetryDelayMs;
+        std::cerr << "No session answer from host, retrying in " << m_sessionRetryDelayMs / 1000 << "s.\n";
+        close(sock);
+        return false;
+    }
+
+    if (ntohl(accepted) < PROTOCOL_VERSION_SESSION)
+    {
+        std::cerr << "Session refused by host, falling back to one frame per connection.\n";
+        close(sock);
+        m_sessionRefused = true;
+        return false;
+    }
+
+    // Identify this device so one host can serve several of them
+    if (ntohl(accepted) >= PROTOCOL_VERSION_DEVICE_ID)
+    {
+        char hostname[DEVICE_ID_MAX_SIZE + 1] = {0};
+        gethostname(hostname, DEVICE_ID_MAX_SIZE);
+        uint32_t id_size     = static_cast<uint32_t>(strlen(hostname));
+        uint32_t id_size_net = htonl(id_size);
+        if (!send_all(sock, &id_size_net, sizeof(id_size_net)) || !send_all(sock, hostname, id_size))
+        {
+            std::cerr << "Error sending device id.\n";
+            close(sock);
+            return false;
+        }
+    }
+
+    m_sessionSock         = sock;
+    m_sessionVersion      = ntohl(accepted);
+    m_sessionRetryDelayMs = 0;
+    m_sessionIP           = server_ip;
+    m_sessionPort         = server_port;
+    std::cout << "Session v" << m_sessionVersion << " opened.\n";
+    return true;
+}
+
+void SOCKET::close_session()
+{
+    if (m_sessionSock >= 0)
+    {
+        close_socket(m_sessionSock);
+        m_sessionSock = -1;
+    }
+    m_sessionVersion = 0;
+}
+
+bool SOCKET::send_session_frame(int sock, const std::vector<uchar> &buffer, const char *json_log, int frame_index)
+{
+    if (m_sessionVersion >= PROTOCOL_VERSION_ENVELOPE)
+        return send_envelope_frame(sock, buffer, json_log, frame_index);
+
+    uint32_t frame_index_net = htonl(frame_index);
+    uint32_t image_size_net  = htonl(static_cast<uint32_t>(buffer.size()));
+    uint32_t log_size        = static_cast<uint32_t>(strlen(json_log));
+    uint32_t log_size_net    = htonl(log_size);
+
+    return send_all(sock, &frame_index_net, sizeof(frame_index_net))
+           && send_all(sock, &image_size_net, sizeof(image_size_net)) && send_all(sock, buffer.data(), buffer.size())
+           && send_all(sock, &log_size_net, sizeof(log_size_net)) && send_all(sock, json_log, log_size);
+}
+
+bool SOCKET::send_envelope_frame(int sock, const std::vector<uchar> &buffer, const char *json_log, int frame_index)
+{
+    // Header layout (big-endian): magic[4], version u16, flags u16, frame_index u32,
+    // timestamp_us u64, image_size u32, image_path_size u32, log_size u32
+    uint8_t  header[ENVELOPE_HEADER_SIZE];
+    uint32_t log_size = static_cast<uint32_t>(strlen(json_log));
+
+    struct timeval now;
+    gettimeofday(&now, nullptr);
+    uint64_t timestamp_us = static_cast<uint64_t>(now.tv_sec) * 1000000ULL + now.tv_usec;
+
+    uint16_t version_net    = htons(static_cast<uint16_t>(PROTOCOL_VERSION_ENVELOPE));
+    uint16_t flags_net      = 0;
+    uint32_t frame_net      = htonl(frame_index);
+    uint32_t ts_high_net    = htonl(static_cast<uint32_t>(timestamp_us >> 32));
+    uint32_t ts_low_net     = htonl(static_cast<uint32_t>(timestamp_us & 0xFFFFFFFFULL));
+    uint32_t image_size_net = htonl(static_cast<uint32_t>(buffer.size()));
+    uint32_t path_size_net  = 0;
+    uint32_t log_size_net   = htonl(log_size);
+
+    memcpy(header, FRAME_MAGIC, 4);
+    memcpy(header + 4, &version_net, 2);
+    memcpy(header + 6, &flags_net, 2);
+    memcpy(header + 8, &frame_net, 4);
+    memcpy(header + 12, &ts_high_net, 4);
+    memcpy(header + 16, &ts_low_net, 4);
+    memcpy(header + 20, &image_size_net, 4);
+    memcpy(header + 24, &path_size_net, 4);
+    memcpy(header + 28, &log_size_net, 4);
+
+    return send_all(sock, header, sizeof(header)) && send_all(sock, buffer.data(), buffer.size())
+           && send_all(sock, json_log, log_size);
+}
+
 void SOCKET::send_image_and_log_live_mode(const cv::Mat &displayImg, const char *json_log, const char *server_ip,
                                           int server_port, int frame_index)
 {
+    // Reuse one connection for every frame when the host accepts a session
+    if (!m_sessionRefused && now_ms() >= m_sessionRetryAtMs && open_session(server_ip, server_port))
+    {
+        if (displayImg.empty() || displayImg.cols == 0 || displayImg.rows == 0)
+        {
+            std::cerr << "Error: The cv::Mat image is invalid.\n";
+            return;
+        }
+
+        std::vector<uchar> buffer;
+        if (!cv::imencode(".jpg", displayImg, buffer))
+        {
+            std::cerr << "Error encoding the image.\n";
+            return;
+        }
+
+        if (!send_session_frame(m_sessionSock, buffer, json_log, frame_index))
+        {
+            std::cerr << "Error sending frame over session, reconnecting on next frame.\n";
+            close_session();
+        }
+        return;
+    }
+
     int sock = create_socket();
     if (sock < 0)
         return;
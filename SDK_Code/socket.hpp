@@ -29,7 +29,10 @@
 #include <sys/socket.h>
 #include <ifaddrs.h>
 #include <netinet/in.h>
+#include <sys/time.h>
 #include <vector>
+#include <algorithm>
+#include <cstdint>
 // OpenCV
 #ifdef SAV837
 #include <opencv2/core.hpp>
@@ -51,20 +54,34 @@ public:
     void send_image_and_log_and_frameIdx_and_imgPath(const std::string &image_path, const char *json_log,
                                                     const char *server_ip, int server_port, int frame_index);
 
+    void close_session();
+
     std::string m_serverIP;   
     int         m_serverPort;
 
 private:
     int create_socket();
     bool connect_to_server(int sock, const char *server_ip, int server_port);
+    bool open_session(const char *server_ip, int server_port);
+    bool send_all(int sock, const void *data, size_t size);
+    bool recv_all(int sock, void *data, size_t size);
     bool send_frame_index(int sock, int frame_index);
     bool send_image_size(int sock, uint32_t image_size);
     bool send_image_data(int sock, const std::vector<uchar> &buffer);
     bool send_image_path(int sock, const std::string &image_path);
     bool send_json_log_message(int sock, const char *json_log);
+    bool send_session_frame(int sock, const std::vector<uchar> &buffer, const char *json_log, int frame_index);
+    bool send_envelope_frame(int sock, const std::vector<uchar> &buffer, const char *json_log, int frame_index);
     void close_socket(int sock);
 
-    
+    // Persistent session (protocol version >= 1), see utils/protocol.py on the host
+    int         m_sessionSock     = -1;
+    uint32_t    m_sessionVersion  = 0;
+    bool        m_sessionRefused  = false;  // The host answered with a version below 1
+    uint64_t    m_sessionRetryAtMs    = 0;  // No session request before this time (after an unanswered one)
+    int         m_sessionRetryDelayMs = 0;
+    std::string m_sessionIP;
+    int         m_sessionPort     = 0;
 };
 
 #endif
\ No newline at end of file
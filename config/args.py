@@ -22,11 +22,24 @@ class Args:
 
         # Save settings
         self.save_rawimages = config['SAVE']['RAW_IMAGES']
+        self.save_raw_container = config['SAVE']['RAW_CONTAINER']
+        self.save_raw_queue_size = config['SAVE']['RAW_QUEUE_SIZE']
         self.save_airesultimage = config['SAVE']['ADAS_RESULT_IMAGE']
         self.save_rawvideo = config['SAVE']['RAW_VIDEO']
         self.save_jsonlog = config['SAVE']['JSON_LOG']
         self.save_extractframe = config['SAVE']['EXTRACT_FRAME']
         self.video_fps = config['SAVE']['VIDEO_FPS']
+        self.save_async_workers = config['SAVE']['ASYNC_WORKERS']
+        self.save_async_queue_size = config['SAVE']['ASYNC_QUEUE_SIZE']
+
+        # Annotated result video
+        self.result_video_enabled = config['RESULT_VIDEO']['ENABLED']
+        self.result_video_dir = config['RESULT_VIDEO']['DIR']
+        self.result_video_backend = config['RESULT_VIDEO']['BACKEND']
+        self.result_video_codec = config['RESULT_VIDEO']['CODEC']
+        self.result_video_fps = config['RESULT_VIDEO']['FPS']
+        self.result_video_segment_seconds = config['RESULT_VIDEO']['SEGMENT_SECONDS']
+        self.result_video_queue_size = config['RESULT_VIDEO']['QUEUE_SIZE']
 
         # Camera configuration
         self.camera_rawimages_dir = config['CAMERA']['CAMERA_RAW_IMAGE_DIR']
@@ -43,6 +56,44 @@ class Args:
         self.tftp_ip = config['SERVER']['TFTP_IP']
         self.server_ip = config['SERVER']['IP']
 
+        # Ingest configuration
+        self.ingest_backend = config['INGEST']['BACKEND']
+        self.ingest_protocol_version = config['INGEST']['PROTOCOL_VERSION']
+        self.ingest_buffer_pool_size = config['INGEST']['BUFFER_POOL_SIZE']
+        self.ingest_queue_size = config['INGEST']['QUEUE_SIZE']
+        self.ingest_overload_policy = config['INGEST']['OVERLOAD_POLICY']
+        self.ingest_log_backlog = config['INGEST']['LOG_BACKLOG']
+        self.ingest_multi_device = config['INGEST']['MULTI_DEVICE']
+        self.ingest_reorder_budget_ms = config['INGEST']['REORDER_BUDGET_MS']
+        self.ingest_reorder_max_pending = config['INGEST']['REORDER_MAX_PENDING']
+        self.ingest_session_timeout = config['INGEST']['SESSION_TIMEOUT']
+        self.ingest_loss_report_dir = config['INGEST']['LOSS_REPORT_DIR']
+        self.ingest_batch_size = config['INGEST']['BATCH_SIZE']
+
+        # Online pipeline configuration
+        self.pipeline_enabled = config['PIPELINE']['ENABLED']
+        self.pipeline_queue_size = config['PIPELINE']['QUEUE_SIZE']
+        self.pipeline_report_interval = config['PIPELINE']['REPORT_INTERVAL']
+        self.pipeline_render_processes = config['PIPELINE']['RENDER_PROCESSES']
+        self.pipeline_offline_processes = config['PIPELINE']['OFFLINE_PROCESSES']
+        self.pipeline_offline_chunksize = config['PIPELINE']['OFFLINE_CHUNK_SIZE']
+        self.pipeline_prefetch_frames = config['PIPELINE']['PREFETCH_FRAMES']
+        self.pipeline_prefetch_workers = config['PIPELINE']['PREFETCH_WORKERS']
+        self.pipeline_frame_cache_size = config['PIPELINE']['FRAME_CACHE_SIZE']
+
+        # Capture and replay configuration
+        self.capture_enabled = config['CAPTURE']['ENABLED']
+        self.capture_dir = config['CAPTURE']['DIR']
+        self.replay_file = config['REPLAY']['FILE']
+        self.replay_pacing = config['REPLAY']['PACING']
+        self.replay_speed = config['REPLAY']['SPEED']
+
+        # Latency profiling configuration
+        self.profile_enabled = config['PROFILE']['ENABLED']
+        self.profile_window = config['PROFILE']['WINDOW']
+        self.profile_report_interval = config['PROFILE']['REPORT_INTERVAL']
+        self.profile_dump_file = config['PROFILE']['DUMP_FILE']
+
         # Local configuration
         self.im_dir = config['LOCAL']['RAW_IMG_DIR']
         self.csv_file = config['LOCAL']['CSV_FILE']
@@ -60,9 +111,11 @@ class Args:
         # Image configuration
         self.image_basename = config['IMAGE']['BASE_NAME']
         self.image_format = config['IMAGE']['FORMAT']
+        self.image_index = config['IMAGE']['INDEX']
 
         # Display settings
         self.show_distanceplot = config['DISPLAY']['SHOW_DISTANCE_PLOT']
+        self.headless = config['DISPLAY']['HEADLESS']
         self.show_airesultimage = config['DISPLAY']['SHOW_AI_RESULT_IMAGE']
         self.show_detectobjs = config['DISPLAY']['SHOW_DETECT_OBJS']
         self.show_tailingobjs = config['DISPLAY']['SHOW_TAILING_OBJS']
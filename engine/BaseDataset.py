@@ -3,6 +3,7 @@ import matplotlib.pyplot as plt
 import csv
 import json
 import os
+import sys
 from PIL import Image, ImageDraw
 import logging
 import numpy as np
@@ -17,7 +18,7 @@ import pandas as pd
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 class BaseDataset:
-    def __init__(self,args):
+    def __init__(self,args, save_base_dir='runs'):
 
         # self.logging = logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
         # Input settings
@@ -60,6 +61,16 @@ class BaseDataset:
         self.show_detectobjinfo = args.show_detectobjinfo
         self.show_devicemode = args.show_devicemode
 
+        # Headless mode: no window and no display waits, plots are rendered off-screen
+        self.headless = args.headless
+        if not self.headless and self.show_airesultimage and sys.platform.startswith('linux') \
+                and not os.environ.get('DISPLAY') and not os.environ.get('WAYLAND_DISPLAY'):
+            logging.warning("⚠️ No display found, running headless")
+            self.headless = True
+        if self.headless:
+            self.show_airesultimage = False
+            plt.switch_backend('Agg')
+
         # Lane line
         self.alpha = args.alpha
         self.laneline_thickness = args.laneline_thickness
@@ -100,7 +111,7 @@ class BaseDataset:
         self.mode = args.mode
 
         # if not self.mode=='eval' and not self.mode=='evaluation' and self.save_rawimages:
-        self.img_saver = ImageSaver(args)
+        self.img_saver = ImageSaver(args, base_dir=save_base_dir)
         # else:
         #     self.img_saver = None
 
@@ -139,6 +150,7 @@ class BaseDataset:
         logging.info(f"💤 SLEEP ON ADAS           : {self.sleep_onadas}")
 
         logging.info("------------- 📺 DISPLAY SETTINGS ---------------------")
+        logging.info(f"🖥️  HEADLESS                 : {self.headless}")
         logging.info(f"📊 SHOW DISTANCE PLOT       : {self.show_distanceplot}")
         logging.info(f"🖼️  SHOW AI RESULT IMAGE    : {self.show_airesultimage}")
         logging.info(f"🔍 SHOW DETECT OBJS         : {self.show_detectobjs}")
@@ -383,12 +395,14 @@ class BaseDataset:
                 else:
                     image = cv2.resize(image, (resize_w, resize_h), interpolation=cv2.INTER_AREA)
                 # if count >= 20000:
-                self.img_saver.save_image(image,frame_num,basename=self.image_basename,save_dir=self.img_saver.save_dir,im_format='png')
+                self.img_saver.save_image(image,frame_num,basename=self.image_basename,save_dir=self.img_saver.save_dir,im_format='png',copy=False)
                 frame_num += 1
                 logging.info('save frame %d',count)
                 logging.info(f"save frame num = {frame_num}")
             success,image = vidcap.read()
             count += 1
+        # The extracted frames are read back from disk by the next steps
+        self.img_saver.flush()
 
 
     def extract_distance_data(self,csv_file):
@@ -446,7 +460,8 @@ class BaseDataset:
 
         # Release the video writer object
         video.release()
-        cv2.destroyAllWindows()
+        if not self.headless:
+            cv2.destroyAllWindows()
 
         logging.info(f"Video saved as {self.save_rawvideopath}")
 
@@ -6,6 +6,7 @@ from utils.display import DisplayUtils
 from task.visualizer_online import VisualizerOnline
 from task.visualizer_semionline import VisualizerSemiOnline
 from task.visualizer_offline import VisualizerOffline
+from task.visualizer_replay import VisualizerReplay
 
 __version__ = "0.0.1"
 
@@ -30,6 +31,8 @@ class VisualizeRunner:
             self.visualizer = VisualizerSemiOnline(connection_handler, self.config)
         elif self.config.visualize_mode == "offline":
             self.visualizer = VisualizerOffline(connection_handler, self.config)
+        elif self.config.visualize_mode == "replay":
+            self.visualizer = VisualizerReplay(connection_handler, self.config)
         else:
             raise ValueError(f"Invalid mode: {self.config.mode}")
 
@@ -1,9 +1,12 @@
 from utils.drawer import Drawer
 from utils.display import DisplayUtils
 # from utils.connection_handler import ConnectionHandler
-import numpy as np
-import cv2
+import queue
 from utils.saver import ImageSaver
+from utils.raw_writer import RawFrameWriter
+from utils.device_router import DeviceRouter
+from utils.pipeline import Stage, StagedPipeline
+from utils import latency
 from datetime import datetime
 import os
 import psutil
@@ -37,6 +40,9 @@ class Visualizer():
         # Initialize the Drawer object for visualization
         self.drawer = Drawer(config)
 
+        # Per-frame latency spans, shared with the socket receivers
+        latency.configure(config)
+
         # Initialize the DisplayUtils object for displaying messages
         self.display = DisplayUtils()
 
@@ -54,6 +60,10 @@ class Visualizer():
                 "InputMode": "-1",
                 "VisualizeMode": "2"
             },
+            "replay":  {
+                "InputMode": "-1",
+                "VisualizeMode": "2"
+            },
         }
         self.mode_dict = self.param_dict[config.visualize_mode]
 
@@ -79,6 +89,13 @@ class Visualizer():
 
         os.makedirs(self.save_raw_images_dir, exist_ok=True)
 
+        # Raw frames are archived as received, on a writer thread
+        self.raw_writer = RawFrameWriter(self.image_format, container=config.save_raw_container,
+                                         queue_size=config.save_raw_queue_size) if self.save_rawimages else None
+
+        # Route frames of several devices to per-device Drawers and output directories
+        self.device_router = DeviceRouter(config, self.save_raw_images_dir) if config.ingest_multi_device else None
+
 
     def run(self):
         """Run the visualization process.
@@ -107,9 +124,10 @@ class Visualizer():
         """
         try:
             log = data['log']
+            drawer, _ = self._route(data)
 
             # Process the JSON log
-            self.drawer.process_json_log(log, None)
+            drawer.process_json_log(log, None)
 
         except Exception as e:
             self.display.show_status(self.role, f"Receive image and log: {str(e)}", False)
@@ -124,6 +142,12 @@ class Visualizer():
             data (dict): Dictionary containing image data and JSON log.
         """
         try:
+            latency.tracker.record_frame(data)
+            if data.get('log_only'):
+                # The ingest queue dropped the image of this frame, only keep its log
+                self._receive_log_only(data)
+                return
+
             frame_index = data['frame_index']
             image = data['image']
             log = data['log']
@@ -136,21 +160,31 @@ class Visualizer():
 
             
 
-            np_arr = np.frombuffer(image, np.uint8)
-            image = cv2.imdecode(np_arr, cv2.IMREAD_COLOR)
+            drawer, raw_images_dir = self._route(data)
+
+            # Archive the received bytes before decoding, the decode is only for drawing
+            self._archive_raw(data, raw_images_dir)
+
+            with latency.tracker.span('decode'):
+                image = drawer.decode_frame(image)
+
+            # The decoded image owns its pixels, hand the receive buffer back to the pool
+            self._release_buffer(data)
 
-            if self.save_rawimages:
-                self.ImageSaver.save_image(image, frame_index,save_dir=self.save_raw_images_dir)
 
             if image is None:
                 raise ValueError("Failed to decode image from buffer.")
 
             # Process the JSON log
-            self.drawer.process_json_log(log, img_buffer=image)
+            drawer.process_json_log(log, img_buffer=image)
             # self.drawer.process_json_log(log)
+            latency.tracker.record_frame_done(data)
 
         except Exception as e:
             self.display.show_status(self.role, f"Receive image and log: {str(e)}", False)
+        finally:
+            if data:
+                self._release_buffer(data)
 
     def _receive_image_and_log_and_image_path(self, data):
         """Receive image data and JSON logs from a client connection.
@@ -162,26 +196,176 @@ class Visualizer():
             data (dict): Dictionary containing image data and JSON log.
         """
         try:
-            frame_index = data['frame_index']
+            latency.tracker.record_frame(data)
+            if data.get('log_only'):
+                # The ingest queue dropped the image of this frame, only keep its log
+                self._receive_log_only(data)
+                return
+
             image = data['image']
             image_path = data['image_path']
             log = data['log']
 
             
-            np_arr = np.frombuffer(image, np.uint8)
-            image = cv2.imdecode(np_arr, cv2.IMREAD_COLOR)
+            drawer, raw_images_dir = self._route(data)
+
+            # Archive the received bytes before decoding, the decode is only for drawing
+            self._archive_raw(data, raw_images_dir)
+
+            with latency.tracker.span('decode'):
+                image = drawer.decode_frame(image)
+
+            # The decoded image owns its pixels, hand the receive buffer back to the pool
+            self._release_buffer(data)
 
-            if self.save_rawimages:
-                self.ImageSaver.save_image(image, frame_index,save_dir=self.save_raw_images_dir)
             if image is None:
                 raise ValueError("Failed to decode image from buffer.")
 
             # Process the JSON log
             # self.drawer.process_json_log(log, image_path)
-            self.drawer.process_json_log(log, img_buffer= image, device_image_path=image_path)
+            drawer.process_json_log(log, img_buffer= image, device_image_path=image_path)
+            latency.tracker.record_frame_done(data)
 
         except Exception as e:
             self.display.show_status(self.role, f"Receive image and log: {str(e)}", False)
+        finally:
+            if data:
+                self._release_buffer(data)
+
+    def _receive_log_only(self, data):
+        """Save the JSON log of a frame whose image was dropped by the ingest queue.
+
+        Args:
+            data (dict): Dictionary containing the JSON log.
+        """
+        drawer, _ = self._route(data)
+        if drawer.save_jsonlog:
+            drawer.save_json_log(data['log'], device_image_path=data.get('image_path'))
+        latency.tracker.record_frame_done(data)
+
+    # ===== Staged pipeline =====
+
+    def _build_pipeline(self):
+        """Build the decode -> draw -> save pipeline used by the online visualizer.
+
+        Drawn frames go to the result writer and to the returned display queue, which the
+        main thread consumes because OpenCV windows must stay on the main thread.
+
+        Returns:
+            tuple: The pipeline (StagedPipeline) and the display queue (queue.Queue).
+        """
+        queue_size = self.config.pipeline_queue_size
+
+        decode = Stage('decode', self._decode_stage, queue_size)
+        draw = Stage('draw', self._draw_stage, queue_size)
+        save = Stage('save', self._save_stage, queue_size)
+        display_queue = queue.Queue(maxsize=queue_size)
+
+        decode.connect(draw)
+        draw.connect(display_queue)
+        draw.connect(save)
+        return StagedPipeline([decode, draw, save]), display_queue
+
+    def _decode_stage(self, data):
+        """Archive and decode the image of a received frame and pick the Drawer of its device.
+
+        Args:
+            data (dict): Dictionary containing image data and JSON log.
+
+        Returns:
+            dict: The frame: received data, decoded image (None for log-only frames),
+                Drawer and raw image directory.
+        """
+        latency.tracker.record_frame(data)
+        drawer, raw_images_dir = self._route(data)
+        frame = {'data': data, 'image': None, 'drawer': drawer, 'raw_images_dir': raw_images_dir, 'result': None}
+        if data.get('log_only'):
+            return frame
+
+        try:
+            self._archive_raw(data, raw_images_dir)
+            with latency.tracker.span('decode'):
+                frame['image'] = drawer.decode_frame(data['image'])
+        finally:
+            self._release_buffer(data)
+
+        if frame['image'] is None:
+            raise ValueError("Failed to decode image from buffer.")
+        return frame
+
+    def _draw_stage(self, frame):
+        """Draw the AI results of a frame onto its image.
+
+        Args:
+            frame (dict): A frame returned by the decode stage.
+
+        Returns:
+            dict: The frame with the rendered result (None for log-only frames).
+        """
+        if frame['image'] is not None:
+            frame['result'] = frame['drawer'].render_json_log(frame['data']['log'], img_buffer=frame['image'],
+                                                              device_image_path=frame['data'].get('image_path'))
+        return frame
+
+    def _save_stage(self, frame):
+        """Save the rendered image and the JSON log of a frame."""
+        data = frame['data']
+        drawer = frame['drawer']
+        if frame['result'] is not None:
+            drawer.save_result(frame['result'], data['log'], data.get('image_path'))
+        elif drawer.save_jsonlog:
+            drawer.save_json_log(data['log'], device_image_path=data.get('image_path'))
+        latency.tracker.record_frame_done(data)
+
+    def _display_frame(self, frame):
+        """Display a rendered frame. Must run on the main thread."""
+        if frame['result'] is not None and frame['drawer'].show_airesultimage:
+            frame['drawer'].show_result(frame['result'])
+
+    def _route(self, data):
+        """Get the Drawer and raw image directory for the device that sent a frame.
+
+        Args:
+            data (dict): Dictionary containing the received data, tagged with 'device_id'.
+
+        Returns:
+            tuple: The Drawer (Drawer) and the raw image directory (str).
+        """
+        if self.device_router is None:
+            return self.drawer, self.save_raw_images_dir
+        pipeline = self.device_router.get(data.get('device_id'))
+        return pipeline.drawer, pipeline.raw_images_dir
+
+    def close_outputs(self):
+        """Finish the background outputs: raw frames and the saved images and result videos of every Drawer."""
+        if self.raw_writer is not None:
+            self.raw_writer.close()
+        self.ImageSaver.close()
+        self.drawer.close()
+        if self.device_router is not None:
+            self.device_router.close()
+
+    def _archive_raw(self, data, raw_images_dir):
+        """Queue the received image bytes of a frame for the raw frame writer, if raw images are saved.
+
+        Args:
+            data (dict): Dictionary containing image data and JSON log.
+            raw_images_dir (str): The raw image directory of the device.
+        """
+        if self.raw_writer is not None:
+            with latency.tracker.span('save_image'):
+                self.raw_writer.write(data['image'], data['frame_index'], raw_images_dir)
+
+    def _release_buffer(self, data):
+        """Return the pooled receive buffer of a frame, if it has one.
+
+        Args:
+            data (dict): Dictionary containing image data and JSON log.
+        """
+        buffer = data.get('buffer')
+        if buffer is not None:
+            buffer.release()
+            data['buffer'] = None
 
     def check_local_port_in_use(self,port):
         """
@@ -112,19 +112,26 @@ class VisualizerOffline(Visualizer):
             return set()
 
     def _is_image_match_log(self):
-        """Check if the number of image files matches the number of log entries.
+        """Check if the image files match the log entries.
+
+        With the dataset index, the frame IDs of the images and of the log are compared and
+        the missing and orphan frames are reported; otherwise only their numbers are compared.
 
         Returns:
-            bool: True if the numbers match, False otherwise.
+            bool: True if they match, False otherwise.
         """
+        # Get the set of frame_IDs from the log file
+        self.log_frame_id_set = self._get_log_frame_id_set()
+
+        dataset_index = self.drawer.index_dataset()
+        if dataset_index is not None:
+            return self._is_index_match_log(dataset_index)
+
         is_match = True
 
         # Get the number of image files
         image_file_num = len(self._get_image_file_list())
 
-        # Get the set of frame_IDs from the log file
-        self.log_frame_id_set = self._get_log_frame_id_set()
-
         # Get the number of log entries
         log_num = len(self.log_frame_id_set)
 
@@ -138,6 +145,29 @@ class VisualizerOffline(Visualizer):
 
         return is_match
 
+    def _is_index_match_log(self, dataset_index):
+        """Report the log frames without an image and the images without a log entry.
+
+        Args:
+            dataset_index (DatasetIndex): The index of the image directory.
+
+        Returns:
+            bool: True if every log frame has an image and every image a log entry, False otherwise.
+        """
+        missing, orphans = dataset_index.compare(self.log_frame_id_set)
+        if not missing and not orphans:
+            return True
+
+        self.display.show_warning(self.role, "Image files do not match the log")
+        print(f"Image number: \t {len(dataset_index)}")
+        print(f"Log number: \t {len(self.log_frame_id_set)}")
+        if missing:
+            print(f"Missing images: \t {len(missing)} (first: {', '.join(missing[:10])})")
+        if orphans:
+            print(f"Orphan images: \t {len(orphans)} (first: {', '.join(orphans[:10])})")
+        print()
+        return False
+
     def _setup_visualizer(self):
         """Set up the visualizer by checking if image files match log entries.
 
@@ -2,10 +2,15 @@ import os
 import sys
 import time
 import signal
+import queue
+import threading
 # from visualize_tools.visualizer import Visualizer
 from task.visualizer import Visualizer
 from utils.adas_runner import AdasRunner
 from utils.socket import RemoteSocket
+from utils.pipeline import StagedPipeline
+from utils.render_pool import RenderPool
+from utils import latency
 import logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s', encoding='utf-8')
 
@@ -113,10 +118,8 @@ class VisualizerOnline(Visualizer):
                 recv_data_keys = ["log"]
 
         
-            self.connect.remote_socket = RemoteSocket(
-                server_ip=self.connect.server_ip,
-                server_port=self.connect.server_port,
-                recv_data_keys=recv_data_keys)
+            self.connect.remote_socket = self.connect.create_remote_socket(
+                self.connect.server_port, recv_data_keys)
 
         # Modify remote config
         input_mode = '0' if self.config.device_mode == 'live' else '2'
@@ -153,12 +156,20 @@ class VisualizerOnline(Visualizer):
         #         self.display.print_progress(f"🔌 Socket server is listening for Go-Focus...")
         #     print('\n')
         try:
-            # Continuously receive and process data while the server is running
-            while self.connect.server_is_running() and not self.stop:
-                if self.config.device_mode == 'live':
-                    self._receive_image_and_log(self.connect.get_data())
-                else:
-                    self._receive_image_and_log_and_image_path(self.connect.get_data())
+            if self.config.pipeline_render_processes > 0:
+                # Decode and draw in worker processes, display and save on this thread
+                self._run_render_pool()
+            elif self.config.pipeline_enabled:
+                # Decode, draw and save on worker threads, display on this thread
+                self._run_pipeline()
+            else:
+                # Continuously receive and process data while the server is running,
+                # handling every frame already queued on each wakeup
+                handler = self._receive_image_and_log if self.config.device_mode == 'live' \
+                    else self._receive_image_and_log_and_image_path
+                while self.connect.server_is_running() and not self.stop:
+                    for data in self.connect.get_data_batch(self.config.ingest_batch_size, timeout=0.5):
+                        handler(data)
         except Exception as e:
             self.display.show_status(self.role, f"Data reception: {str(e)}", False)
         # finally:
@@ -173,8 +184,122 @@ class VisualizerOnline(Visualizer):
 
         # Stop the server
         self.connect.stop_server()
+        self.close_outputs()
+        latency.tracker.report()
         return True
 
+    def _run_pipeline(self):
+        """Receive and process data through the staged pipeline until the server stops.
+
+        A feeder thread moves received frames into the pipeline while the main thread
+        displays the drawn frames and periodically reports the stage occupancy.
+        """
+        pipeline, display_queue = self._build_pipeline()
+        pipeline.start()
+
+        feeder = threading.Thread(target=self._feed_pipeline, args=(pipeline,), daemon=True)
+        feeder.start()
+
+        report_interval = self.config.pipeline_report_interval
+        last_report = time.time()
+        while True:
+            try:
+                frame = display_queue.get(timeout=0.5)
+            except queue.Empty:
+                frame = None
+
+            if StagedPipeline.is_stop(frame):
+                break
+            if frame is not None:
+                self._display_frame(frame)
+
+            if report_interval and time.time() - last_report >= report_interval:
+                pipeline.log_occupancy()
+                last_report = time.time()
+
+        pipeline.join()
+        feeder.join()
+        pipeline.log_occupancy()
+
+    def _feed_pipeline(self, pipeline):
+        """Move received data into the pipeline, then close it once the server stops.
+
+        Args:
+            pipeline (StagedPipeline): The pipeline to feed.
+        """
+        try:
+            while self.connect.server_is_running() and not self.stop:
+                data = self.connect.get_data(timeout=0.5)
+                if data is not None:
+                    pipeline.put(data)
+        finally:
+            pipeline.close()
+
+    def _run_render_pool(self):
+        """Receive and process data with a process pool until the server stops.
+
+        A feeder thread submits received frames to the RenderPool; the main thread takes
+        the rendered frames back in order, displays and saves them and frees their slot.
+        """
+        pool = RenderPool(self.config, self.config.pipeline_render_processes)
+        pool.start()
+
+        feeder_done = threading.Event()
+        feeder = threading.Thread(target=self._feed_render_pool, args=(pool, feeder_done), daemon=True)
+        feeder.start()
+
+        frames = 0
+        try:
+            while not (feeder_done.is_set() and pool.pending() == 0):
+                frame = pool.get(timeout=0.5)
+                if frame is None:
+                    continue
+                try:
+                    self._show_and_save(frame)
+                    frames += 1
+                finally:
+                    pool.release(frame)
+        finally:
+            feeder.join()
+            pool.close()
+            logging.info(f"🧩 Render pool processed {frames} frames")
+
+    def _feed_render_pool(self, pool, done):
+        """Submit received data to the render pool until the server stops.
+
+        Args:
+            pool (RenderPool): The pool to feed.
+            done (threading.Event): Set once no more frames will be submitted.
+        """
+        try:
+            while self.connect.server_is_running() and not self.stop:
+                data = self.connect.get_data(timeout=0.5)
+                if data is not None:
+                    latency.tracker.record_frame(data)
+                    if not data.get('log_only'):
+                        _, raw_images_dir = self._route(data)
+                        self._archive_raw(data, raw_images_dir)
+                    pool.submit(data)
+        finally:
+            done.set()
+
+    def _show_and_save(self, frame):
+        """Display and save a frame rendered by the render pool.
+
+        Args:
+            frame (dict): A frame returned by RenderPool.get().
+        """
+        data = frame['data']
+        drawer, _ = self._route(data)
+        if frame['result'] is None:
+            if drawer.save_jsonlog:
+                drawer.save_json_log(data['log'], device_image_path=data.get('image_path'))
+        else:
+            if drawer.show_airesultimage:
+                drawer.show_result(frame['result'])
+            drawer.save_result(frame['result'], data['log'], data.get('image_path'))
+        latency.tracker.record_frame_done(data)
+
     def _select_remote_image_folder(self):
         """
         Select a folder to download from the remote path.
@@ -0,0 +1,83 @@
+import os
+import time
+import signal
+from task.visualizer import Visualizer
+from utils.capture import CaptureReplaySource
+from utils import latency
+import logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s', encoding='utf-8')
+
+class VisualizerReplay(Visualizer):
+    def __init__(self, connection, config):
+        """Initialize the VisualizerReplay.
+
+        Args:
+            config: Configuration object containing necessary parameters.
+        """
+        # Initialize the parent Visualizer class
+        super().__init__(connection, config)
+
+        # Capture file and pacing
+        self.replay_file = config.replay_file
+        self.replay_pacing = config.replay_pacing
+        self.replay_speed = config.replay_speed
+
+        # Signal handling
+        self.stop = False
+        signal.signal(signal.SIGINT, self._signal_handler)  # Register SIGINT handler
+
+    def run(self):
+        """Run the VisualizerReplay.
+
+        Feeds every frame of a capture file through the same handlers as the online
+        visualizer, either as fast as possible or with the recorded pacing.
+
+        Returns:
+            bool: True if the process completes successfully, False otherwise.
+        """
+        self.display.print_header("Starting replay execution...")
+
+        if not self.replay_file or not os.path.exists(self.replay_file):
+            self.display.show_status(self.role, f"Capture file not found: {self.replay_file}", False)
+            return False
+
+        try:
+            source = CaptureReplaySource(self.replay_file, pacing=self.replay_pacing, speed=self.replay_speed)
+        except ValueError as e:
+            self.display.show_status(self.role, str(e), False)
+            return False
+
+        logging.info(f"▶️ Replaying {len(source.reader)} frames from {self.replay_file} ({self.replay_pacing} pacing)")
+        start = time.perf_counter()
+        frames = 0
+        try:
+            while source.is_running() and not self.stop:
+                data = source.get_data()
+                # Latency spans measure the replay, not the recorded session
+                data['recv_timestamp_us'] = int(time.time() * 1e6)
+                data['device_timestamp_us'] = 0
+                if data['image'] is None:
+                    self._receive_log(data)
+                elif 'image_path' in data:
+                    self._receive_image_and_log_and_image_path(data)
+                else:
+                    self._receive_image_and_log(data)
+                frames += 1
+        finally:
+            source.close()
+            self.close_outputs()
+
+        elapsed = time.perf_counter() - start
+        latency.tracker.report()
+        logging.info(f"🏁 Replayed {frames} frames in {elapsed:.2f}s ({frames / max(elapsed, 1e-9):.1f} fps)")
+        return True
+
+    def _signal_handler(self, signum, frame):
+        """Handle interrupt signals to stop the replay.
+
+        Args:
+            signum (int): The signal number.
+            frame (frame): The current stack frame.
+        """
+        print("\nReceived interrupt signal. Stopping replay...")
+        self.stop = True
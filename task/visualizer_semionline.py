@@ -69,15 +69,15 @@ class VisualizerSemiOnline(Visualizer):
         # Start the server to receive data
         self.connect.start_server()
 
-        # Wait for the server to be ready
-        while not self.connect.server_is_ready():
+        # Wait for the first frame, refreshing the progress message twice a second
+        while not self.connect.server_wait_ready(timeout=0.5) and self.connect.server_is_running():
             self.display.print_progress(f"🔌 Socket server is listening for Go-Focus...")
         print('\n')
 
         try:
-            # Continuously receive and process data while the server is running
-            while self.connect.server_is_running():
-                self._receive_log(self.connect.get_data())
+            # Receive and process data until the server stops
+            for data in self.connect.iter_data():
+                self._receive_log(data)
         except Exception as e:
             self.display.show_message(self.role, f"Data reception: {str(e)}", False)
         finally:
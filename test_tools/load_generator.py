@@ -0,0 +1,467 @@
+import os
+import sys
+import glob
+import json
+import time
+import socket
+import logging
+import argparse
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.protocol import (
+    PROTOCOL_VERSION_LEGACY,
+    PROTOCOL_VERSION_SESSION,
+    PROTOCOL_VERSION_ENVELOPE,
+    PROTOCOL_VERSION_DEVICE_ID,
+    PROTOCOL_VERSION_MAX,
+    pack_uint32,
+    unpack_uint32,
+    build_session_request,
+    build_device_id,
+    pack_envelope_header,
+)
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s', encoding='utf-8')
+
+# Emulates one or more LI80 cameras (SDK_Code/socket.cpp) so the ingest path can be
+# benchmarked without hardware:
+#
+#   python test_tools/load_generator.py --mode live --fps 30 --concurrency 4 --frames 600 --serve
+#
+# Modes follow the device modes of the receivers:
+#   live       : frame_index, image size, image, JSON log
+#   historical : frame_index, image size, image, image path size, image path, JSON log
+#   log        : JSON log only
+#
+# --protocol 0 opens one connection per frame (legacy devices); 1 to 3 open one session
+# per camera and reuse it for every frame. With --serve a RemoteSocket (or an
+# AsyncRemoteSocket with --backend asyncio) is started in-process and the end-to-end
+# latency, from the first byte sent to the frame leaving get_data(), is measured.
+
+MODE_KEYS = {
+    'live': ["frame_index", "image", "log"],
+    'historical': ["frame_index", "image", "image_path", "log"],
+    'log': ["log"],
+}
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+
+
+def percentiles(values, points=(50, 95, 99)):
+    """Compute nearest-rank percentiles.
+
+    Args:
+        values (list): The samples.
+        points (tuple, optional): The percentiles to compute. Defaults to (50, 95, 99).
+
+    Returns:
+        dict: 'p50', 'p95'... to value, empty if there are no samples.
+    """
+    if not values:
+        return {}
+    ordered = sorted(values)
+    return {f"p{p}": ordered[min(len(ordered) - 1, max(0, int(round(p / 100 * len(ordered))) - 1))] for p in points}
+
+
+class FrameSource:
+    def __init__(self, image_dir=None, log_file=None, image_size=100_000, resolution=None):
+        """Frames to send: a directory of images with a JSON log, or synthetic frames.
+
+        Args:
+            image_dir (str, optional): Directory of JPEG/PNG frames, sent in name order. Defaults to None.
+            log_file (str, optional): Camera CSV log or one JSON object per line; the text after
+                'json:' is used when present. Defaults to None (synthetic logs).
+            image_size (int, optional): Size of the synthetic image payload in bytes. Defaults to 100000.
+            resolution (tuple, optional): (width, height) of synthetic frames encoded as real
+                JPEGs with OpenCV, so the receivers can decode them. Defaults to None.
+        """
+        self.images = []
+        self.paths = []
+        self.logs = []
+
+        if image_dir:
+            self.paths = sorted(p for p in glob.glob(os.path.join(image_dir, '*'))
+                                if p.lower().endswith(IMAGE_EXTENSIONS))
+            for path in self.paths:
+                with open(path, 'rb') as f:
+                    self.images.append(f.read())
+            if not self.images:
+                raise ValueError(f"No images found in {image_dir}")
+        else:
+            self.images = [self._synthetic_image(image_size, resolution)]
+            self.paths = ['/emulator/synthetic.jpg']
+
+        if log_file:
+            with open(log_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    start = line.find('json:')
+                    line = line[start + len('json:'):] if start != -1 else line
+                    line = line.strip()
+                    if line.startswith('{'):
+                        self.logs.append(line)
+            if not self.logs:
+                raise ValueError(f"No JSON log found in {log_file}")
+
+    def frame(self, n, frame_index):
+        """Get the payloads of the n-th frame sent.
+
+        Args:
+            n (int): Frame counter of the sender, wraps around the source.
+            frame_index (int): The frame index put on the wire.
+
+        Returns:
+            tuple: (image bytes, image path bytes, JSON log bytes).
+        """
+        image = self.images[n % len(self.images)]
+        image_path = self.paths[n % len(self.paths)].encode('utf-8')
+        if self.logs:
+            log = self.logs[n % len(self.logs)]
+        else:
+            log = json.dumps({"frame_ID": {str(frame_index): {
+                "detectObj": {}, "tailingObj": [], "vanishLineY": [], "ADAS": [], "LaneInfo": []}}})
+        return image, image_path, log.encode('utf-8')
+
+    @staticmethod
+    def _synthetic_image(image_size, resolution):
+        if resolution is not None:
+            import cv2
+            import numpy as np
+            width, height = resolution
+            gradient = np.linspace(0, 255, width, dtype=np.uint8)
+            image = np.dstack([np.tile(gradient, (height, 1))] * 3)
+            ok, encoded = cv2.imencode('.jpg', image)
+            if not ok:
+                raise ValueError(f"Failed to encode a {width}x{height} synthetic frame")
+            return encoded.tobytes()
+        # JPEG markers around a random body: enough for the ingest path, not decodable
+        body = os.urandom(max(0, image_size - 4))
+        return b'\xff\xd8' + body + b'\xff\xd9'
+
+
+class CameraEmulator:
+    def __init__(self, name, server_ip, server_port, source, mode='live', protocol_version=PROTOCOL_VERSION_MAX,
+                 fps=0.0, frames=100, frame_index_base=0, on_send=None):
+        """One emulated camera sending frames like module_adas.cpp.
+
+        Args:
+            name (str): The device id sent with protocol version 3.
+            server_ip (str): The receiver address.
+            server_port (int): The receiver port.
+            source (FrameSource): The frames to send.
+            mode (str, optional): 'live', 'historical' or 'log'. Defaults to 'live'.
+            protocol_version (int, optional): The highest protocol version to request, 0 for one
+                connection per frame. Defaults to PROTOCOL_VERSION_MAX.
+            fps (float, optional): Frame rate of this camera, 0 to send as fast as possible. Defaults to 0.0.
+            frames (int, optional): Number of frames to send. Defaults to 100.
+            frame_index_base (int, optional): First frame index, keeps indexes unique across
+                cameras. Defaults to 0.
+            on_send (callable, optional): Called with (frame_index, device timestamp in us)
+                before each frame is sent. Defaults to None.
+        """
+        self.name = name
+        self.server = (server_ip, server_port)
+        self.source = source
+        self.mode = mode
+        self.protocol_version = protocol_version
+        self.interval = 1.0 / fps if fps > 0 else 0.0
+        self.frames = frames
+        self.frame_index_base = frame_index_base
+        self.on_send = on_send
+        self.stop = False
+
+        # Statistics
+        self.sent = 0
+        self.failed = 0
+        self.bytes_sent = 0
+        self.connections = 0
+        self.send_times_ms = []
+        self.negotiated_version = None
+
+    def run(self):
+        """Send every frame, pacing them at the configured frame rate."""
+        session = None
+        start = time.perf_counter()
+        for n in range(self.frames):
+            if self.stop:
+                break
+            if self.interval:
+                delay = start + n * self.interval - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+
+            try:
+                if self.protocol_version >= PROTOCOL_VERSION_SESSION and session is None:
+                    session = self._open_session()
+
+                if session is not None:
+                    self._send_frame(session, n, self.negotiated_version)
+                else:
+                    # Legacy device, or the host refused the session
+                    with self._connect() as sock:
+                        self._send_frame(sock, n, PROTOCOL_VERSION_LEGACY)
+                        sock.shutdown(socket.SHUT_WR)
+            except OSError as e:
+                self.failed += 1
+                logging.error(f"🔴 {self.name}: frame {n} not sent: {e}")
+                if session is not None:
+                    session.close()
+                    session = None  # Reconnect on next frame, like the device
+        if session is not None:
+            session.close()
+
+    def _connect(self):
+        sock = socket.create_connection(self.server, timeout=10)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.connections += 1
+        return sock
+
+    def _open_session(self):
+        """Open a session and negotiate the protocol version.
+
+        Returns:
+            socket.socket: The session socket, or None if the host only accepts legacy frames.
+        """
+        sock = self._connect()
+        sock.sendall(build_session_request(self.protocol_version))
+        answer = b''
+        while len(answer) < 4:
+            chunk = sock.recv(4 - len(answer))
+            if not chunk:
+                sock.close()
+                raise ConnectionError("Session handshake closed by the host")
+            answer += chunk
+        version = unpack_uint32(answer)
+        if self.negotiated_version != version:
+            logging.info(f"🔗 {self.name}: session v{version} (requested v{self.protocol_version})")
+        self.negotiated_version = version
+        if version < PROTOCOL_VERSION_SESSION:
+            sock.close()
+            self.protocol_version = PROTOCOL_VERSION_LEGACY  # Do not ask again
+            return None
+        if version >= PROTOCOL_VERSION_DEVICE_ID:
+            sock.sendall(build_device_id(self.name))
+        return sock
+
+    def _send_frame(self, sock, n, version):
+        frame_index = self.frame_index_base + n
+        image, image_path, log = self.source.frame(n, frame_index)
+        timestamp_us = int(time.time() * 1e6)
+        if self.on_send:
+            self.on_send(frame_index, timestamp_us)
+
+        parts = self._encode_frame(frame_index, image, image_path, log, timestamp_us, version)
+        start = time.perf_counter()
+        for part in parts:
+            sock.sendall(part)
+        self.send_times_ms.append(1000 * (time.perf_counter() - start))
+        self.sent += 1
+        self.bytes_sent += sum(len(part) for part in parts)
+
+    def _encode_frame(self, frame_index, image, image_path, log, timestamp_us, version):
+        """Lay a frame out in the wire format of the mode and protocol version.
+
+        Returns:
+            list: The byte strings to send in order.
+        """
+        if version >= PROTOCOL_VERSION_ENVELOPE:
+            if self.mode == 'log':
+                image, image_path = b'', b''
+            elif self.mode == 'live':
+                image_path = b''
+            header = pack_envelope_header(frame_index, len(image), len(image_path), len(log), timestamp_us)
+            return [header, image, image_path, log]
+
+        if version == PROTOCOL_VERSION_SESSION:
+            if self.mode == 'log':
+                return [pack_uint32(len(log)), log]
+            parts = [pack_uint32(frame_index), pack_uint32(len(image)), image]
+            if self.mode == 'historical':
+                parts += [pack_uint32(len(image_path)), image_path]
+            return parts + [pack_uint32(len(log)), log]
+
+        # Legacy: the JSON log runs until the connection is closed
+        if self.mode == 'log':
+            return [log]
+        parts = [pack_uint32(frame_index), pack_uint32(len(image)), image]
+        if self.mode == 'historical':
+            parts += [pack_uint32(len(image_path)), image_path]
+        return parts + [log]
+
+
+class LoadGenerator:
+    def __init__(self, server_ip, server_port, source, mode='live', protocol_version=PROTOCOL_VERSION_MAX,
+                 fps=0.0, frames=100, concurrency=1, serve=False, backend='thread', queue_size=0):
+        """Drive several emulated cameras against a receiver and report the results.
+
+        Args:
+            server_ip (str): The receiver address.
+            server_port (int): The receiver port.
+            source (FrameSource): The frames to send.
+            mode (str, optional): 'live', 'historical' or 'log'. Defaults to 'live'.
+            protocol_version (int, optional): The highest protocol version to request. Defaults to PROTOCOL_VERSION_MAX.
+            fps (float, optional): Frame rate of each camera, 0 for unpaced. Defaults to 0.0.
+            frames (int, optional): Frames sent by each camera. Defaults to 100.
+            concurrency (int, optional): Number of cameras sending at once. Defaults to 1.
+            serve (bool, optional): Start the receiver in-process and measure end-to-end latency. Defaults to False.
+            backend (str, optional): Receiver used with serve, 'thread' or 'asyncio'. Defaults to 'thread'.
+            queue_size (int, optional): Ingest queue size of the in-process receiver. Defaults to 0.
+        """
+        self.server_ip = server_ip
+        self.server_port = server_port
+        self.serve = serve
+        self.backend = backend
+        self.mode = mode
+        self.queue_size = queue_size
+
+        # Send timestamps of the frames not received yet, keyed by frame index
+        self.lock = threading.Lock()
+        self.sent_at = {}
+        self.latencies_ms = []
+        self.received = 0
+
+        self.cameras = [
+            CameraEmulator(f"emulator-{k}", server_ip, server_port, source, mode=mode,
+                           protocol_version=protocol_version, fps=fps, frames=frames,
+                           frame_index_base=k * frames, on_send=self._on_send if serve else None)
+            for k in range(concurrency)
+        ]
+        self.total_frames = concurrency * frames
+
+    def run(self):
+        """Send every frame and wait for the receiver to get them.
+
+        Returns:
+            dict: The report (see report()).
+        """
+        receiver = self._start_receiver() if self.serve else None
+        consumer = None
+        if receiver is not None:
+            consumer = threading.Thread(target=self._consume, args=(receiver,), daemon=True)
+            consumer.start()
+
+        threads = [threading.Thread(target=camera.run, name=camera.name, daemon=True) for camera in self.cameras]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        send_elapsed = time.perf_counter() - start
+
+        if consumer is not None:
+            expected = sum(camera.sent for camera in self.cameras)
+            deadline = time.perf_counter() + 10
+            while self.received < expected and time.perf_counter() < deadline:
+                time.sleep(0.01)
+        elapsed = time.perf_counter() - start
+        if consumer is not None:
+            receiver.stop_server()
+            consumer.join(timeout=2)
+        return self.report(send_elapsed, elapsed)
+
+    def report(self, send_elapsed, elapsed):
+        """Summarize the run.
+
+        Args:
+            send_elapsed (float): Seconds until the last frame was sent.
+            elapsed (float): Seconds until the last frame was received (or sent without serve).
+
+        Returns:
+            dict: Frames and bytes sent, throughput, send time and end-to-end latency percentiles.
+        """
+        sent = sum(camera.sent for camera in self.cameras)
+        bytes_sent = sum(camera.bytes_sent for camera in self.cameras)
+        send_times = [t for camera in self.cameras for t in camera.send_times_ms]
+        report = {
+            'frames_sent': sent,
+            'frames_failed': sum(camera.failed for camera in self.cameras),
+            'connections': sum(camera.connections for camera in self.cameras),
+            'protocol_version': self.cameras[0].negotiated_version or PROTOCOL_VERSION_LEGACY,
+            'send_fps': round(sent / max(send_elapsed, 1e-9), 1),
+            'send_mbps': round(8 * bytes_sent / 1e6 / max(send_elapsed, 1e-9), 1),
+            'send_ms': {k: round(v, 3) for k, v in percentiles(send_times).items()},
+        }
+        if self.serve:
+            report['frames_received'] = self.received
+            report['recv_fps'] = round(self.received / max(elapsed, 1e-9), 1)
+            report['latency_ms'] = {k: round(v, 3) for k, v in percentiles(self.latencies_ms).items()}
+        return report
+
+    def _on_send(self, frame_index, timestamp_us):
+        with self.lock:
+            self.sent_at[frame_index] = timestamp_us
+
+    def _start_receiver(self):
+        if self.backend == 'asyncio':
+            from utils.async_socket import AsyncRemoteSocket as Receiver
+        else:
+            from utils.socket import RemoteSocket as Receiver
+        receiver = Receiver(server_ip=self.server_ip, server_port=self.server_port,
+                            recv_data_keys=MODE_KEYS[self.mode], queue_size=self.queue_size)
+        receiver.start_server()
+        return receiver
+
+    def _consume(self, receiver):
+        """Take frames off the receiver and match them with their send time."""
+        while receiver.is_running() or self.received < self.total_frames:
+            data = receiver.get_data(timeout=0.1)
+            if data is None:
+                if not receiver.is_running():
+                    break
+                continue
+            now_us = int(time.time() * 1e6)
+            sent_us = data.get('device_timestamp_us')
+            with self.lock:
+                if data.get('frame_index') is not None:
+                    sent_us = self.sent_at.pop(data['frame_index'], sent_us)
+                if sent_us:
+                    self.latencies_ms.append((now_us - sent_us) / 1000)
+                self.received += 1
+            receiver.release_data(data)
+
+
+def parse_resolution(value):
+    """Parse a WIDTHxHEIGHT argument.
+
+    Args:
+        value (str): The argument, e.g. '1280x720'.
+
+    Returns:
+        tuple: (width, height).
+    """
+    width, height = value.lower().split('x')
+    return int(width), int(height)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Emulate LI80 cameras and benchmark the ingest socket server.")
+    parser.add_argument('--ip', default='127.0.0.1', help="Receiver address.")
+    parser.add_argument('--port', type=int, default=5000, help="Receiver port.")
+    parser.add_argument('--mode', choices=sorted(MODE_KEYS), default='live', help="Device mode / wire format.")
+    parser.add_argument('--protocol', type=int, default=PROTOCOL_VERSION_MAX, choices=range(PROTOCOL_VERSION_MAX + 1),
+                        help="Highest protocol version to request, 0 for one connection per frame.")
+    parser.add_argument('--fps', type=float, default=0.0, help="Frame rate per camera, 0 for unpaced.")
+    parser.add_argument('--frames', type=int, default=100, help="Frames sent by each camera.")
+    parser.add_argument('--concurrency', type=int, default=1, help="Number of cameras sending at once.")
+    parser.add_argument('--image-dir', help="Directory of frames to replay instead of synthetic frames.")
+    parser.add_argument('--log-file', help="Camera CSV log or JSON lines to send with the frames.")
+    parser.add_argument('--image-size', type=int, default=100_000, help="Synthetic image payload size in bytes.")
+    parser.add_argument('--resolution', type=parse_resolution,
+                        help="Encode synthetic frames as WIDTHxHEIGHT JPEGs (needs OpenCV).")
+    parser.add_argument('--serve', action='store_true', help="Run the receiver in-process and measure latency.")
+    parser.add_argument('--backend', choices=['thread', 'asyncio'], default='thread', help="Receiver used with --serve.")
+    parser.add_argument('--queue-size', type=int, default=0, help="Ingest queue size of the in-process receiver.")
+    args = parser.parse_args()
+
+    source = FrameSource(args.image_dir, args.log_file, args.image_size, args.resolution)
+    generator = LoadGenerator(args.ip, args.port, source, mode=args.mode, protocol_version=args.protocol,
+                              fps=args.fps, frames=args.frames, concurrency=args.concurrency,
+                              serve=args.serve, backend=args.backend, queue_size=args.queue_size)
+    report = generator.run()
+    logging.info(f"📊 Load generator report: {json.dumps(report)}")
+    return 0 if report['frames_failed'] == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
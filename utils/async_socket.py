@@ -0,0 +1,545 @@
+import asyncio
+import logging
+import queue
+import signal
+import struct
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from utils.protocol import (
+    SESSION_MAGIC,
+    PROTOCOL_VERSION_SESSION,
+    PROTOCOL_VERSION_ENVELOPE,
+    PROTOCOL_VERSION_DEVICE_ID,
+    PROTOCOL_VERSION_MAX,
+    DEVICE_ID_MAX_SIZE,
+    ENVELOPE_HEADER,
+    pack_uint32,
+    unpack_uint32,
+    negotiate_version,
+    unpack_envelope_header,
+    find_json_log_terminator,
+)
+from utils.ingest_queue import IngestQueue
+from utils.capture import CaptureWriter
+from utils.reorder_buffer import ReorderBuffer
+from utils import latency
+
+
+class AsyncRemoteSocket:
+    def __init__(self, server_ip, server_port, recv_data_keys, max_protocol_version=PROTOCOL_VERSION_MAX,
+                 queue_size=0, overload_policy='block', log_backlog=1024, capture_path=None,
+                 reorder_budget_ms=0, reorder_max_pending=32, loss_report_path=None, session_timeout=60):
+        """Initialize the AsyncRemoteSocket instance.
+
+        Drop-in alternative to RemoteSocket: an asyncio server running in a background
+        thread serves any number of device connections concurrently, while the consumer
+        keeps using the same blocking get_data() surface.
+
+        Args:
+            server_ip (str): The IP address of the server.
+            server_port (int): The port number for the server.
+            recv_data_keys (list): The keys of the data to receive.
+            max_protocol_version (int, optional): Highest protocol version accepted from the device.
+                Set to PROTOCOL_VERSION_LEGACY to refuse sessions. Defaults to PROTOCOL_VERSION_MAX.
+            queue_size (int, optional): Maximum number of received items waiting for the consumer,
+                0 for unbounded. Defaults to 0.
+            overload_policy (str, optional): What to do when the queue is full, see IngestQueue.
+                With 'block' a full queue pauses reading from the connection that is putting, so
+                TCP backpressure applies to that device only. Defaults to 'block'.
+            log_backlog (int, optional): Maximum number of queued log-only items under 'latest_only'
+                before the receiving connection waits, 0 for unbounded. Defaults to 1024.
+            capture_path (str, optional): Record every received frame to this capture file.
+                Defaults to None.
+            reorder_budget_ms (float, optional): Return frames in frame_index order, holding a frame
+                at most this long for missing predecessors; 0 to return them in arrival order.
+                Defaults to 0.
+            reorder_max_pending (int, optional): Maximum frames held per device for reordering. Defaults to 32.
+            loss_report_path (str, optional): Write the per-device loss report (gaps, duplicates,
+                late frames) to this file when the server stops. Needs reordering. Defaults to None.
+            session_timeout (float, optional): Seconds a connection may stay silent before it is
+                closed, 0 to wait forever. Defaults to 60.
+        """
+        # Socket server configuration
+        self.server = None          # asyncio server object
+        self.server_ip = server_ip  # IP address of the server
+        self.port = server_port     # Port number for the server
+
+        # Data management
+        self.data_queue = IngestQueue(queue_size, overload_policy, on_drop=self.release_data,
+                                      log_backlog=log_backlog)  # Queue to store received data
+        self.capture_path = capture_path
+        self.capture = None  # Session recording, opened by start_server()
+        self.capture_executor = None  # Writes the capture records off the event loop, in arrival order
+        self.reorder = None  # Reorders the queued frames and counts the lost ones
+        if reorder_budget_ms > 0:
+            self.reorder = ReorderBuffer(self.data_queue.get, reorder_budget_ms, reorder_max_pending,
+                                         on_drop=self.release_data, depth=self.data_queue.qsize)
+        self.loss_report_path = loss_report_path
+        self.ready_event = threading.Event()  # Set by the first received frame (and by stop)
+        self.received_any = False
+        self.recv_data_keys = recv_data_keys
+
+        # Protocol
+        self.max_protocol_version = max_protocol_version
+
+        # Event loop and connections
+        self.loop = None
+        self.thread = None
+        self.stop_thread = False
+        self.connections = set()  # Tasks of the connected clients
+        self.session_timeout = session_timeout
+
+        # Signal handling
+        signal.signal(signal.SIGINT, self._signal_handler)  # Register SIGINT handler
+
+    def start_server(self):
+        """Start the event loop thread and begin listening for connections.
+
+        Returns:
+            bool: True if the server started successfully, False otherwise.
+        """
+        name = "Host"
+        started = threading.Event()
+        error = []
+
+        self.stop_thread = False
+        self.thread = threading.Thread(target=self._run_loop, args=(started, error), daemon=True)
+        self.thread.start()
+        started.wait()
+
+        if not error:
+            if self.capture_path and self.capture is None:
+                self.capture = CaptureWriter(self.capture_path)
+                self.capture_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='CaptureWriter')
+            print(f"✅ {name.capitalize():13} Build Socket Server \t \033[32mSuccessful\033[0m")
+            print(f"🔌 Socket server (asyncio) started on {self.server_ip}:{self.port}")
+            return True
+        else:
+            logging.error(f"❌ Failed to start asyncio server: {error[0]}")
+            print(f"❌ {name.capitalize():13} Build Socket Server \t \033[31mFailed\033[0m")
+            self.stop_thread = True
+            return False
+
+    def stop_server(self):
+        """Stop the server, close every connection and join the event loop thread."""
+        self.stop_thread = True
+        self.data_queue.close()
+        self.ready_event.set()  # Wake wait_ready()
+        if self.loop and self.loop.is_running():
+            self.loop.call_soon_threadsafe(self._shutdown)
+        if self.thread:
+            self.thread.join()
+
+        logging.info(f"📊 Ingest queue: {self.data_queue.stats()}")
+        if self.reorder:
+            # Frames still held for reordering will not be consumed, return their buffers
+            self.reorder.flush(discard=True)
+            if self.loss_report_path:
+                self.reorder.write_report(self.loss_report_path)
+
+        if self.capture:
+            self.capture_executor.shutdown(wait=True)
+            self.capture.close()
+
+    def is_ready(self):
+        """Check if the server has received data.
+
+        Returns:
+            bool: True if the server has received data, False otherwise.
+        """
+        return self.data_queue.qsize() > 0
+
+    def is_running(self):
+        """Check if the server is currently running.
+
+        Returns:
+            bool: True if the server is running, False otherwise.
+        """
+        return not self.stop_thread
+
+    def get_data(self, timeout=None):
+        """Retrieve data from the data queue.
+
+        Args:
+            timeout (float, optional): Maximum seconds to wait, None to wait forever. Defaults to None.
+
+        Returns:
+            Any: The next item in the data queue, or None if nothing arrived in time.
+        """
+        try:
+            if self.reorder:
+                return self.reorder.get(timeout=timeout)
+            return self.data_queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    # Consumer API name for get_data()
+    get = get_data
+
+    def wait_ready(self, timeout=None):
+        """Wait for the first received frame without polling.
+
+        Args:
+            timeout (float, optional): Maximum seconds to wait, None to wait forever. Defaults to None.
+
+        Returns:
+            bool: True once a frame was received, False on timeout or when the server stopped first.
+        """
+        self.ready_event.wait(timeout)
+        return self.received_any
+
+    def get_batch(self, max_n, timeout=None):
+        """Retrieve up to max_n queued items in one wakeup.
+
+        Waits for the first item, then takes the items already queued without waiting.
+
+        Args:
+            max_n (int): Maximum number of items to return.
+            timeout (float, optional): Maximum seconds to wait for the first item, None to wait
+                forever. Defaults to None.
+
+        Returns:
+            list: The items, empty if nothing arrived in time or the server stopped.
+        """
+        batch = []
+        data = self.get_data(timeout)
+        while data is not None:
+            batch.append(data)
+            if len(batch) >= max_n:
+                break
+            data = self.get_data(0)
+        return batch
+
+    def __iter__(self):
+        """Iterate over the received items until the server stops and the queue is drained.
+
+        Yields:
+            dict: The next received item.
+        """
+        while True:
+            data = self.get_data(0.5)
+            if data is not None:
+                yield data
+            elif not self.is_running():
+                return
+
+    def release_data(self, data):
+        """Release the resources of a received item.
+
+        StreamReader hands out its own bytes objects, so there is no pooled buffer to
+        return; the method exists to keep the RemoteSocket surface.
+
+        Args:
+            data (dict): An item returned by get_data().
+        """
+        if data and data.get('buffer') is not None:
+            data['buffer'].release()
+            data['buffer'] = None
+
+    def _run_loop(self, started, error):
+        """Body of the event loop thread.
+
+        Args:
+            started (threading.Event): Set once the server is listening or failed to start.
+            error (list): Receives the startup exception, if any.
+        """
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.server = self.loop.run_until_complete(
+                asyncio.start_server(self._handle_client, self.server_ip, self.port, reuse_address=True))
+        except Exception as e:
+            error.append(e)
+            started.set()
+            self.loop.close()
+            return
+
+        started.set()
+        try:
+            self.loop.run_until_complete(self.server.serve_forever())
+        except asyncio.CancelledError:
+            pass
+        finally:
+            pending = [task for task in asyncio.all_tasks(self.loop) if not task.done()]
+            for task in pending:
+                task.cancel()
+            if pending:
+                self.loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            self.loop.close()
+
+    def _shutdown(self):
+        """Close the listening socket (ends serve_forever) and cancel every connection. Runs on the event loop."""
+        if self.server:
+            self.server.close()
+        for task in list(self.connections):
+            task.cancel()
+
+    async def _handle_client(self, reader, writer):
+        """Serve one device connection: a single legacy frame or a whole session.
+
+        Args:
+            reader (asyncio.StreamReader): The connection reader.
+            writer (asyncio.StreamWriter): The connection writer.
+        """
+        task = asyncio.current_task()
+        self.connections.add(task)
+        addr = writer.get_extra_info('peername')
+        laps = latency.tracker.laps()
+        try:
+            head = await self._readexactly(reader, 4)
+            if head == SESSION_MAGIC:
+                await self._recv_session(reader, writer, addr, laps)
+            else:
+                laps.lap('accept')
+                recv_data = await self._recv_legacy_frame(reader, head)
+                if recv_data is not None:
+                    recv_data['device_id'] = addr[0]
+                    await self._enqueue(recv_data)
+        except asyncio.IncompleteReadError as e:
+            if e.partial:
+                logging.error(f"Connection closed. Received {len(e.partial)} out of {e.expected} bytes.")
+        except asyncio.TimeoutError:
+            logging.warning(f"⏱️ Connection from {addr} silent for {self.session_timeout}s, closing it")
+        except ValueError as e:
+            # The stream is out of sync, the connection cannot continue
+            logging.error(f"🔴 Protocol error from {addr}: {e}")
+        except (ConnectionError, OSError) as e:
+            if not self.stop_thread:
+                logging.error(f"🔴 Socket error: {e}")
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logging.error(f"⚠️ Unexpected error: {e}", exc_info=True)
+        finally:
+            self.connections.discard(task)
+            writer.close()
+
+    async def _recv_legacy_frame(self, reader, head):
+        """Receive the single frame of a legacy (one frame per connection) client.
+
+        Args:
+            reader (asyncio.StreamReader): The connection reader.
+            head (bytes): The first 4 bytes already read from the connection.
+
+        Returns:
+            dict: The received data.
+        """
+        if self.recv_data_keys == ["log"]:
+            return {'log': await self._recv_json(reader, prefix=head)}
+
+        laps = latency.tracker.laps()
+        recv_data = {key: None for key in self.recv_data_keys}
+        recv_data['frame_index'] = struct.unpack('>I', head)[0]
+
+        size = unpack_uint32(await self._readexactly(reader, 4))
+        laps.lap('recv_header')
+        recv_data['image'] = await self._readexactly(reader, size)
+        laps.lap('recv_image')
+
+        if 'image_path' in recv_data:
+            impath_size = unpack_uint32(await self._readexactly(reader, 4))
+            recv_data['image_path'] = (await self._readexactly(reader, impath_size)).decode('utf-8')
+
+        recv_data['log'] = await self._recv_json(reader)
+        laps.lap('recv_log')
+        return recv_data
+
+    async def _recv_session(self, reader, writer, addr, laps):
+        """Negotiate the protocol version and receive frames until the device closes the session.
+
+        Args:
+            reader (asyncio.StreamReader): The connection reader.
+            writer (asyncio.StreamWriter): The connection writer.
+            addr (tuple): The address of the client.
+            laps: Latency laps started when the connection was accepted.
+        """
+        requested_version = unpack_uint32(await self._readexactly(reader, 4))
+        version = negotiate_version(requested_version, self.max_protocol_version)
+        writer.write(pack_uint32(version))
+        await writer.drain()
+        if version < PROTOCOL_VERSION_SESSION:
+            logging.info(f"🔁 Session refused for {addr}, falling back to one frame per connection")
+            return
+
+        device_id = addr[0]
+        if version >= PROTOCOL_VERSION_DEVICE_ID:
+            size = unpack_uint32(await self._readexactly(reader, 4))
+            if size > DEVICE_ID_MAX_SIZE:
+                raise ValueError(f"Invalid device id size: {size}")
+            device_id = (await self._readexactly(reader, size)).decode('utf-8')
+        laps.lap('accept')
+
+        logging.info(f"🔗 Session v{version} opened with {device_id} ({addr})")
+        frames = 0
+        try:
+            while not self.stop_thread:
+                if version >= PROTOCOL_VERSION_ENVELOPE:
+                    recv_data = await self._recv_envelope_frame(reader)
+                else:
+                    recv_data = await self._recv_session_frame(reader)
+                if recv_data is None:
+                    break
+                recv_data['device_id'] = device_id
+                if frames == 0:
+                    recv_data['session_start'] = True  # Restarts the reordering of the device
+                await self._enqueue(recv_data)
+                frames += 1
+        finally:
+            logging.info(f"🔒 Session with {device_id} closed after {frames} frames")
+
+    async def _recv_session_frame(self, reader):
+        """Receive one length-prefixed frame of a session (protocol version 1).
+
+        Args:
+            reader (asyncio.StreamReader): The connection reader.
+
+        Returns:
+            dict: The received data, or None when the device closed the session.
+        """
+        try:
+            first = await self._readexactly(reader, 4)
+        except asyncio.IncompleteReadError as e:
+            if e.partial:
+                raise
+            return None
+        laps = latency.tracker.laps()
+
+        if self.recv_data_keys == ["log"]:
+            log = await self._readexactly(reader, unpack_uint32(first))
+            laps.lap('recv_log')
+            return {'log': log.decode('utf-8').strip()}
+
+        recv_data = {key: None for key in self.recv_data_keys}
+        recv_data['frame_index'] = unpack_uint32(first)
+
+        size = unpack_uint32(await self._readexactly(reader, 4))
+        laps.lap('recv_header')
+        recv_data['image'] = await self._readexactly(reader, size)
+        laps.lap('recv_image')
+
+        if 'image_path' in recv_data:
+            impath_size = unpack_uint32(await self._readexactly(reader, 4))
+            recv_data['image_path'] = (await self._readexactly(reader, impath_size)).decode('utf-8')
+
+        log_size = unpack_uint32(await self._readexactly(reader, 4))
+        recv_data['log'] = (await self._readexactly(reader, log_size)).decode('utf-8').strip()
+        laps.lap('recv_log')
+        return recv_data
+
+    async def _recv_envelope_frame(self, reader):
+        """Receive one frame of a session that uses the envelope header (protocol version 2).
+
+        Args:
+            reader (asyncio.StreamReader): The connection reader.
+
+        Returns:
+            dict: The received data, or None when the device closed the session.
+        """
+        # With profiling on, wait for the first byte alone so recv_header excludes the idle time
+        first = 1 if latency.tracker.enabled else ENVELOPE_HEADER.size
+        try:
+            header = await self._readexactly(reader, first)
+        except asyncio.IncompleteReadError as e:
+            if e.partial:
+                raise
+            return None
+        laps = latency.tracker.laps()
+        if first < ENVELOPE_HEADER.size:
+            header += await self._readexactly(reader, ENVELOPE_HEADER.size - first)
+        header = unpack_envelope_header(header)
+        laps.lap('recv_header')
+
+        recv_data = {key: None for key in self.recv_data_keys}
+        if 'frame_index' in recv_data:
+            recv_data['frame_index'] = header['frame_index']
+        recv_data['device_timestamp_us'] = header['timestamp_us']
+
+        image = await self._readexactly(reader, header['image_size'])
+        if 'image' in recv_data:
+            recv_data['image'] = image
+        laps.lap('recv_image')
+
+        image_path = await self._readexactly(reader, header['path_size'])
+        if 'image_path' in recv_data:
+            recv_data['image_path'] = image_path.decode('utf-8')
+
+        recv_data['log'] = (await self._readexactly(reader, header['log_size'])).decode('utf-8').strip()
+        laps.lap('recv_log')
+        return recv_data
+
+    async def _recv_json(self, reader, prefix=b''):
+        """Receive a legacy JSON log, terminated by '\\r\\n\\r\\n' or the connection close.
+
+        Args:
+            reader (asyncio.StreamReader): The connection reader.
+            prefix (bytes, optional): Bytes of the log already read. Defaults to b''.
+
+        Returns:
+            str: The decoded JSON log.
+        """
+        json_data = bytearray(prefix)
+        while True:
+            chunk = await asyncio.wait_for(reader.read(4096), self.session_timeout or None)
+            if not chunk:
+                break
+            start = len(json_data)
+            json_data += chunk
+            if find_json_log_terminator(json_data, start) != -1:
+                break
+        return json_data.decode('utf-8').strip()
+
+    async def _readexactly(self, reader, size):
+        """Read exactly size bytes, giving up when the connection stays silent for session_timeout.
+
+        Args:
+            reader (asyncio.StreamReader): The connection reader.
+            size (int): Number of bytes to read.
+
+        Returns:
+            bytes: The bytes read.
+
+        Raises:
+            asyncio.TimeoutError: If no data arrived within session_timeout.
+            asyncio.IncompleteReadError: If the connection closed first.
+        """
+        if not self.session_timeout:
+            return await reader.readexactly(size)
+        return await asyncio.wait_for(reader.readexactly(size), self.session_timeout)
+
+    async def _enqueue(self, recv_data):
+        """Timestamp a received frame, record it to the capture file and queue it.
+
+        The capture record is written by the capture thread, so file I/O does not stall the
+        event loop. Only a full queue under 'block', or a full log backlog under 'latest_only',
+        makes IngestQueue.put wait; that put runs on the default executor, so only the connection that is putting waits
+        and the event loop keeps serving the other connections.
+
+        Args:
+            recv_data (dict): The received data.
+        """
+        recv_data['recv_timestamp_us'] = int(time.time() * 1e6)
+        if self.capture:
+            # A copy, the consumer may drop the image of the queued item before the record is written
+            self.capture_executor.submit(self.capture.write, dict(recv_data))
+        try:
+            self.data_queue.put_nowait(recv_data)
+        except queue.Full:
+            await asyncio.get_running_loop().run_in_executor(None, self.data_queue.put, recv_data)
+        if not self.received_any:
+            self.received_any = True
+            self.ready_event.set()
+
+    def _signal_handler(self, signum, frame):
+        """Handle interrupt signals to gracefully shut down the server.
+
+        Args:
+            signum (int): The signal number.
+            frame (frame): The current stack frame.
+        """
+        print("\nReceived interrupt signal. Shutting down...")
+        self.stop_thread = True
+        self.data_queue.close()
+        self.ready_event.set()  # Wake wait_ready()
+        if self.loop and self.loop.is_running():
+            self.loop.call_soon_threadsafe(self._shutdown)
@@ -0,0 +1,105 @@
+import logging
+import threading
+
+
+class PooledBuffer:
+    def __init__(self, pool, buffer, size):
+        """A leased receive buffer.
+
+        Args:
+            pool (BufferPool): The pool the buffer is returned to, None for an unpooled buffer.
+            buffer (bytearray): The underlying storage, at least `size` bytes long.
+            size (int): Number of bytes in use.
+        """
+        self.pool = pool
+        self.buffer = buffer
+        self.size = size
+        self.view = memoryview(buffer)[:size]  # Zero-copy slice handed to the consumer
+
+    def release(self):
+        """Return the buffer to its pool. Calling it more than once is harmless."""
+        if self.view is None:
+            return
+        buffer = self.buffer
+        try:
+            self.view.release()
+        except BufferError:
+            # Something still wraps the view (e.g. a numpy array), the bytes must not be
+            # overwritten, so the pool gets a replacement buffer instead
+            buffer = bytearray(len(self.buffer))
+        self.view = None
+        self.buffer = None
+        if self.pool is not None:
+            self.pool._give_back(buffer)
+
+
+class BufferPool:
+    def __init__(self, count, initial_size=0):
+        """Fixed number of reusable receive buffers that grow to the largest size requested.
+
+        Args:
+            count (int): Number of pooled buffers. 0 disables pooling.
+            initial_size (int, optional): Initial size of every buffer in bytes. Defaults to 0.
+        """
+        self.count = count
+        self.max_size = initial_size
+        self.free = [bytearray(initial_size) for _ in range(count)]
+        self.condition = threading.Condition()
+
+        # Statistics
+        self.hits = 0     # Leases served from the pool
+        self.misses = 0   # Leases served by a fresh allocation because the pool was empty
+        self.grows = 0    # Pooled buffers reallocated to fit a larger frame
+
+    def acquire(self, size, timeout=0.0):
+        """Lease a buffer of at least `size` bytes.
+
+        When every pooled buffer is in use, wait up to `timeout` seconds for one to be
+        released, then fall back to an unpooled allocation so the receiver never stalls.
+
+        Args:
+            size (int): Number of bytes needed.
+            timeout (float, optional): Seconds to wait for a free buffer. Defaults to 0.0.
+
+        Returns:
+            PooledBuffer: The leased buffer. Its `view` covers exactly `size` bytes.
+        """
+        with self.condition:
+            if not self.free and timeout > 0:
+                self.condition.wait_for(lambda: self.free, timeout)
+            if not self.free:
+                self.misses += 1
+                if self.count and self.misses == 1:
+                    logging.warning(f"⚠️ Receive buffer pool exhausted ({self.count} buffers), allocating extra buffers")
+                return PooledBuffer(None, bytearray(size), size)
+
+            buffer = self.free.pop()
+            self.hits += 1
+            self.max_size = max(self.max_size, size)
+
+        if len(buffer) < size:
+            # Grow straight to the largest size seen so far, so every buffer settles quickly
+            buffer = bytearray(self.max_size)
+            self.grows += 1
+        return PooledBuffer(self, buffer, size)
+
+    def _give_back(self, buffer):
+        with self.condition:
+            self.free.append(buffer)
+            self.condition.notify()
+
+    def stats(self):
+        """Get the pool statistics.
+
+        Returns:
+            dict: Pool size, free buffers, largest size seen, hits, misses and grows.
+        """
+        with self.condition:
+            return {
+                'count': self.count,
+                'free': len(self.free),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'grows': self.grows,
+            }
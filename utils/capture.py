@@ -0,0 +1,234 @@
+import os
+import time
+import struct
+import logging
+import threading
+
+# Session capture file (.adcap)
+#
+#   FILE_HEADER                      magic, format version, reserved
+#   record * N                       RECORD_HEADER followed by image, image path, log, device id
+#   index                            N big-endian u64 record offsets
+#   INDEX_TRAILER                    index offset, N, INDEX_MAGIC
+#
+# Records are appended as frames arrive; the index is written by close(). A capture
+# that was not closed (crash, kill) has no trailer and is read with a sequential scan.
+
+CAPTURE_MAGIC = b'ADCP'
+CAPTURE_FORMAT_VERSION = 1
+INDEX_MAGIC = b'ADIX'
+
+FILE_HEADER = struct.Struct('>4sHH')
+# frame_index, receive timestamp (us), device timestamp (us), image size, image path size, log size, device id size
+RECORD_HEADER = struct.Struct('>IQQIIIH')
+INDEX_TRAILER = struct.Struct('>QI4s')
+
+NO_FRAME_INDEX = 0xFFFFFFFF  # Stored for log-only records
+
+
+class CaptureWriter:
+    def __init__(self, path):
+        """Append received frames to a capture file.
+
+        Args:
+            path (str): The capture file to create.
+        """
+        self.path = path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.file = open(path, 'wb')
+        self.file.write(FILE_HEADER.pack(CAPTURE_MAGIC, CAPTURE_FORMAT_VERSION, 0))
+        self.offsets = []
+        self.lock = threading.Lock()  # Several connections may record at once
+        logging.info(f"💾 Capturing session to {path}")
+
+    def write(self, recv_data, recv_timestamp_us=None):
+        """Append one received frame.
+
+        Args:
+            recv_data (dict): The received data (frame_index, image, image_path, log, device_id...).
+            recv_timestamp_us (int, optional): Host receive time in microseconds. Defaults to
+                recv_data['recv_timestamp_us'] or the current time.
+        """
+        if recv_timestamp_us is None:
+            recv_timestamp_us = recv_data.get('recv_timestamp_us') or int(time.time() * 1e6)
+
+        image = recv_data.get('image')
+        image = image if image is not None else b''
+        image_path = (recv_data.get('image_path') or '').encode('utf-8')
+        log = (recv_data.get('log') or '').encode('utf-8')
+        device_id = (recv_data.get('device_id') or '').encode('utf-8')
+        frame_index = recv_data.get('frame_index')
+
+        header = RECORD_HEADER.pack(
+            NO_FRAME_INDEX if frame_index is None else frame_index,
+            recv_timestamp_us,
+            recv_data.get('device_timestamp_us') or 0,
+            len(image), len(image_path), len(log), len(device_id))
+
+        with self.lock:
+            if self.file is None:
+                return
+            self.offsets.append(self.file.tell())
+            self.file.write(header)
+            self.file.write(image)
+            self.file.write(image_path)
+            self.file.write(log)
+            self.file.write(device_id)
+
+    def close(self):
+        """Write the offset index and close the file."""
+        with self.lock:
+            if self.file is None:
+                return
+            index_offset = self.file.tell()
+            self.file.write(struct.pack(f'>{len(self.offsets)}Q', *self.offsets))
+            self.file.write(INDEX_TRAILER.pack(index_offset, len(self.offsets), INDEX_MAGIC))
+            self.file.close()
+            self.file = None
+        logging.info(f"💾 Capture closed: {len(self.offsets)} frames in {self.path}")
+
+
+class CaptureReader:
+    def __init__(self, path):
+        """Random access to the frames of a capture file.
+
+        Args:
+            path (str): The capture file.
+
+        Raises:
+            ValueError: If the file is not a capture file.
+        """
+        self.path = path
+        self.file = open(path, 'rb')
+        magic, version, _ = FILE_HEADER.unpack(self.file.read(FILE_HEADER.size))
+        if magic != CAPTURE_MAGIC:
+            self.file.close()
+            raise ValueError(f"Not a capture file: {path}")
+        if version > CAPTURE_FORMAT_VERSION:
+            self.file.close()
+            raise ValueError(f"Unsupported capture format version {version}: {path}")
+        self.offsets = self._read_index()
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __iter__(self):
+        for i in range(len(self.offsets)):
+            yield self.read(i)
+
+    def read(self, i):
+        """Read one frame.
+
+        Args:
+            i (int): The record number.
+
+        Returns:
+            dict: The received data, with 'image' set to None for log-only records and
+                'image_path' only present when it was recorded.
+        """
+        self.file.seek(self.offsets[i])
+        (frame_index, recv_timestamp_us, device_timestamp_us,
+         image_size, path_size, log_size, device_id_size) = RECORD_HEADER.unpack(self.file.read(RECORD_HEADER.size))
+        image = self.file.read(image_size)
+        image_path = self.file.read(path_size).decode('utf-8')
+        log = self.file.read(log_size).decode('utf-8')
+        device_id = self.file.read(device_id_size).decode('utf-8')
+
+        recv_data = {
+            'frame_index': None if frame_index == NO_FRAME_INDEX else frame_index,
+            'image': image if image_size else None,
+            'log': log,
+            'device_id': device_id or None,
+            'recv_timestamp_us': recv_timestamp_us,
+            'device_timestamp_us': device_timestamp_us,
+        }
+        if path_size:
+            recv_data['image_path'] = image_path
+        return recv_data
+
+    def close(self):
+        self.file.close()
+
+    def _read_index(self):
+        """Read the offset index, or rebuild it when the capture was not closed.
+
+        Returns:
+            list: The record offsets.
+        """
+        size = os.fstat(self.file.fileno()).st_size
+        if size >= FILE_HEADER.size + INDEX_TRAILER.size:
+            self.file.seek(size - INDEX_TRAILER.size)
+            index_offset, count, magic = INDEX_TRAILER.unpack(self.file.read(INDEX_TRAILER.size))
+            if magic == INDEX_MAGIC and index_offset + 8 * count + INDEX_TRAILER.size == size:
+                self.file.seek(index_offset)
+                return list(struct.unpack(f'>{count}Q', self.file.read(8 * count)))
+
+        logging.warning(f"⚠️ Capture {self.path} has no index (not closed), scanning records")
+        offsets = []
+        offset = FILE_HEADER.size
+        while offset + RECORD_HEADER.size <= size:
+            self.file.seek(offset)
+            fields = RECORD_HEADER.unpack(self.file.read(RECORD_HEADER.size))
+            end = offset + RECORD_HEADER.size + sum(fields[3:])
+            if end > size:
+                break  # Truncated last record
+            offsets.append(offset)
+            offset = end
+        return offsets
+
+
+class CaptureReplaySource:
+    def __init__(self, path, pacing='fast', speed=1.0):
+        """Feed the frames of a capture file back with the get_data() surface of the socket servers.
+
+        Args:
+            path (str): The capture file.
+            pacing (str, optional): 'fast' to replay at disk speed, 'recorded' to reproduce
+                the receive timing of the session. Defaults to 'fast'.
+            speed (float, optional): Speed factor for 'recorded' pacing. Defaults to 1.0.
+        """
+        self.reader = CaptureReader(path)
+        self.pacing = pacing
+        self.speed = speed
+        self.position = 0
+        self.first_recv_us = None
+        self.start_time = None
+
+    def is_running(self):
+        """Check if frames are left to replay.
+
+        Returns:
+            bool: True until every frame was returned.
+        """
+        return self.position < len(self.reader)
+
+    def get_data(self, timeout=None):
+        """Return the next frame, waiting for its recorded time with 'recorded' pacing.
+
+        Args:
+            timeout (float, optional): Unused, kept for the socket server surface.
+
+        Returns:
+            dict: The next received data, or None at the end of the capture.
+        """
+        if not self.is_running():
+            return None
+
+        recv_data = self.reader.read(self.position)
+        self.position += 1
+
+        if self.pacing == 'recorded':
+            if self.first_recv_us is None:
+                self.first_recv_us = recv_data['recv_timestamp_us']
+                self.start_time = time.perf_counter()
+            due = (recv_data['recv_timestamp_us'] - self.first_recv_us) / 1e6 / self.speed
+            delay = due - (time.perf_counter() - self.start_time)
+            if delay > 0:
+                time.sleep(delay)
+        return recv_data
+
+    def release_data(self, data):
+        """Nothing to release, replayed images are plain bytes."""
+
+    def close(self):
+        self.reader.close()
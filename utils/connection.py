@@ -14,6 +14,7 @@ import socket
 from engine.BaseDataset import BaseDataset
 from utils.drawer import Drawer
 from utils.saver import ImageSaver
+from utils.protocol import find_json_log_terminator
 import threading
 import numpy as np
 import queue
@@ -100,15 +101,7 @@ class SOCKET:
 
 
     def receive_json_log(self, client_socket):
-        json_data = b''
-        while True:
-            data = client_socket.recv(4096)
-            if not data:
-                break
-            json_data += data
-            if b'\r\n\r\n' in data:
-                break
-        return json_data.decode('utf-8')
+        return self._receive_json_data(client_socket).decode('utf-8')
 
 
     def receive_fixed_size_data(self, client_socket, size):
@@ -245,16 +238,17 @@ class SOCKET:
         Returns:
             str: The received JSON data.
         """
-        json_data = b''
+        json_data = bytearray()
         while True:
             data = client_socket.recv(4096)
             if not data:
                 break
+            start = len(json_data)
             json_data += data
-            if b'\r\n\r\n' in data:
+            if find_json_log_terminator(json_data, start) != -1:
                 break
 
-        return json_data
+        return bytes(json_data)
 
 
     def _process_json_data(self, json_data, addr, draw_jsonlog=True, save_folder=None):
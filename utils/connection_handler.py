@@ -8,9 +8,12 @@ import paramiko
 # from utils.connections.remote_ssh import RemoteSSH
 # from utils.connections.remote_socket import RemoteSocket
 from utils.socket import RemoteSocket
+from utils.async_socket import AsyncRemoteSocket
 from utils.ssh import RemoteSSH
 import socket
 import psutil
+import os
+from datetime import datetime
 
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -71,13 +74,60 @@ class ConnectionHandler():
         else:
             recv_data_keys = ["log"]
 
-        self.remote_socket = RemoteSocket(
-            server_ip=self.config.server_ip,
-            server_port=self.config.server_port,
-            recv_data_keys=recv_data_keys)
+        self.remote_socket = self.create_remote_socket(self.config.server_port, recv_data_keys)
 
         return True
 
+    def create_remote_socket(self, server_port, recv_data_keys):
+        """Create the socket server for the configured ingest backend.
+
+        Args:
+            server_port (int): The port number for the server.
+            recv_data_keys (list): The keys of the data to receive.
+
+        Returns:
+            RemoteSocket or AsyncRemoteSocket: The socket server, not started yet.
+        """
+        capture_path = None
+        if self.config.capture_enabled:
+            capture_path = os.path.join(self.config.capture_dir, datetime.now().strftime('session_%Y%m%d-%H%M%S.adcap'))
+
+        loss_report_path = None
+        if self.config.ingest_reorder_budget_ms > 0 and self.config.ingest_loss_report_dir:
+            loss_report_path = os.path.join(self.config.ingest_loss_report_dir,
+                                            datetime.now().strftime('loss_%Y%m%d-%H%M%S.json'))
+
+        if self.config.ingest_backend == 'asyncio' or self.config.ingest_multi_device:
+            # Several devices stream at once, which needs concurrent connections
+            return AsyncRemoteSocket(
+                server_ip=self.config.server_ip,
+                server_port=server_port,
+                recv_data_keys=recv_data_keys,
+                max_protocol_version=self.config.ingest_protocol_version,
+                queue_size=self.config.ingest_queue_size,
+                overload_policy=self.config.ingest_overload_policy,
+                log_backlog=self.config.ingest_log_backlog,
+                capture_path=capture_path,
+                reorder_budget_ms=self.config.ingest_reorder_budget_ms,
+                reorder_max_pending=self.config.ingest_reorder_max_pending,
+                loss_report_path=loss_report_path,
+                session_timeout=self.config.ingest_session_timeout)
+
+        return RemoteSocket(
+            server_ip=self.config.server_ip,
+            server_port=server_port,
+            recv_data_keys=recv_data_keys,
+            max_protocol_version=self.config.ingest_protocol_version,
+            buffer_pool_size=self.config.ingest_buffer_pool_size,
+            queue_size=self.config.ingest_queue_size,
+            overload_policy=self.config.ingest_overload_policy,
+            log_backlog=self.config.ingest_log_backlog,
+            capture_path=capture_path,
+            reorder_budget_ms=self.config.ingest_reorder_budget_ms,
+            reorder_max_pending=self.config.ingest_reorder_max_pending,
+            loss_report_path=loss_report_path,
+            session_timeout=self.config.ingest_session_timeout)
+
     def close_connection(self):
         self.remote_ssh.disconnect()
 
@@ -102,8 +152,23 @@ class ConnectionHandler():
     def server_is_running(self):
         return self.remote_socket.is_running()
 
-    def get_data(self):
-        return self.remote_socket.get_data()
+    def server_wait_ready(self, timeout=None):
+        return self.remote_socket.wait_ready(timeout)
+
+    def get_data(self, timeout=None):
+        return self.remote_socket.get_data(timeout)
+
+    def get_data_batch(self, max_n, timeout=None):
+        return self.remote_socket.get_batch(max_n, timeout)
+
+    def iter_data(self):
+        return iter(self.remote_socket)
+
+    def release_data(self, data):
+        self.remote_socket.release_data(data)
+
+    def ingest_stats(self):
+        return self.remote_socket.data_queue.stats()
 
     def get_file(self, remote_path):
         """
@@ -0,0 +1,144 @@
+import os
+import json
+import logging
+
+_VERSION = 1
+
+
+class DatasetIndex:
+    def __init__(self, im_dir, basename, image_format='jpg', use_cache=True):
+        """Frame ID to image file index of a dataset directory, built once with os.scandir.
+
+        Image files are named <basename><frame ID>.<format>. The index is cached in a
+        sidecar file next to the directory (<im_dir>.frame_index.json), so writing it
+        does not change the directory it describes; the cache is rebuilt when the
+        modification time of the directory changes.
+
+        Args:
+            im_dir (str): The image directory.
+            basename (str): File name prefix of the images (e.g. 'RawFrame_').
+            image_format (str, optional): Preferred format when a frame has files of several formats.
+                Defaults to 'jpg'.
+            use_cache (bool, optional): Read and write the sidecar file. Defaults to True.
+        """
+        self.im_dir = im_dir
+        self.basename = basename
+        self.image_format = image_format
+        self.cache_path = os.path.normpath(im_dir) + '.frame_index.json'
+        self.use_cache = use_cache
+        self.frames = {}  # Frame ID to (file name, format, size in bytes)
+        self.from_cache = False
+
+    def load(self):
+        """Read the index from the sidecar file, or build it and write the sidecar file.
+
+        Returns:
+            DatasetIndex: self.
+
+        Raises:
+            OSError: If the image directory cannot be read.
+        """
+        mtime_ns = os.stat(self.im_dir).st_mtime_ns
+        if self.use_cache and self._read_cache(mtime_ns):
+            self.from_cache = True
+            logging.info(f"🗂️ Loaded the index of {len(self.frames)} frames from {self.cache_path}")
+            return self
+        self._scan()
+        logging.info(f"🗂️ Indexed {len(self.frames)} frames in {self.im_dir}")
+        if self.use_cache:
+            self._write_cache(mtime_ns)
+        return self
+
+    def path(self, frame_id):
+        """Get the image file of a frame.
+
+        Args:
+            frame_id (str or int): The frame ID.
+
+        Returns:
+            str: The image path, or None if the frame has no image.
+        """
+        entry = self.frames.get(str(frame_id))
+        return os.path.join(self.im_dir, entry[0]) if entry is not None else None
+
+    def frame_ids(self):
+        """Get the indexed frame IDs.
+
+        Returns:
+            set: The frame IDs (str).
+        """
+        return set(self.frames)
+
+    def total_size(self):
+        """Get the size of the indexed images.
+
+        Returns:
+            int: Bytes.
+        """
+        return sum(entry[2] for entry in self.frames.values())
+
+    def compare(self, log_frame_ids):
+        """Compare the indexed images with the frames of a log.
+
+        Args:
+            log_frame_ids (iterable): Frame IDs found in the log.
+
+        Returns:
+            tuple: Frame IDs of the log without an image (missing) and images without a
+                log entry (orphans), as sorted lists.
+        """
+        log_frame_ids = {str(frame_id) for frame_id in log_frame_ids}
+        missing = sorted(log_frame_ids - self.frames.keys(), key=_frame_order)
+        orphans = sorted(self.frames.keys() - log_frame_ids, key=_frame_order)
+        return missing, orphans
+
+    def __len__(self):
+        return len(self.frames)
+
+    def __contains__(self, frame_id):
+        return str(frame_id) in self.frames
+
+    def _scan(self):
+        self.frames = {}
+        prefix_len = len(self.basename)
+        with os.scandir(self.im_dir) as entries:
+            for entry in entries:
+                if not entry.name.startswith(self.basename):
+                    continue
+                frame_id, dot, image_format = entry.name[prefix_len:].rpartition('.')
+                if not dot or not frame_id.isdigit() or not entry.is_file():
+                    continue
+                current = self.frames.get(frame_id)
+                if current is not None and current[1] == self.image_format:
+                    continue  # Keep the preferred format
+                self.frames[frame_id] = (entry.name, image_format, entry.stat().st_size)
+
+    def _read_cache(self, mtime_ns):
+        try:
+            with open(self.cache_path, 'r') as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if (cache.get('version') != _VERSION or cache.get('mtime_ns') != mtime_ns
+                or cache.get('basename') != self.basename or cache.get('image_format') != self.image_format):
+            return False
+        self.frames = {frame_id: tuple(entry) for frame_id, entry in cache['frames'].items()}
+        return True
+
+    def _write_cache(self, mtime_ns):
+        cache = {
+            'version': _VERSION,
+            'mtime_ns': mtime_ns,
+            'basename': self.basename,
+            'image_format': self.image_format,
+            'frames': self.frames,
+        }
+        try:
+            with open(self.cache_path, 'w') as f:
+                json.dump(cache, f)
+        except OSError as e:
+            logging.warning(f"⚠️ Could not write the frame index to {self.cache_path}: {e}")
+
+
+def _frame_order(frame_id):
+    return int(frame_id) if frame_id.isdigit() else -1
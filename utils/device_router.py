@@ -0,0 +1,96 @@
+import os
+import re
+import logging
+import threading
+from utils.drawer import Drawer
+
+
+class DevicePipeline:
+    def __init__(self, device_id, drawer, raw_images_dir):
+        """Render and save state of one device.
+
+        Args:
+            device_id (str): The device id (peer address or id sent in the handshake).
+            drawer (Drawer): The Drawer rendering and saving this device's frames.
+            raw_images_dir (str): Directory for this device's raw images.
+        """
+        self.device_id = device_id
+        self.drawer = drawer
+        self.raw_images_dir = raw_images_dir
+        self.frames = 0
+
+
+class DeviceRouter:
+    def __init__(self, config, raw_images_root, save_root='runs'):
+        """Route frames from several devices to per-device pipelines.
+
+        Every device gets its own Drawer (and therefore its own ImageSaver under
+        <save_root>/<device>), its own raw image directory and its own window.
+        Pipelines are created on the first frame of a device.
+
+        Args:
+            config: Configuration object containing necessary parameters.
+            raw_images_root (str): Parent directory of the per-device raw image directories.
+            save_root (str, optional): Parent directory of the per-device result directories. Defaults to 'runs'.
+        """
+        self.config = config
+        self.raw_images_root = raw_images_root
+        self.save_root = save_root
+        self.pipelines = {}
+        self.lock = threading.Lock()
+
+    def get(self, device_id):
+        """Get the pipeline of a device, creating it on first use.
+
+        Args:
+            device_id (str): The device id of the frame, None for an untagged frame.
+
+        Returns:
+            DevicePipeline: The pipeline of the device.
+        """
+        device_id = device_id or 'unknown'
+        with self.lock:
+            pipeline = self.pipelines.get(device_id)
+            if pipeline is None:
+                pipeline = self._create_pipeline(device_id)
+                self.pipelines[device_id] = pipeline
+            pipeline.frames += 1
+            return pipeline
+
+    def devices(self):
+        """Get the frame count of every device seen so far.
+
+        Returns:
+            dict: Device id to number of routed frames.
+        """
+        with self.lock:
+            return {device_id: pipeline.frames for device_id, pipeline in self.pipelines.items()}
+
+    def close(self):
+        """Finish the background outputs of every device Drawer."""
+        with self.lock:
+            pipelines = list(self.pipelines.values())
+        for pipeline in pipelines:
+            pipeline.drawer.close()
+
+    def _create_pipeline(self, device_id):
+        dir_name = self.device_dir_name(device_id)
+        drawer = Drawer(self.config,
+                        save_base_dir=os.path.join(self.save_root, dir_name),
+                        window_name=f"Visualize AI Result [{device_id}]")
+        raw_images_dir = os.path.join(self.raw_images_root, dir_name)
+        os.makedirs(raw_images_dir, exist_ok=True)
+        logging.info(f"📡 New device {device_id}, saving to {os.path.join(self.save_root, dir_name)}")
+        return DevicePipeline(device_id, drawer, raw_images_dir)
+
+    @staticmethod
+    def device_dir_name(device_id):
+        """Turn a device id into a safe directory name.
+
+        Args:
+            device_id (str): The device id.
+
+        Returns:
+            str: The directory name.
+        """
+        return re.sub(r'[^A-Za-z0-9._-]', '_', device_id)
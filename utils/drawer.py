@@ -3,6 +3,7 @@ import json
 import matplotlib.pyplot as plt
 import os
 import cv2
+import itertools
 from engine.BaseDataset import BaseDataset
 # from utils.connection import Connection
 import numpy as np
@@ -10,17 +11,33 @@ import numpy as np
 import logging
 import pandas as pd
 from utils.plotter import Plotter
+from utils import latency
+from utils.offline_render import OfflineRenderer
+from utils.video_sink import VideoSink
+from utils.image_loader import PrefetchImageLoader
+from utils.dataset_index import DatasetIndex
 # # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 class Drawer(BaseDataset):
 
-    def __init__(self, args):
-        super().__init__(args)
+    def __init__(self, args, save_base_dir='runs', window_name="Visualize AI Result"):
+        super().__init__(args, save_base_dir=save_base_dir)
+        self.args = args  # Handed to the offline render workers
+        self.window_name = window_name
+        self.offline_processes = args.pipeline_offline_processes
+        self.offline_chunksize = args.pipeline_offline_chunksize
+        self.prefetch_frames = args.pipeline_prefetch_frames
+        self.prefetch_workers = args.pipeline_prefetch_workers
+        self.frame_cache_size = args.pipeline_frame_cache_size
+        self.image_loader = None  # PrefetchImageLoader of the offline log being drawn
+        self.image_index = args.image_index
+        self.dataset_index = None  # DatasetIndex of im_dir, see index_dataset
         self.DCA_color = (255,128,0)
         self.DLA_color = (255,0,128)
         self.DMA_color = (0,128,255)
         self.DUA_color = (128,0,255)
+        self.detect_colors = {"VEHICLE": (255,200,0), "HUMAN": (0,128,255)}
         self.adas_detection_alpha = args.adas_detection_alpha
         self.adas_detection_thickness = args.adas_detection_thickness
         self.show_adas_detection = args.show_adas_detection
@@ -28,6 +45,240 @@ class Drawer(BaseDataset):
         self.adas_detection_show_label = args.adas_detection_show_label
         self.visualize_mode = args.visualize_mode
         self.device_mode = args.device_mode
+
+        # Geometry plan: frames are resized at most once, straight to the output size, and
+        # drawn there with the JSON coordinates mapped from model space by scale_w/scale_h
+        self.out_w, self.out_h = (self.resize_w, self.resize_h) if self.resize else (self.model_w, self.model_h)
+        self.scale_w = self.out_w / self.model_w
+        self.scale_h = self.out_h / self.model_h
+        self.box_scale = np.array([self.scale_w, self.scale_h, self.scale_w, self.scale_h])
+        self.overlay_buffers = {}  # Reusable overlay per image shape, see blend_shapes
+
+        # Annotated frames can also go straight into a video, files are only created by the first frame
+        self.video_sink = None
+        if args.result_video_enabled:
+            self.video_sink = VideoSink(args.result_video_dir or self.img_saver.current_dir,
+                                        fps=args.result_video_fps,
+                                        codec=args.result_video_codec,
+                                        backend=args.result_video_backend,
+                                        segment_seconds=args.result_video_segment_seconds,
+                                        queue_size=args.result_video_queue_size)
+        self.decode_flag = cv2.IMREAD_COLOR  # Switched to a reduced JPEG decode once the source size is known
+        logging.info(f"📐 Drawing at {self.out_w}x{self.out_h} (model {self.model_w}x{self.model_h})")
+
+    def load_frame(self, image_path=None, img_buffer=None, indexed=False):
+        """
+        Loads a frame at the output size, with at most one resize.
+
+        Reads `image_path` when it exists, otherwise uses `img_buffer`. JPEG files are decoded
+        at 1/2, 1/4 or 1/8 resolution when that still covers the output size.
+
+        Args:
+            image_path (str, optional): Image file of the frame.
+            img_buffer (numpy.ndarray, optional): Decoded frame, used when the file does not exist.
+            indexed (bool, optional): `image_path` comes from the dataset index, so it is not checked
+                for existence. Defaults to False.
+
+        Returns:
+            numpy.ndarray: The frame at (`out_w`, `out_h`), or None if there is no image.
+        """
+        if image_path is not None and (indexed or os.path.exists(image_path)):
+            is_jpeg = os.path.splitext(image_path)[1].lower() in ('.jpg', '.jpeg')
+            image = self._reduced_decode(lambda flag: cv2.imread(image_path, flag), is_jpeg)
+        else:
+            image = img_buffer
+
+        if image is None:
+            return None
+        if image.shape[1] != self.out_w or image.shape[0] != self.out_h:
+            image = cv2.resize(image, (self.out_w, self.out_h), interpolation=cv2.INTER_AREA)
+        return image
+
+    def decode_frame(self, encoded, full_resolution=False):
+        """
+        Decodes a received frame, at reduced resolution when only the output size is needed.
+
+        Args:
+            encoded (bytes-like): The encoded image.
+            full_resolution (bool, optional): Decode at full resolution, for outputs that keep
+                the raw frame (e.g. saved raw images). Defaults to False.
+
+        Returns:
+            numpy.ndarray: The decoded frame, or None if it could not be decoded.
+        """
+        np_arr = np.frombuffer(encoded, np.uint8)
+        if full_resolution:
+            return cv2.imdecode(np_arr, cv2.IMREAD_COLOR)
+        is_jpeg = np_arr[:2].tobytes() == b'\xff\xd8'
+        return self._reduced_decode(lambda flag: cv2.imdecode(np_arr, flag), is_jpeg)
+
+    def _reduced_decode(self, read, is_jpeg):
+        """Decode with the planned JPEG reduction, planned from the first full resolution decode.
+
+        Other formats are always decoded at full resolution: OpenCV only decodes JPEG
+        at reduced scale, other reduced reads decode fully and then resize.
+        """
+        if not is_jpeg:
+            return read(cv2.IMREAD_COLOR)
+        image = read(self.decode_flag)
+        if image is None:
+            return None
+        if self.decode_flag == cv2.IMREAD_COLOR:
+            self._plan_decode(image.shape[1], image.shape[0])
+        elif image.shape[1] < self.out_w or image.shape[0] < self.out_h:
+            # The source resolution dropped, go back to full decodes
+            self.decode_flag = cv2.IMREAD_COLOR
+            image = read(cv2.IMREAD_COLOR)
+        return image
+
+    def _plan_decode(self, source_w, source_h):
+        """Pick the largest JPEG reduced decode that still covers the output size."""
+        for factor, flag in ((8, cv2.IMREAD_REDUCED_COLOR_8), (4, cv2.IMREAD_REDUCED_COLOR_4), (2, cv2.IMREAD_REDUCED_COLOR_2)):
+            if source_w // factor >= self.out_w and source_h // factor >= self.out_h:
+                self.decode_flag = flag
+                logging.info(f"📐 Decoding {source_w}x{source_h} frames at 1/{factor} resolution")
+                return
+
+    def box_array(self, objs, prefix):
+        """
+        Converts the boxes of one object category to output coordinates in one step.
+
+        Args:
+            objs (list): Objects of the category, dicts with `<prefix>.x1`, `.y1`, `.x2` and `.y2` in model space.
+                A missing coordinate is taken as 0.
+            prefix (str): Key prefix of the category, e.g. "ADASDetectObj" or "detectObj".
+
+        Returns:
+            numpy.ndarray: int32 array of shape (N, 4) holding x1, y1, x2, y2.
+        """
+        keys = (f"{prefix}.x1", f"{prefix}.y1", f"{prefix}.x2", f"{prefix}.y2")
+        boxes = np.array([[obj.get(key, 0) for key in keys] for obj in objs], dtype=np.float64).reshape(-1, 4)
+        return (boxes * self.box_scale).astype(np.int32)
+
+    @staticmethod
+    def draw_box_array(image, boxes, color, thickness):
+        """
+        Draws every box of a category with a single polylines call.
+
+        Args:
+            image (numpy.ndarray): The image to draw on.
+            boxes (numpy.ndarray): Boxes returned by `box_array`.
+            color (tuple): BGR color.
+            thickness (int): Line thickness.
+        """
+        if len(boxes):
+            corners = boxes[:, [0, 1, 2, 1, 2, 3, 0, 3]].reshape(-1, 4, 2)
+            cv2.polylines(image, list(corners), True, color, thickness)
+
+    @staticmethod
+    def box_labels(objs, boxes, prefix, font_scale, color, text_format="{label} ({confidence:.2f})", dy=10, line_type=cv2.LINE_8):
+        """
+        Builds the "label (confidence)" entries of a category for `draw_labels`.
+
+        Args:
+            objs (list): Objects of the category. A missing label is drawn empty and a missing confidence as 0.
+            boxes (numpy.ndarray): Their boxes, returned by `box_array`.
+            prefix (str): Key prefix of the category.
+            font_scale (float): Font scale of the labels.
+            color (tuple): BGR color.
+            text_format (str, optional): Label format, with `label` and `confidence` fields.
+            dy (int, optional): Height of the label above the box. Defaults to 10.
+            line_type (int, optional): OpenCV line type. Defaults to cv2.LINE_8.
+
+        Returns:
+            list: (text, origin, font scale, color, thickness, line type) entries.
+        """
+        label_key, confidence_key = f"{prefix}.label", f"{prefix}.confidence"
+        return [(text_format.format(label=obj.get(label_key, ''), confidence=obj.get(confidence_key, 0.0)), (x1, y1 - dy), font_scale, color, 1, line_type)
+                for obj, (x1, y1, _, _) in zip(objs, boxes.tolist())]
+
+    @staticmethod
+    def draw_labels(image, labels):
+        """
+        Draws the labels collected for a frame, after all of its boxes.
+
+        Args:
+            image (numpy.ndarray): The image to draw on.
+            labels (list): (text, origin, font scale, color, thickness, line type) entries.
+        """
+        for text, origin, font_scale, color, thickness, line_type in labels:
+            cv2.putText(image, text, origin, cv2.FONT_HERSHEY_SIMPLEX, font_scale, color, thickness, line_type)
+
+    def _adas_detection_shapes(self, categories):
+        """Convert the DCA/DLA/DMA/DUA boxes, one array per category, and build their labels."""
+        shapes, labels = [], []
+        for objs, color in categories:
+            if not objs:
+                continue
+            boxes = self.box_array(objs, "ADASDetectObj")
+            shapes.append((boxes, color))
+            if self.adas_detection_show_label:
+                labels.extend(self.box_labels(objs, boxes, "ADASDetectObj", 0.35, color))
+        return shapes, labels
+
+    def _draw_adas_detection_shapes(self, image, shapes, labels):
+        for boxes, color in shapes:
+            self.draw_box_array(image, boxes, color, self.adas_detection_thickness)
+        self.draw_labels(image, labels)
+
+    def shapes_rect(self, points=(), labels=(), margin=0):
+        """
+        Computes the bounding rectangle of drawn shapes and labels.
+
+        Args:
+            points (list, optional): Arrays whose last axis holds x, y pairs (boxes as x1, y1, x2, y2 also work).
+            labels (list, optional): Label entries, as drawn by `draw_labels`.
+            margin (int, optional): Added around the points, e.g. the line thickness. Defaults to 0.
+
+        Returns:
+            tuple: (x0, y0, x1, y1), end exclusive, or None if there is nothing to draw.
+        """
+        rects = []
+        for array in points:
+            if len(array):
+                xy = np.asarray(array).reshape(-1, 2)
+                (x0, y0), (x1, y1) = xy.min(axis=0), xy.max(axis=0)
+                rects.append((x0 - margin, y0 - margin, x1 + margin + 1, y1 + margin + 1))
+        for text, (x, y), font_scale, _, thickness, _ in labels:
+            (w, h), baseline = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, font_scale, thickness)
+            pad = thickness + 2
+            rects.append((x - pad, y - h - pad, x + w + pad, y + baseline + pad))
+        if not rects:
+            return None
+        x0, y0, x1, y1 = zip(*rects)
+        return int(min(x0)), int(min(y0)), int(max(x1)), int(max(y1))
+
+    def blend_shapes(self, image, alpha, rect, draw):
+        """
+        Draws shapes with transparency, copying and blending only their bounding rectangle.
+
+        The overlay buffer is allocated once per image shape and reused. Only `rect` of it is
+        refreshed from the image, so `draw` must stay inside `rect`.
+
+        Args:
+            image (numpy.ndarray): The image, modified in place.
+            alpha (float): Opacity of the shapes. 0 skips them, 1 draws them straight on the image.
+            rect (tuple): Bounding rectangle (x0, y0, x1, y1) of the shapes, from `shapes_rect`.
+            draw (callable): Draws the shapes, called with the target image.
+        """
+        if alpha <= 0 or rect is None:
+            return
+        if alpha >= 1:
+            draw(image)
+            return
+
+        height, width = image.shape[:2]
+        x0, y0, x1, y1 = max(rect[0], 0), max(rect[1], 0), min(rect[2], width), min(rect[3], height)
+        if x0 >= x1 or y0 >= y1:
+            return
+        overlay = self.overlay_buffers.get(image.shape)
+        if overlay is None:
+            overlay = self.overlay_buffers[image.shape] = np.empty_like(image)
+        overlay[y0:y1, x0:x1] = image[y0:y1, x0:x1]
+        draw(overlay)
+        roi = image[y0:y1, x0:x1]
+        cv2.addWeighted(overlay[y0:y1, x0:x1], alpha, roi, 1 - alpha, 0, roi)
+
     def process_json_log(self,json_log, img_buffer=None, device_image_path=None):
         """
         Processes a JSON log, performs various visualizations and actions based on its content, and handles exceptions.
@@ -42,7 +293,7 @@ class Drawer(BaseDataset):
             - Retrieves data related to tailing objects, vanish line, ADAS (Advanced Driver Assistance Systems) alerts, and lane information from the JSON.
         3. **Image Processing**:
             - Constructs the path for the corresponding image file and reads it using OpenCV.
-            - Resizes the image to the dimensions specified by the model.
+            - Loads the image at the output size (`resize_w` x `resize_h` if enabled, else the model size) with a single resize.
             - Annotates the image with the `frame_ID` text.
         4. **ADAS Alerts**:
             - Checks and displays ADAS alerts such as Forward Collision Warning (FCW) and Lane Departure Warning (LDW) if enabled.
@@ -56,8 +307,8 @@ class Drawer(BaseDataset):
             - Optionally draws corners of bounding boxes based on distance to the camera.
         8. **Lane Information**:
             - Draws lane lines and overlays the image with lane information if detected.
-        9. **Image Resizing**:
-            - Resizes the final image to the dimensions specified by `resize_w` and `resize_h` if enabled.
+        9. **Coordinates**:
+            - All JSON coordinates are mapped from model space to the output size, so the image is not resized again.
         10. **Displaying and Saving Results**:
             - Displays the processed image in a window if enabled, with different wait times based on ADAS status.
             - Saves the processed image and JSON log to files if enabled.
@@ -68,535 +319,517 @@ class Drawer(BaseDataset):
         - Catches and logs any other unexpected exceptions.
         """
         try:
-            log_data = json.loads(json_log)
-            # logging.info("=======================================================================================")
-            # logging.info("Received [JSON]: %s", json.dumps(log_data))
-            # logging.info("=======================================================================================")
-            # print("Received JSON:", json.dumps(log_data, indent=4))  # Print formatted JSON
+            result = self.render_json_log(json_log, img_buffer, device_image_path)
+            if self.show_airesultimage:
+                self.show_result(result)
+            self.save_result(result, json_log, device_image_path)
+        except KeyError as e:
+            logging.error(f"❌ KeyError: {e} - The key might be missing in the JSON data.")
+        except json.JSONDecodeError as e:
+            logging.error(f"❌ JSONDecodeError: {e} - The JSON data might be malformed.")
+        except Exception as e:
+            logging.error(f"❌ Error: {e} - An unexpected error occurred.")
 
-            frame_ID = list(log_data["frame_ID"].keys())[0]  # Extract the first frame_ID key
-            
-            
-            tailing_objs = log_data["frame_ID"][frame_ID]["tailingObj"]
-            vanishline_objs = log_data["frame_ID"][frame_ID]["vanishLine"]
-            ADAS_objs = log_data["frame_ID"][frame_ID]["ADAS"]
-            lane_info = log_data["frame_ID"][frame_ID]["LaneInfo"]
-            # Alister add 2024-08-27
-            detect_DCA_objs = None
-            if "ADASDetectObj" in log_data["frame_ID"][frame_ID]:
-                if "DCA" in log_data["frame_ID"][frame_ID]["ADASDetectObj"]:
-                    detect_DCA_objs = log_data["frame_ID"][frame_ID]["ADASDetectObj"]["DCA"]
-
-            detect_DLA_objs = None
-            if "ADASDetectObj" in log_data["frame_ID"][frame_ID]:
-                if "DLA" in log_data["frame_ID"][frame_ID]["ADASDetectObj"]:
-                    detect_DLA_objs = log_data["frame_ID"][frame_ID]["ADASDetectObj"]["DLA"]
-
-            detect_DMA_objs = None
-            if "ADASDetectObj" in log_data["frame_ID"][frame_ID]:
-                if "DMA" in log_data["frame_ID"][frame_ID]["ADASDetectObj"]:
-                    detect_DMA_objs = log_data["frame_ID"][frame_ID]["ADASDetectObj"]["DMA"]
-
-            detect_DUA_objs = None
-            if "ADASDetectObj" in log_data["frame_ID"][frame_ID]:
-                if "DUA" in log_data["frame_ID"][frame_ID]["ADASDetectObj"]:
-                    detect_DUA_objs = log_data["frame_ID"][frame_ID]["ADASDetectObj"]["DUA"]
-
-            detect_objs = None
-            if "detectObj" in log_data["frame_ID"][frame_ID]:
-                if "VEHICLE" in log_data["frame_ID"][frame_ID]["detectObj"]:
-                    detect_objs = log_data["frame_ID"][frame_ID]["detectObj"]["VEHICLE"]
-
-
-            detect_human_objs = None
-            if "detectObj" in log_data["frame_ID"][frame_ID]:
-                if "HUMAN" in log_data["frame_ID"][frame_ID]["detectObj"]:
-                    detect_human_objs = log_data["frame_ID"][frame_ID]["detectObj"]["HUMAN"]
-
-            detect_track_objs = None
-            if "trackObj" in log_data["frame_ID"][frame_ID]:
-                detect_track_objs = log_data["frame_ID"][frame_ID]["trackObj"]
-                    
 
 
-            image_path = f"{self.im_dir}/{self.image_basename}{frame_ID}.{self.image_format}"
-            # logging.info(image_path)
+    def render_json_log(self, json_log, img_buffer=None, device_image_path=None):
+        """
+        Parses a JSON log and draws its AI results onto the frame image, without displaying or saving it.
 
-            if os.path.exists(image_path):
-                image = cv2.imread(image_path)
-                image = cv2.resize(image, (self.model_w, self.model_h), interpolation=cv2.INTER_AREA)
-                image = cv2.resize(image, (self.resize_w, self.resize_h), interpolation=cv2.INTER_AREA)
-            else:
-                image = img_buffer
-                image = cv2.resize(image, (self.model_w, self.model_h), interpolation=cv2.INTER_AREA)
-                image = cv2.resize(image, (self.resize_w, self.resize_h), interpolation=cv2.INTER_AREA)
+        Args:
+            json_log (str): JSON formatted string containing log data.
+            img_buffer (numpy.ndarray, optional): Decoded frame, used when the image is not found in `im_dir`.
+            device_image_path (str, optional): Image path on the device (historical mode), its folder name is drawn.
+
+        Returns:
+            dict: The frame ID (`frame_ID`), the parsed log (`log_data`), the annotated image (`image`)
+                and whether an ADAS alert is raised (`alert`).
+
+        Raises:
+            KeyError: If a required key is missing in the JSON data.
+            json.JSONDecodeError: If the JSON data is malformed.
+        """
+        laps = latency.tracker.laps()
+        log_data = json.loads(json_log)
+        # logging.info("=======================================================================================")
+        # logging.info("Received [JSON]: %s", json.dumps(log_data))
+        # logging.info("=======================================================================================")
+        # print("Received JSON:", json.dumps(log_data, indent=4))  # Print formatted JSON
+
+        frame_ID = list(log_data["frame_ID"].keys())[0]  # Extract the first frame_ID key
+        
+        
+        tailing_objs = log_data["frame_ID"][frame_ID]["tailingObj"]
+        vanishline_objs = log_data["frame_ID"][frame_ID]["vanishLine"]
+        ADAS_objs = log_data["frame_ID"][frame_ID]["ADAS"]
+        lane_info = log_data["frame_ID"][frame_ID]["LaneInfo"]
+        # Alister add 2024-08-27
+        detect_DCA_objs = None
+        if "ADASDetectObj" in log_data["frame_ID"][frame_ID]:
+            if "DCA" in log_data["frame_ID"][frame_ID]["ADASDetectObj"]:
+                detect_DCA_objs = log_data["frame_ID"][frame_ID]["ADASDetectObj"]["DCA"]
+
+        detect_DLA_objs = None
+        if "ADASDetectObj" in log_data["frame_ID"][frame_ID]:
+            if "DLA" in log_data["frame_ID"][frame_ID]["ADASDetectObj"]:
+                detect_DLA_objs = log_data["frame_ID"][frame_ID]["ADASDetectObj"]["DLA"]
+
+        detect_DMA_objs = None
+        if "ADASDetectObj" in log_data["frame_ID"][frame_ID]:
+            if "DMA" in log_data["frame_ID"][frame_ID]["ADASDetectObj"]:
+                detect_DMA_objs = log_data["frame_ID"][frame_ID]["ADASDetectObj"]["DMA"]
+
+        detect_DUA_objs = None
+        if "ADASDetectObj" in log_data["frame_ID"][frame_ID]:
+            if "DUA" in log_data["frame_ID"][frame_ID]["ADASDetectObj"]:
+                detect_DUA_objs = log_data["frame_ID"][frame_ID]["ADASDetectObj"]["DUA"]
+
+        detect_objs = None
+        if "detectObj" in log_data["frame_ID"][frame_ID]:
+            if "VEHICLE" in log_data["frame_ID"][frame_ID]["detectObj"]:
+                detect_objs = log_data["frame_ID"][frame_ID]["detectObj"]["VEHICLE"]
+
+
+        detect_human_objs = None
+        if "detectObj" in log_data["frame_ID"][frame_ID]:
+            if "HUMAN" in log_data["frame_ID"][frame_ID]["detectObj"]:
+                detect_human_objs = log_data["frame_ID"][frame_ID]["detectObj"]["HUMAN"]
+
+        detect_track_objs = None
+        if "trackObj" in log_data["frame_ID"][frame_ID]:
+            detect_track_objs = log_data["frame_ID"][frame_ID]["trackObj"]
+                
+
+
+        laps.lap('json_parse')
+        image_path = f"{self.im_dir}/{self.image_basename}{frame_ID}.{self.image_format}"
+        # logging.info(image_path)
 
-            if self.resize:
-                scale_w = self.resize_w / self.model_w
-                scale_h = self.resize_h / self.model_h
+        image = self.load_frame(image_path, img_buffer)
+        laps.lap('resize')
+        scale_w = self.scale_w
+        scale_h = self.scale_h
+
+
+        cv2.putText(image, 'frame_ID:'+str(frame_ID), (int(10*scale_w),int(15*scale_h)), cv2.FONT_HERSHEY_SIMPLEX,0.60*scale_h, (0, 255, 255), int(1*scale_h), cv2.LINE_AA)
+
+        
+
+
+        if self.show_adas_detection:
+            shapes, labels = self._adas_detection_shapes(((detect_DCA_objs, self.DCA_color),
+                                                          (detect_DLA_objs, self.DLA_color),
+                                                          (detect_DMA_objs, self.DMA_color),
+                                                          (detect_DUA_objs, self.DUA_color)))
+            self._draw_adas_detection_shapes(image, shapes, labels)
+
+        laps.lap('draw_adas_detection')
+        if self.show_adasobjs:
+            for obj in ADAS_objs:
+                self.ADAS_FCW = obj["FCW"]
+                self.ADAS_LDW = obj["LDW"]
+                # logging.info(f'ADAS_FCW:{self.ADAS_FCW}')
+                # logging.info(f'ADAS_LDW:{self.ADAS_LDW}')
+                if self.ADAS_FCW==True or self.ADAS_FCW==1 or self.ADAS_FCW=="true":
+                    cv2.putText(image, 'Forward Collision', (80,80), cv2.FONT_HERSHEY_SIMPLEX,1.3, (0, 0, 255), 2, cv2.LINE_AA)
+                if self.ADAS_LDW==True or self.ADAS_LDW==1 or self.ADAS_FCW=="true":
+                    cv2.putText(image, 'Lane Departure', (80,100), cv2.FONT_HERSHEY_SIMPLEX,1.3, (0, 0, 255), 2, cv2.LINE_AA)
+
+        laps.lap('draw_adas')
+        if self.show_vanishline:
+            for obj in vanishline_objs:
+                vanishlineY = int(obj["vanishLineY"] * scale_h)
+                x2 = int(image.shape[1] * scale_w)
+                cv2.line(image, (0, vanishlineY), (x2, vanishlineY), (0, 255, 255), thickness=1)
+                cv2.putText(image, 'VanishLineY:' + str(round(vanishlineY,3)), (int(10*scale_w),int(30*scale_h)), cv2.FONT_HERSHEY_SIMPLEX,0.45*scale_h, (0, 255, 255), int(1*scale_h), cv2.LINE_AA)
+        
+        laps.lap('draw_vanish_line')
+        labels = []
+        if self.show_detectobjs and detect_human_objs:
+            boxes = self.box_array(detect_human_objs, "detectObj")
+            self.draw_box_array(image, boxes, (255, 0, 255), 2)
+            if self.show_detectobjinfo:
+                labels.extend(self.box_labels(detect_human_objs, boxes, "detectObj", 0.35, (255, 0, 255)))
+
+        if self.show_detectobjs and detect_objs:
+            boxes = self.box_array(detect_objs, "detectObj")
+            if tailing_objs:
+                # The box of the (last) tailing object is drawn with it, only its confidence goes here
+                tailing = tailing_objs[-1]
+                tailing_x1, tailing_y1 = int(tailing["tailingObj.x1"]*scale_w), int(tailing["tailingObj.y1"]*scale_h)
+                others = (boxes[:, 0] != tailing_x1) & (boxes[:, 1] != tailing_y1)
+                same = (boxes[:, 0] == tailing_x1) & (boxes[:, 1] == tailing_y1)
             else:
-                scale_w = 1
-                scale_h = 1
+                others = np.ones(len(boxes), dtype=bool)
+                same = np.zeros(len(boxes), dtype=bool)
+
+            self.draw_box_array(image, boxes[others], (255, 200, 0), 2)
+            if self.show_detectobjinfo:
+                labels.extend(self.box_labels([obj for obj, keep in zip(detect_objs, others) if keep], boxes[others],
+                                              "detectObj", 0.35, (255, 200, 0)))
+                labels.extend(self.box_labels([obj for obj, keep in zip(detect_objs, same) if keep], boxes[same],
+                                              "detectObj", 0.45, (0, 255, 255), text_format="Conf:{confidence:.2f}", dy=45))
+        self.draw_labels(image, labels)
+
+        laps.lap('draw_detect_objs')
+        if detect_track_objs is not None and self.show_trackobjs:
+            for obj in detect_track_objs:
+                trackObj_x1, trackObj_y1 = int(obj["trackObj.x1"]*scale_w), int(obj["trackObj.y1"]*scale_h)
+                trackObj_x2, trackObj_y2 = int(obj["trackObj.x2"]*scale_w), int(obj["trackObj.y2"]*scale_h)
+                distance = obj["trackObj.distanceToCamera"]
+                id = obj["trackObj.id"]
+                
+                im = image
+                color = (0,255,255)
+                if self.showtailobjBB_corner:
+                    top_left = (trackObj_x1, trackObj_y1)
+                    bottom_right = (trackObj_x2, trackObj_y2)
+                    top_right = (trackObj_x2,trackObj_y1)
+                    bottom_left = (trackObj_x1,trackObj_y2) 
+                    BB_width = abs(trackObj_x2 - trackObj_x1)
+                    BB_height = abs(trackObj_y2 - trackObj_y1)
+                    divide_length = 5
 
+                    if distance>15:
+                        color = (0,255,255)
+                        thickness = 1
+                        text_thickness = 0.40
 
-            cv2.putText(image, 'frame_ID:'+str(frame_ID), (int(10*scale_w),int(15*scale_h)), cv2.FONT_HERSHEY_SIMPLEX,0.60*scale_h, (0, 255, 255), int(1*scale_h), cv2.LINE_AA)
+                    if distance>=10 and distance<=15:
+                        color = (0,255,255)
+                        thickness = 2
+                        text_thickness = 0.40
+                    elif distance>=7 and distance<10:
+                        color = (0,100,255)
+                        thickness = 5
+                        text_thickness = 0.46
+                    elif distance<7:
+                        color = (0,25,255)
+                        thickness = 7
+                        text_thickness = 0.50
+                    # Draw corner of the rectangle
+                    cv2.line(im, top_left, (top_left[0]+int(BB_width/divide_length), top_left[1]), color, thickness)
+                    cv2.line(im, top_left, (top_left[0], top_left[1] + int(BB_height/divide_length)), color, thickness)
 
-            
+                    cv2.line(im, bottom_right,(bottom_right[0] - int(BB_width/divide_length),bottom_right[1]), color, thickness)
+                    cv2.line(im, bottom_right,(bottom_right[0],bottom_right[1] - int(BB_height/divide_length) ), color, thickness)
 
 
-            if self.show_adas_detection:
-                if detect_DCA_objs:
-                    for obj in detect_DCA_objs:
-                        x1, y1 = int(obj["ADASDetectObj.x1"]*scale_w), int(obj["ADASDetectObj.y1"]*scale_h)
-                        x2, y2 = int(obj["ADASDetectObj.x2"]*scale_w), int(obj["ADASDetectObj.y2"]*scale_h)
-                        confidence = obj["ADASDetectObj.confidence"]
-                        label = obj["ADASDetectObj.label"]
-                        
-                        cv2.rectangle(image, (x1, y1), (x2, y2), (255, 128, 0), self.adas_detection_thickness)
-                        if self.adas_detection_show_label:
-                            cv2.putText(image, f"{label} ({confidence:.2f})", (x1, y1 - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.35, self.DCA_color, 1)
-
-                if detect_DLA_objs:
-                    for obj in detect_DLA_objs:
-                        x1, y1 = int(obj["ADASDetectObj.x1"]*scale_w), int(obj["ADASDetectObj.y1"]*scale_h)
-                        x2, y2 = int(obj["ADASDetectObj.x2"]*scale_w), int(obj["ADASDetectObj.y2"]*scale_h)
-                        confidence = obj["ADASDetectObj.confidence"]
-                        label = obj["ADASDetectObj.label"]
-                        
-                        cv2.rectangle(image, (x1, y1), (x2, y2), (255, 0, 128), self.adas_detection_thickness)
-                        if self.adas_detection_show_label:
-                            cv2.putText(image, f"{label} ({confidence:.2f})", (x1, y1 - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.35, self.DLA_color, 1)
-
-
-                if detect_DMA_objs:
-                    for obj in detect_DMA_objs:
-                        x1, y1 = int(obj["ADASDetectObj.x1"]*scale_w), int(obj["ADASDetectObj.y1"]*scale_h)
-                        x2, y2 = int(obj["ADASDetectObj.x2"]*scale_w), int(obj["ADASDetectObj.y2"]*scale_h)
-                        confidence = obj["ADASDetectObj.confidence"]
-                        label = obj["ADASDetectObj.label"]
-                        
-                        cv2.rectangle(image, (x1, y1), (x2, y2), (0, 128, 255), self.adas_detection_thickness)
-                        if self.adas_detection_show_label:
-                            cv2.putText(image, f"{label} ({confidence:.2f})", (x1, y1 - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.35, self.DMA_color, 1)
-
-
-                if detect_DUA_objs:
-                    for obj in detect_DUA_objs:
-                        x1, y1 = int(obj["ADASDetectObj.x1"]*scale_w), int(obj["ADASDetectObj.y1"]*scale_h)
-                        x2, y2 = int(obj["ADASDetectObj.x2"]*scale_w), int(obj["ADASDetectObj.y2"]*scale_h)
-                        confidence = obj["ADASDetectObj.confidence"]
-                        label = obj["ADASDetectObj.label"]
-                        
-                        cv2.rectangle(image, (x1, y1), (x2, y2), (128, 0, 255), self.adas_detection_thickness)
-                        if self.adas_detection_show_label:
-                            cv2.putText(image, f"{label} ({confidence:.2f})", (x1, y1 - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.35, self.DUA_color, 1)
-
-
-            if self.show_adasobjs:
-                for obj in ADAS_objs:
-                    self.ADAS_FCW = obj["FCW"]
-                    self.ADAS_LDW = obj["LDW"]
-                    # logging.info(f'ADAS_FCW:{self.ADAS_FCW}')
-                    # logging.info(f'ADAS_LDW:{self.ADAS_LDW}')
-                    if self.ADAS_FCW==True or self.ADAS_FCW==1 or self.ADAS_FCW=="true":
-                        cv2.putText(image, 'Forward Collision', (80,80), cv2.FONT_HERSHEY_SIMPLEX,1.3, (0, 0, 255), 2, cv2.LINE_AA)
-                    if self.ADAS_LDW==True or self.ADAS_LDW==1 or self.ADAS_FCW=="true":
-                        cv2.putText(image, 'Lane Departure', (80,100), cv2.FONT_HERSHEY_SIMPLEX,1.3, (0, 0, 255), 2, cv2.LINE_AA)
-
-            if self.show_vanishline:
-                for obj in vanishline_objs:
-                    vanishlineY = int(obj["vanishLineY"] * scale_h)
-                    x2 = int(image.shape[1] * scale_w)
-                    cv2.line(image, (0, vanishlineY), (x2, vanishlineY), (0, 255, 255), thickness=1)
-                    cv2.putText(image, 'VanishLineY:' + str(round(vanishlineY,3)), (int(10*scale_w),int(30*scale_h)), cv2.FONT_HERSHEY_SIMPLEX,0.45*scale_h, (0, 255, 255), int(1*scale_h), cv2.LINE_AA)
-            
-            if self.show_detectobjs and detect_human_objs:
-                for obj in detect_human_objs:
-                    x1, y1 = int(obj["detectObj.x1"]*scale_w), int(obj["detectObj.y1"]*scale_h)
-                    x2, y2 = int(obj["detectObj.x2"]*scale_w), int(obj["detectObj.y2"]*scale_h)
-                    confidence = obj["detectObj.confidence"]
-                    label = obj["detectObj.label"]
-                    
-                    cv2.rectangle(image, (x1, y1), (x2, y2), (255, 0, 255), 2)
-                    if self.show_detectobjinfo:
-                        cv2.putText(image, f"{label} ({confidence:.2f})", (x1, y1 - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.35, (255, 0, 255), 1)
-                 
-
-
-            if self.show_detectobjs and detect_objs is not None:
-                if tailing_objs:
-                    for obj in tailing_objs:
-                        tailingObj_x1, tailingObj_y1 = int(obj["tailingObj.x1"]*scale_w), int(obj["tailingObj.y1"]*scale_h)
-                        tailingObj_x2, tailingObj_y2 = int(obj["tailingObj.x2"]*scale_w), int(obj["tailingObj.y2"]*scale_h)
-                        distance = obj["tailingObj.distanceToCamera"]
-                        label = obj["tailingObj.label"]
-                        distance_to_camera = obj['tailingObj.distanceToCamera']
-                        tailingObj_id = obj['tailingObj.id']
-                        tailingObj_label = obj['tailingObj.label']
-
-
-                for obj in detect_objs:
-                    x1, y1 = int(obj["detectObj.x1"]*scale_w), int(obj["detectObj.y1"]*scale_h)
-                    x2, y2 = int(obj["detectObj.x2"]*scale_w), int(obj["detectObj.y2"]*scale_h)
-                    confidence = obj["detectObj.confidence"]
-                    label = obj["detectObj.label"]
-                    if tailingObj_x1!=x1 and tailingObj_y1!=y1:
-                        cv2.rectangle(image, (x1, y1), (x2, y2), (255, 200, 0), 2)
-                        if self.show_detectobjinfo:
-                            cv2.putText(image, f"{label} ({confidence:.2f})", (x1, y1 - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.35, (255, 200, 0), 1)
-                    elif tailingObj_x1==x1 and tailingObj_y1==y1:
-                        if self.show_detectobjinfo:
-                            cv2.putText(image, f"Conf:{confidence:.2f}", (x1, y1 - 45), cv2.FONT_HERSHEY_SIMPLEX, 0.45, (0, 255, 255), 1)
-
-            if detect_track_objs is not None and self.show_trackobjs:
-                for obj in detect_track_objs:
-                    trackObj_x1, trackObj_y1 = int(obj["trackObj.x1"]*scale_w), int(obj["trackObj.y1"]*scale_h)
-                    trackObj_x2, trackObj_y2 = int(obj["trackObj.x2"]*scale_w), int(obj["trackObj.y2"]*scale_h)
-                    distance = obj["trackObj.distanceToCamera"]
-                    id = obj["trackObj.id"]
-                    
-                    im = image
-                    color = (0,255,255)
-                    if self.showtailobjBB_corner:
-                        top_left = (trackObj_x1, trackObj_y1)
-                        bottom_right = (trackObj_x2, trackObj_y2)
-                        top_right = (trackObj_x2,trackObj_y1)
-                        bottom_left = (trackObj_x1,trackObj_y2) 
-                        BB_width = abs(trackObj_x2 - trackObj_x1)
-                        BB_height = abs(trackObj_y2 - trackObj_y1)
-                        divide_length = 5
-
-                        if distance>15:
-                            color = (0,255,255)
-                            thickness = 1
-                            text_thickness = 0.40
-
-                        if distance>=10 and distance<=15:
-                            color = (0,255,255)
-                            thickness = 2
-                            text_thickness = 0.40
-                        elif distance>=7 and distance<10:
-                            color = (0,100,255)
-                            thickness = 5
-                            text_thickness = 0.46
-                        elif distance<7:
-                            color = (0,25,255)
-                            thickness = 7
-                            text_thickness = 0.50
-                        # Draw corner of the rectangle
-                        cv2.line(im, top_left, (top_left[0]+int(BB_width/divide_length), top_left[1]), color, thickness)
-                        cv2.line(im, top_left, (top_left[0], top_left[1] + int(BB_height/divide_length)), color, thickness)
-
-                        cv2.line(im, bottom_right,(bottom_right[0] - int(BB_width/divide_length),bottom_right[1]), color, thickness)
-                        cv2.line(im, bottom_right,(bottom_right[0],bottom_right[1] - int(BB_height/divide_length) ), color, thickness)
-
-
-                        cv2.line(im, top_right, ((top_right[0]-int(BB_width/divide_length)), top_right[1]), color, thickness)
-                        cv2.line(im, top_right, (top_right[0], (top_right[1]+int(BB_height/divide_length))), color, thickness)
-
-                        cv2.line(im, bottom_left, ((bottom_left[0]+int(BB_width/divide_length)), bottom_left[1]), color, thickness)
-                        cv2.line(im, bottom_left, (bottom_left[0], (bottom_left[1]-int(BB_height/divide_length))), color, thickness)
-                    elif not self.showtailobjBB_corner:
-                        cv2.rectangle(im, (trackObj_x1, trackObj_y1), (trackObj_x2, trackObj_y2), color=(0,255,255), thickness=2)
-                        # cv2.putText(image, f"{label} ({distance:.2f}m)", (tailingObj_x1, tailingObj_y1 - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 255), 2)
-                    if True:
-                        if not self.showtailobjBB_corner:
-                            cv2.putText(im, f'ID:{id}', (trackObj_x1, trackObj_y1-10), cv2.FONT_HERSHEY_SIMPLEX, text_thickness, color, 1, cv2.LINE_AA)
-                            cv2.putText(im, 'D:' + str(round(distance,3)) + 'm', (trackObj_x1, trackObj_y1-25), cv2.FONT_HERSHEY_SIMPLEX,text_thickness+0.05, color, 1, cv2.LINE_AA)
-                        else:
-                            # Get text size for label
-                          
-                            text_label = f'{id}'
-                            text_distance = f'Dist:{round(distance,3)}m'
-                            font = cv2.FONT_HERSHEY_SIMPLEX
-
-                            text_size_label, _ = cv2.getTextSize(text_label, font, text_thickness, 1)
-                            text_size_distance, _ = cv2.getTextSize(text_distance, font, text_thickness + 0.05, 1)
-
-                            # Calculate the rectangle size
-                            rect_x1 = trackObj_x1
-                            rect_y1 = trackObj_y1 - 10 -  text_size_label[1]  # Adjust height to fit text
-                            rect_x2 = trackObj_x1 + text_size_label[0]
-                            rect_y2 = trackObj_y1 - 10  # Adjust height to fit text
-
-                            # Draw the rectangle
-                            cv2.rectangle(im, (rect_x1, rect_y1), (rect_x2, rect_y2), (0, 0, 0), -1)
-
-                            # # Calculate the rectangle size
-                            # rect_x1_d = trackObj_x1
-                            # rect_y1_d = trackObj_y1 - 25 - text_size_distance[1]  # Adjust height to fit text
-                            # rect_x2_d = trackObj_x1 + text_size_distance[0]
-                            # rect_y2_d = trackObj_y1 - 25    # Adjust height to fit text
-
-                            # # Draw the rectangle
-                            # cv2.rectangle(im, (rect_x1_d, rect_y1_d), (rect_x2_d, rect_y2_d), (100, 100, 100), -1)
-
-                            # Draw the text
-                            cv2.putText(im, text_label, (trackObj_x1, trackObj_y1 - 10), font, text_thickness, color, 1, cv2.LINE_AA)
-                            # cv2.putText(im, text_distance, (trackObj_x1, trackObj_y1 - 25), font, text_thickness + 0.05, color, 1, cv2.LINE_AA)
-
-
-            text_thickness = 0.45
-            if self.show_tailingobjs and tailing_objs:
+                    cv2.line(im, top_right, ((top_right[0]-int(BB_width/divide_length)), top_right[1]), color, thickness)
+                    cv2.line(im, top_right, (top_right[0], (top_right[1]+int(BB_height/divide_length))), color, thickness)
+
+                    cv2.line(im, bottom_left, ((bottom_left[0]+int(BB_width/divide_length)), bottom_left[1]), color, thickness)
+                    cv2.line(im, bottom_left, (bottom_left[0], (bottom_left[1]-int(BB_height/divide_length))), color, thickness)
+                elif not self.showtailobjBB_corner:
+                    cv2.rectangle(im, (trackObj_x1, trackObj_y1), (trackObj_x2, trackObj_y2), color=(0,255,255), thickness=2)
+                    # cv2.putText(image, f"{label} ({distance:.2f}m)", (tailingObj_x1, tailingObj_y1 - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 255), 2)
+                if True:
+                    if not self.showtailobjBB_corner:
+                        cv2.putText(im, f'ID:{id}', (trackObj_x1, trackObj_y1-10), cv2.FONT_HERSHEY_SIMPLEX, text_thickness, color, 1, cv2.LINE_AA)
+                        cv2.putText(im, 'D:' + str(round(distance,3)) + 'm', (trackObj_x1, trackObj_y1-25), cv2.FONT_HERSHEY_SIMPLEX,text_thickness+0.05, color, 1, cv2.LINE_AA)
+                    else:
+                        # Get text size for label
+                      
+                        text_label = f'{id}'
+                        text_distance = f'Dist:{round(distance,3)}m'
+                        font = cv2.FONT_HERSHEY_SIMPLEX
+
+                        text_size_label, _ = cv2.getTextSize(text_label, font, text_thickness, 1)
+                        text_size_distance, _ = cv2.getTextSize(text_distance, font, text_thickness + 0.05, 1)
+
+                        # Calculate the rectangle size
+                        rect_x1 = trackObj_x1
+                        rect_y1 = trackObj_y1 - 10 -  text_size_label[1]  # Adjust height to fit text
+                        rect_x2 = trackObj_x1 + text_size_label[0]
+                        rect_y2 = trackObj_y1 - 10  # Adjust height to fit text
+
+                        # Draw the rectangle
+                        cv2.rectangle(im, (rect_x1, rect_y1), (rect_x2, rect_y2), (0, 0, 0), -1)
+
+                        # # Calculate the rectangle size
+                        # rect_x1_d = trackObj_x1
+                        # rect_y1_d = trackObj_y1 - 25 - text_size_distance[1]  # Adjust height to fit text
+                        # rect_x2_d = trackObj_x1 + text_size_distance[0]
+                        # rect_y2_d = trackObj_y1 - 25    # Adjust height to fit text
+
+                        # # Draw the rectangle
+                        # cv2.rectangle(im, (rect_x1_d, rect_y1_d), (rect_x2_d, rect_y2_d), (100, 100, 100), -1)
+
+                        # Draw the text
+                        cv2.putText(im, text_label, (trackObj_x1, trackObj_y1 - 10), font, text_thickness, color, 1, cv2.LINE_AA)
+                        # cv2.putText(im, text_distance, (trackObj_x1, trackObj_y1 - 25), font, text_thickness + 0.05, color, 1, cv2.LINE_AA)
+
+
+        laps.lap('draw_track_objs')
+        text_thickness = 0.45
+        if self.show_tailingobjs and tailing_objs:
+            custom_text_thickness = 0.45
+            if self.tailingobjs_text_size is not None:
+                custom_text_thickness = self.tailingobjs_text_size
+            else:
                 custom_text_thickness = 0.45
-                if self.tailingobjs_text_size is not None:
-                    custom_text_thickness = self.tailingobjs_text_size
-                else:
-                    custom_text_thickness = 0.45
 
 
+            custom_color = (0,255,255)
+            if self.tailingobjs_BB_colorB is not None and \
+                self.tailingobjs_BB_colorG is not None and \
+                self.tailingobjs_BB_colorR is not None:
+                custom_color = (self.tailingobjs_BB_colorB,self.tailingobjs_BB_colorG,self.tailingobjs_BB_colorR)
+            else:
                 custom_color = (0,255,255)
-                if self.tailingobjs_BB_colorB is not None and \
-                    self.tailingobjs_BB_colorG is not None and \
-                    self.tailingobjs_BB_colorR is not None:
-                    custom_color = (self.tailingobjs_BB_colorB,self.tailingobjs_BB_colorG,self.tailingobjs_BB_colorR)
-                else:
-                    custom_color = (0,255,255)
 
+            custom_thickness = 2
+            if self.tailingobjs_BB_thickness is not None:
+                custom_thickness = self.tailingobjs_BB_thickness
+            else:
                 custom_thickness = 2
-                if self.tailingobjs_BB_thickness is not None:
-                    custom_thickness = self.tailingobjs_BB_thickness
-                else:
-                    custom_thickness = 2
 
 
-                for obj in tailing_objs:
-                    tailingObj_x1, tailingObj_y1 = int(obj["tailingObj.x1"]*scale_w), int(obj["tailingObj.y1"]*scale_h)
-                    tailingObj_x2, tailingObj_y2 = int(obj["tailingObj.x2"]*scale_w), int(obj["tailingObj.y2"]*scale_h)
-                    distance = obj["tailingObj.distanceToCamera"]
-                    label = obj["tailingObj.label"]
-                    distance_to_camera = obj['tailingObj.distanceToCamera']
-                    tailingObj_id = obj['tailingObj.id']
-                    tailingObj_label = obj['tailingObj.label']
-                    # ttc = obj['tailingObj.currTTC']
+            for obj in tailing_objs:
+                tailingObj_x1, tailingObj_y1 = int(obj["tailingObj.x1"]*scale_w), int(obj["tailingObj.y1"]*scale_h)
+                tailingObj_x2, tailingObj_y2 = int(obj["tailingObj.x2"]*scale_w), int(obj["tailingObj.y2"]*scale_h)
+                distance = obj["tailingObj.distanceToCamera"]
+                label = obj["tailingObj.label"]
+                distance_to_camera = obj['tailingObj.distanceToCamera']
+                tailingObj_id = obj['tailingObj.id']
+                tailingObj_label = obj['tailingObj.label']
+                # ttc = obj['tailingObj.currTTC']
 
-                    # cv2.rectangle(image, (x1, y1), (x2, y2), (0, 0, 255), 2)
-                    if self.show_distancetitle:
-                        text = f"Distance:{round(distance_to_camera,self.tailingobjs_distance_decimal_length)}m" 
-                        xy = (int((self.model_w/4.0)*scale_w), int((self.model_h*11.0/12.0)*scale_h))
-                        cv2.putText(image, text, xy, cv2.FONT_HERSHEY_SIMPLEX,1.0*scale_h, (0,255,255), int(2*scale_h), cv2.LINE_AA)
+                # cv2.rectangle(image, (x1, y1), (x2, y2), (0, 0, 255), 2)
+                if self.show_distancetitle:
+                    text = f"Distance:{round(distance_to_camera,self.tailingobjs_distance_decimal_length)}m" 
+                    xy = (int((self.model_w/4.0)*scale_w), int((self.model_h*11.0/12.0)*scale_h))
+                    cv2.putText(image, text, xy, cv2.FONT_HERSHEY_SIMPLEX,1.0*scale_h, (0,255,255), int(2*scale_h), cv2.LINE_AA)
 
-                    im = image
-                    color = (0,255,255)
-                    if self.showtailobjBB_corner and self.show_tailingobjs:
-                        top_left = (tailingObj_x1, tailingObj_y1)
-                        bottom_right = (tailingObj_x2, tailingObj_y2)
-                        top_right = (tailingObj_x2,tailingObj_y1)
-                        bottom_left = (tailingObj_x1,tailingObj_y2) 
-                        BB_width = abs(tailingObj_x2 - tailingObj_x1)
-                        BB_height = abs(tailingObj_y2 - tailingObj_y1)
-                        divide_length = 5
-
-                        if distance>15:
-                            color = (0,255,255)
-                            thickness = 1
-                            text_thickness = 0.40
-
-                        if distance>=10 and distance<=15:
-                            color = (0,255,255)
-                            thickness = 2
-                            text_thickness = 0.40
-                        elif distance>=7 and distance<10:
-                            color = (0,100,255)
-                            thickness = 5
-                            text_thickness = 0.46
-                        elif distance<7:
-                            color = (0,25,255)
-                            thickness = 7
-                            text_thickness = 0.50
-                        # Draw corner of the rectangle
-                        cv2.line(im, top_left, (top_left[0]+int(BB_width/divide_length), top_left[1]), color, thickness)
-                        cv2.line(im, top_left, (top_left[0], top_left[1] + int(BB_height/divide_length)), color, thickness)
-
-                        cv2.line(im, bottom_right,(bottom_right[0] - int(BB_width/divide_length),bottom_right[1]), color, thickness)
-                        cv2.line(im, bottom_right,(bottom_right[0],bottom_right[1] - int(BB_height/divide_length) ), color, thickness)
-
-
-                        cv2.line(im, top_right, ((top_right[0]-int(BB_width/divide_length)), top_right[1]), color, thickness)
-                        cv2.line(im, top_right, (top_right[0], (top_right[1]+int(BB_height/divide_length))), color, thickness)
-
-                        cv2.line(im, bottom_left, ((bottom_left[0]+int(BB_width/divide_length)), bottom_left[1]), color, thickness)
-                        cv2.line(im, bottom_left, (bottom_left[0], (bottom_left[1]-int(BB_height/divide_length))), color, thickness)
-                    elif not self.showtailobjBB_corner and self.show_tailingobjs:
-                        cv2.rectangle(im, (tailingObj_x1, tailingObj_y1), (tailingObj_x2, tailingObj_y2), color=(0,255,255), thickness=2)
-                        # cv2.putText(image, f"{label} ({distance:.2f}m)", (tailingObj_x1, tailingObj_y1 - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 255), 2)
-                    if self.show_tailingobjs:
-                        if not self.showtailobjBB_corner:
-                            cv2.putText(im, f'{tailingObj_label} ID:{tailingObj_id}', (tailingObj_x1, tailingObj_y1-10), cv2.FONT_HERSHEY_SIMPLEX, text_thickness*scale_h, color, int(1*scale_h), cv2.LINE_AA)
-                            cv2.putText(im, 'Distance:' + str(round(distance_to_camera,3)) + 'm', (tailingObj_x1, tailingObj_y1-25), cv2.FONT_HERSHEY_SIMPLEX,text_thickness*scale_h+0.05, color, int(1*scale_h), cv2.LINE_AA)
-                        else:
-                            # Get text size for label
-                            text_label = f'{tailingObj_label},ID:{tailingObj_id}'
-                            text_distance = f'Distance:{round(distance_to_camera,3)}m'
-                            font = cv2.FONT_HERSHEY_SIMPLEX
-
-                            text_size_label, _ = cv2.getTextSize(text_label, font, text_thickness*scale_h, 1)
-                            text_size_distance, _ = cv2.getTextSize(text_distance, font, text_thickness*scale_h + 0.05, 1)
-
-                            # Calculate the rectangle size
-                            rect_x1 = tailingObj_x1
-                            rect_y1 = tailingObj_y1 - int(10*scale_h) -  int(text_size_label[1])  # Adjust height to fit text
-                            rect_x2 = tailingObj_x1 + int(text_size_label[0])
-                            rect_y2 = tailingObj_y1 - int(10*scale_h)  # Adjust height to fit text
-
-                            # Draw the rectangle
-                            cv2.rectangle(im, (rect_x1, rect_y1), (rect_x2, rect_y2), (0, 0, 0), -1)
-
-
-                            # Calculate the rectangle size
-                            rect_x1_d = tailingObj_x1
-                            rect_y1_d = tailingObj_y1 - int(25*scale_h) - text_size_distance[1]  # Adjust height to fit text
-                            rect_x2_d = tailingObj_x1 + text_size_distance[0]
-                            rect_y2_d = tailingObj_y1 - int(25*scale_h)    # Adjust height to fit text
-
-                            # Draw the rectangle
-                            cv2.rectangle(im, (rect_x1_d, rect_y1_d), (rect_x2_d, rect_y2_d), (0, 0, 0), -1)
-
-                            # Draw the text
-                            cv2.putText(im, text_label, (tailingObj_x1, tailingObj_y1 - int(10*scale_h)), font, text_thickness*scale_h, color, int(1*scale_h), cv2.LINE_AA)
-                            cv2.putText(im, text_distance, (tailingObj_x1, tailingObj_y1 - int(25*scale_h)), font, text_thickness*scale_h + 0.05, color, int(1*scale_h), cv2.LINE_AA)
-
-
-
-                            # cv2.putText(im, f'{tailingObj_label} ID:{tailingObj_id}', (tailingObj_x1, tailingObj_y1-10), cv2.FONT_HERSHEY_SIMPLEX, text_thickness, color, 1, cv2.LINE_AA)
-                            # cv2.putText(im, 'Distance:' + str(round(distance_to_camera,3)) + 'm', (tailingObj_x1, tailingObj_y1-25), cv2.FONT_HERSHEY_SIMPLEX,text_thickness+0.05, color, 1, cv2.LINE_AA)
-            
-            # Draw lane lines if LaneInfo is present
-            if lane_info and lane_info[0]["isDetectLine"]:
-                pLeftCarhood = (int(lane_info[0]["pLeftCarhood.x"]*scale_w), int(lane_info[0]["pLeftCarhood.y"]*scale_h))
-                pLeftFar = (int(lane_info[0]["pLeftFar.x"]*scale_w), int(lane_info[0]["pLeftFar.y"]*scale_h))
-                pRightCarhood = (int(lane_info[0]["pRightCarhood.x"]*scale_w), int(lane_info[0]["pRightCarhood.y"]*scale_h))
-                pRightFar = (int(lane_info[0]["pRightFar.x"]*scale_w), int(lane_info[0]["pRightFar.y"]*scale_h))
-
-                width_Cardhood = abs(pRightCarhood[0] - pLeftCarhood[0])
-                width_Far = abs(pRightFar[0] - pLeftFar[0])
-
-                pLeftCarhood_mainlane = (pLeftCarhood[0]+int(width_Cardhood/4.0),pLeftCarhood[1])
-                pLeftFar_mainlane = (pLeftFar[0]+int(width_Far/4.0),pLeftFar[1])
-                pRightCarhood_mainlane = (pRightCarhood[0]-int(width_Cardhood/4.0),pRightCarhood[1])
-                pRightFar_mainlane = (pRightFar[0]-int(width_Far/4.0),pRightFar[1])               
-                # Create an array of points to define the polygon
-                points = np.array([pLeftCarhood, pLeftFar, pRightFar, pRightCarhood], dtype=np.int32)
-                points_mainlane = np.array([pLeftCarhood_mainlane,
-                                            pLeftFar_mainlane,
-                                            pRightFar_mainlane,
-                                            pRightCarhood_mainlane], dtype=np.int32)
-                # Reshape points array for polylines function
-                points = points.reshape((-1, 1, 2))
-
-                # Create an overlay for the filled polygon
-                overlay = image.copy()
-                cv2.fillPoly(overlay, [points_mainlane], color=(0, 255, 0))  # Green filled polygon
-
-                # Draw left lane line
-                cv2.line(overlay, pLeftCarhood, pLeftFar, (255, 0, 0), self.laneline_thickness)  # Blue line
-                # Draw right lane line
-                cv2.line(overlay, pRightCarhood, pRightFar, (0, 0, 255), self.laneline_thickness)  # Red line
-                # Blend the overlay with the original image
-                alpha = self.alpha  # Transparency factor
-                cv2.addWeighted(overlay, alpha, image, 1 - alpha, 0, image)
-
-                # Optionally, draw the polygon border
-                # cv2.polylines(image, [points], isClosed=True, color=(0, 0, 0), thickness=2)  # Black border
-
-                # Draw for direction
-                # pmiddleFar_mainlane = (int((pLeftFar[0]+pRightFar[0])/2.0),int((pLeftFar[1]+pRightFar[1])/2.0))
-                # pmiddleCarhood_mainlane = (int((pLeftCarhood[0]+pRightCarhood[0])/2.0),int((pLeftCarhood[1]+pRightCarhood[1])/2.0))
-                # cv2.line(image, pmiddleFar_mainlane, pmiddleCarhood_mainlane, (0, 255, 255), 1)  # Blue line
+                im = image
+                color = (0,255,255)
+                if self.showtailobjBB_corner and self.show_tailingobjs:
+                    top_left = (tailingObj_x1, tailingObj_y1)
+                    bottom_right = (tailingObj_x2, tailingObj_y2)
+                    top_right = (tailingObj_x2,tailingObj_y1)
+                    bottom_left = (tailingObj_x1,tailingObj_y2) 
+                    BB_width = abs(tailingObj_x2 - tailingObj_x1)
+                    BB_height = abs(tailingObj_y2 - tailingObj_y1)
+                    divide_length = 5
 
-            if device_image_path is not None:
-                base_directory_name = os.path.basename(os.path.dirname(device_image_path))
-                x = int(self.model_w / 4.0)
-                y = int(self.model_h / 10.0)
-                font = cv2.FONT_HERSHEY_SIMPLEX
-                color = (255,128,0)
-                cv2.putText(image, f"FileName:{base_directory_name}", (x, y), font, 0.50, color, 1, cv2.LINE_AA)
+                    if distance>15:
+                        color = (0,255,255)
+                        thickness = 1
+                        text_thickness = 0.40
 
-            if self.show_devicemode:
-                x = int(self.model_w * 2.0/ 6.0)
-                y = int(self.model_h / 20.0)
-                font = cv2.FONT_HERSHEY_SIMPLEX
-                color = (0,200,255)
-                # mode = 'Unknown'
-                # if self.mode in ['eval','evaluation']:
-                #     mode = 'Online evaluation(Historical)'
-                # elif self.mode == 'online' or self.mode == 'historical':
-                #     mode = 'Online'
-                # elif self.mode == 'offline':
-                #     mode = 'Offline'
-                # elif self.mode == 'sem-online':
-                #     mode = 'Visualize semi-online'
+                    if distance>=10 and distance<=15:
+                        color = (0,255,255)
+                        thickness = 2
+                        text_thickness = 0.40
+                    elif distance>=7 and distance<10:
+                        color = (0,100,255)
+                        thickness = 5
+                        text_thickness = 0.46
+                    elif distance<7:
+                        color = (0,25,255)
+                        thickness = 7
+                        text_thickness = 0.50
+                    # Draw corner of the rectangle
+                    cv2.line(im, top_left, (top_left[0]+int(BB_width/divide_length), top_left[1]), color, thickness)
+                    cv2.line(im, top_left, (top_left[0], top_left[1] + int(BB_height/divide_length)), color, thickness)
 
-                
-                cv2.putText(image, f'Camera:{self.device_mode}, Visual:{self.visualize_mode}', (x, y), font, 0.60, color, 1, cv2.LINE_AA)
+                    cv2.line(im, bottom_right,(bottom_right[0] - int(BB_width/divide_length),bottom_right[1]), color, thickness)
+                    cv2.line(im, bottom_right,(bottom_right[0],bottom_right[1] - int(BB_height/divide_length) ), color, thickness)
 
-            if self.resize:
-                image = cv2.resize(image, (self.resize_w, self.resize_h), interpolation=cv2.INTER_AREA)
-            if self.show_airesultimage:
-                cv2.imshow("Visualize AI Result", image)
-                if self.ADAS_LDW or self.ADAS_FCW:
-                    if self.sleep_zeroonadas:
-                        cv2.waitKey(0)  # Display the image for a short time
+
+                    cv2.line(im, top_right, ((top_right[0]-int(BB_width/divide_length)), top_right[1]), color, thickness)
+                    cv2.line(im, top_right, (top_right[0], (top_right[1]+int(BB_height/divide_length))), color, thickness)
+
+                    cv2.line(im, bottom_left, ((bottom_left[0]+int(BB_width/divide_length)), bottom_left[1]), color, thickness)
+                    cv2.line(im, bottom_left, (bottom_left[0], (bottom_left[1]-int(BB_height/divide_length))), color, thickness)
+                elif not self.showtailobjBB_corner and self.show_tailingobjs:
+                    cv2.rectangle(im, (tailingObj_x1, tailingObj_y1), (tailingObj_x2, tailingObj_y2), color=(0,255,255), thickness=2)
+                    # cv2.putText(image, f"{label} ({distance:.2f}m)", (tailingObj_x1, tailingObj_y1 - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 255), 2)
+                if self.show_tailingobjs:
+                    if not self.showtailobjBB_corner:
+                        cv2.putText(im, f'{tailingObj_label} ID:{tailingObj_id}', (tailingObj_x1, tailingObj_y1-10), cv2.FONT_HERSHEY_SIMPLEX, text_thickness*scale_h, color, int(1*scale_h), cv2.LINE_AA)
+                        cv2.putText(im, 'Distance:' + str(round(distance_to_camera,3)) + 'm', (tailingObj_x1, tailingObj_y1-25), cv2.FONT_HERSHEY_SIMPLEX,text_thickness*scale_h+0.05, color, int(1*scale_h), cv2.LINE_AA)
                     else:
-                        cv2.waitKey(self.sleep_onadas)
-                else:
-                    cv2.waitKey(self.sleep)
-
-            if self.save_airesultimage:
-                if device_image_path is not None:
-                    base_directory_name = os.path.basename(os.path.dirname(device_image_path))
-                    GT_dist = os.path.basename(os.path.dirname(os.path.dirname(device_image_path)))
-                    data_folder = os.path.basename(os.path.dirname(os.path.dirname(os.path.dirname(device_image_path))))
-                    save_file = "frame_" + str(frame_ID) + "." + self.image_format
-                    current_directory = os.getcwd()
-                    save_dir = os.path.join(current_directory,"runs",data_folder,GT_dist,base_directory_name)
-                    save_path = os.path.join(save_dir,save_file)
-                   
-                    os.makedirs(save_dir, exist_ok=True)
-                    cv2.imwrite(save_path,image)
-                else:
-                    self.img_saver.save_image(image,frame_ID)
-                    # cv2.imwrite(f'{self.save_imdir}/frame_{frame_ID}.jpg',image)
-
-            if self.save_jsonlog:
-                if device_image_path is not None:
-                    # logging.info(f"device_image_path:{device_image_path}")
-                    base_directory_name = os.path.basename(os.path.dirname(device_image_path))
-                    GT_dist = os.path.basename(os.path.dirname(os.path.dirname(device_image_path)))
-                    data_folder = os.path.basename(os.path.dirname(os.path.dirname(os.path.dirname(device_image_path))))
-                    data_folder = data_folder + '_csv'
-                    # logging.info(f"base_directory_name:{base_directory_name}")
-                    current_directory = os.getcwd()
-                    save_dir = os.path.join(current_directory,"runs",data_folder,GT_dist,base_directory_name)
-                   
-                    # logging.info(f"save_file:{save_file}")
-                    # logging.info(f"current_directory:{current_directory}")
-                    txt_file = base_directory_name + '.txt'  # Updated to '.txt' for the file extension
-                    os.makedirs(save_dir, exist_ok=True)
-                    txt_path = os.path.join(save_dir, txt_file)
-                    # Convert the JSON string to a dictionary and then back to a JSON string to remove escape characters
-                    json_log_dict = json.loads(json_log)
-                    json_log_str = json.dumps(json_log_dict)
-                    
-                    with open(txt_path, mode='a') as file:  # Opening file in append mode
-                        file.write(json_log_str + '\n')  # Writing JSON log to the file without escape characters
-                    # print(f"JSON log saved to {txt_path}")
+                        # Get text size for label
+                        text_label = f'{tailingObj_label},ID:{tailingObj_id}'
+                        text_distance = f'Distance:{round(distance_to_camera,3)}m'
+                        font = cv2.FONT_HERSHEY_SIMPLEX
+
+                        text_size_label, _ = cv2.getTextSize(text_label, font, text_thickness*scale_h, 1)
+                        text_size_distance, _ = cv2.getTextSize(text_distance, font, text_thickness*scale_h + 0.05, 1)
+
+                        # Calculate the rectangle size
+                        rect_x1 = tailingObj_x1
+                        rect_y1 = tailingObj_y1 - int(10*scale_h) -  int(text_size_label[1])  # Adjust height to fit text
+                        rect_x2 = tailingObj_x1 + int(text_size_label[0])
+                        rect_y2 = tailingObj_y1 - int(10*scale_h)  # Adjust height to fit text
+
+                        # Draw the rectangle
+                        cv2.rectangle(im, (rect_x1, rect_y1), (rect_x2, rect_y2), (0, 0, 0), -1)
+
+
+                        # Calculate the rectangle size
+                        rect_x1_d = tailingObj_x1
+                        rect_y1_d = tailingObj_y1 - int(25*scale_h) - text_size_distance[1]  # Adjust height to fit text
+                        rect_x2_d = tailingObj_x1 + text_size_distance[0]
+                        rect_y2_d = tailingObj_y1 - int(25*scale_h)    # Adjust height to fit text
+
+                        # Draw the rectangle
+                        cv2.rectangle(im, (rect_x1_d, rect_y1_d), (rect_x2_d, rect_y2_d), (0, 0, 0), -1)
+
+                        # Draw the text
+                        cv2.putText(im, text_label, (tailingObj_x1, tailingObj_y1 - int(10*scale_h)), font, text_thickness*scale_h, color, int(1*scale_h), cv2.LINE_AA)
+                        cv2.putText(im, text_distance, (tailingObj_x1, tailingObj_y1 - int(25*scale_h)), font, text_thickness*scale_h + 0.05, color, int(1*scale_h), cv2.LINE_AA)
+
+
+
+                        # cv2.putText(im, f'{tailingObj_label} ID:{tailingObj_id}', (tailingObj_x1, tailingObj_y1-10), cv2.FONT_HERSHEY_SIMPLEX, text_thickness, color, 1, cv2.LINE_AA)
+                        # cv2.putText(im, 'Distance:' + str(round(distance_to_camera,3)) + 'm', (tailingObj_x1, tailingObj_y1-25), cv2.FONT_HERSHEY_SIMPLEX,text_thickness+0.05, color, 1, cv2.LINE_AA)
+        
+        laps.lap('draw_tailing_objs')
+        # Draw lane lines if LaneInfo is present
+        if lane_info and lane_info[0]["isDetectLine"]:
+            self.draw_laneline_objs(lane_info, image)
+
+        laps.lap('draw_lane')
+        if device_image_path is not None:
+            base_directory_name = os.path.basename(os.path.dirname(device_image_path))
+            x = int(self.model_w / 4.0)
+            y = int(self.model_h / 10.0)
+            font = cv2.FONT_HERSHEY_SIMPLEX
+            color = (255,128,0)
+            cv2.putText(image, f"FileName:{base_directory_name}", (x, y), font, 0.50, color, 1, cv2.LINE_AA)
+
+        if self.show_devicemode:
+            x = int(self.model_w * 2.0/ 6.0)
+            y = int(self.model_h / 20.0)
+            font = cv2.FONT_HERSHEY_SIMPLEX
+            color = (0,200,255)
+            # mode = 'Unknown'
+            # if self.mode in ['eval','evaluation']:
+            #     mode = 'Online evaluation(Historical)'
+            # elif self.mode == 'online' or self.mode == 'historical':
+            #     mode = 'Online'
+            # elif self.mode == 'offline':
+            #     mode = 'Offline'
+            # elif self.mode == 'sem-online':
+            #     mode = 'Visualize semi-online'
+
+            
+            cv2.putText(image, f'Camera:{self.device_mode}, Visual:{self.visualize_mode}', (x, y), font, 0.60, color, 1, cv2.LINE_AA)
+
+        laps.lap('draw_text')
+        return {
+            'frame_ID': frame_ID,
+            'log_data': log_data,
+            'image': image,
+            'alert': self.ADAS_LDW or self.ADAS_FCW,
+        }
+
+    def show_result(self, result):
+        """
+        Displays a rendered frame, waiting longer when an ADAS alert is raised. Must run on the main thread.
+
+        Args:
+            result (dict): A result returned by `render_json_log`.
+        """
+        with latency.tracker.span('display'):
+            cv2.imshow(self.window_name, result['image'])
+            if result['alert']:
+                if self.sleep_zeroonadas:
+                    cv2.waitKey(0)  # Display the image for a short time
                 else:
-                    #self.img_saver.save_json_log(log_data)
-                    self.img_saver.save_json_log_txt(log_data)
-                # # Save the JSON log to a CSV file
-                # with open(f'{self.save_jsonlogpath}', mode='a', newline='') as file:
-                #     writer = csv.writer(file)
-                #     writer.writerow([json.dumps(log_data)])  # Save frame_ID and JSON log
-                    # writer.writerow([frame_ID, json.dumps(log_data)])  # Save frame_ID and JSON log
-        except KeyError as e:
-            logging.error(f"❌ KeyError: {e} - The key might be missing in the JSON data.")
-        except json.JSONDecodeError as e:
-            logging.error(f"❌ JSONDecodeError: {e} - The JSON data might be malformed.")
-        except Exception as e:
-            logging.error(f"❌ Error: {e} - An unexpected error occurred.")
+                    cv2.waitKey(self.sleep_onadas)
+            else:
+                cv2.waitKey(self.sleep)
+
+    def save_result(self, result, json_log, device_image_path=None):
+        """
+        Saves a rendered frame and its JSON log, if enabled.
+
+        Args:
+            result (dict): A result returned by `render_json_log`.
+            json_log (str): JSON formatted string containing log data.
+            device_image_path (str, optional): Image path on the device (historical mode).
+        """
+        frame_ID = result['frame_ID']
+        image = result['image']
+        log_data = result['log_data']
+
+        laps = latency.tracker.laps()
+        if self.save_airesultimage:
+            if device_image_path is not None:
+                save_dir = self.historical_save_dir(device_image_path)
+                os.makedirs(save_dir, exist_ok=True)
+                # Saved as frame_<frame_ID>.<format> by the asynchronous writers
+                self.img_saver.save_image(image,frame_ID,save_dir=save_dir)
+            else:
+                self.img_saver.save_image(image,frame_ID)
+                # cv2.imwrite(f'{self.save_imdir}/frame_{frame_ID}.jpg',image)
+            laps.lap('save_image')
+
+        if self.video_sink is not None:
+            self.video_sink.write(image)
+            laps.lap('save_video')
+
+        if self.save_jsonlog:
+            self.save_json_log(json_log, log_data, device_image_path)
+
+    def historical_save_dir(self, device_image_path, data_folder_suffix=''):
+        """
+        Gets the output directory of a historical frame: <data folder><suffix>/<GT distance>/<clip>
+        under the base directory of the image saver, which is per device with several devices.
+
+        Args:
+            device_image_path (str): Image path on the device, .../<data folder>/<GT distance>/<clip>/<image>.
+            data_folder_suffix (str, optional): Appended to the data folder name (e.g. '_csv'). Defaults to ''.
+
+        Returns:
+            str: The directory.
+        """
+        clip_dir = os.path.dirname(device_image_path)
+        base_directory_name = os.path.basename(clip_dir)
+        GT_dist = os.path.basename(os.path.dirname(clip_dir))
+        data_folder = os.path.basename(os.path.dirname(os.path.dirname(clip_dir))) + data_folder_suffix
+        return os.path.join(os.path.abspath(self.img_saver.base_dir), data_folder, GT_dist, base_directory_name)
+
+    def save_json_log(self, json_log, log_data=None, device_image_path=None):
+        """
+        Saves a JSON log next to the AI result images.
 
+        Args:
+            json_log (str): JSON formatted string containing log data.
+            log_data (dict, optional): The parsed JSON log, parsed from json_log when not given.
+            device_image_path (str, optional): Image path on the device (historical mode).
+        """
+        laps = latency.tracker.laps()
+        if log_data is None:
+            log_data = json.loads(json_log)
 
+        if device_image_path is not None:
+            # logging.info(f"device_image_path:{device_image_path}")
+            base_directory_name = os.path.basename(os.path.dirname(device_image_path))
+            save_dir = self.historical_save_dir(device_image_path, data_folder_suffix='_csv')
+           
+            # logging.info(f"save_file:{save_file}")
+            txt_file = base_directory_name + '.txt'  # Updated to '.txt' for the file extension
+            os.makedirs(save_dir, exist_ok=True)
+            txt_path = os.path.join(save_dir, txt_file)
+            # Convert the JSON string to a dictionary and then back to a JSON string to remove escape characters
+            json_log_str = json.dumps(log_data)
+            
+            with open(txt_path, mode='a') as file:  # Opening file in append mode
+                file.write(json_log_str + '\n')  # Writing JSON log to the file without escape characters
+            # print(f"JSON log saved to {txt_path}")
+        else:
+            #self.img_saver.save_json_log(log_data)
+            self.img_saver.save_json_log_txt(log_data)
+        laps.lap('log_append')
+        # # Save the JSON log to a CSV file
+        # with open(f'{self.save_jsonlogpath}', mode='a', newline='') as file:
+        #     writer = csv.writer(file)
+        #     writer.writerow([json.dumps(log_data)])  # Save frame_ID and JSON log
+            # writer.writerow([frame_ID, json.dumps(log_data)])  # Save frame_ID and JSON log
 
     def draw_AI_result_to_images(self):
         """
@@ -620,34 +853,76 @@ class Drawer(BaseDataset):
         - Handle exceptions related to JSON decoding and other unexpected errors.
         4. If enabled, plot distances to the camera over frame IDs using Matplotlib.
 
+        With `PIPELINE.OFFLINE_PROCESSES` above 1, the lines are rendered by an `OfflineRenderer`
+        process pool and written in log order. Otherwise, with `PIPELINE.PREFETCH_FRAMES`, the
+        images of the upcoming frames are loaded ahead by a `PrefetchImageLoader`.
+
         Attributes:
-        - `self.file_path`: Path to the CSV or TXT file containing AI results.
+        - `self.csv_file_path`: Path to the CSV or TXT file containing AI results.
         """
 
-        frame_ids = []
-        distances = []
+        self.index_dataset()
+
+        if self.offline_processes > 1:
+            OfflineRenderer(self, self.offline_processes, self.offline_chunksize).run(self.iter_json_data())
+            self.close()
+            return
+
+        lines = self.iter_json_data()
+        if self.prefetch_frames > 0:
+            # The loader reads the frame IDs of the lines ahead of the one being drawn
+            lines, upcoming = itertools.tee(lines)
+            indexed = self.dataset_index is not None
+            self.image_loader = PrefetchImageLoader(lambda path: self.load_frame(path, indexed=indexed),
+                                                    ahead=self.prefetch_frames,
+                                                    workers=self.prefetch_workers, cache_size=self.frame_cache_size)
+            self.image_loader.plan(self.iter_frame_paths(upcoming))
+
+        for json_data in lines:
+            self.process_json_data(json_data)
+        self.close()
+
+        # Optional: Plotting or any further processing can be added here
+
+    def close(self):
+        """
+        Finishes the outputs that are written in the background (the result video and the
+        queued images) and stops the image loader.
+        """
+        if self.video_sink is not None:
+            self.video_sink.close()
+        self.img_saver.close()
+        if self.image_loader is not None:
+            self.image_loader.close()
+            self.image_loader = None
+
+    def iter_json_data(self):
+        """
+        Reads the JSON data of every line of the CSV or TXT log at `self.csv_file_path`.
 
+        Yields:
+            str: The JSON data of a line.
+        """
         # Determine the file type
         file_extension = os.path.splitext(self.csv_file_path)[1].lower()
 
         if file_extension == '.csv':
             # Handle CSV file
-            with open(self.file_path, 'r') as file:
+            with open(self.csv_file_path, 'r') as file:
                 reader = csv.reader(file, delimiter=',')
                 for row in reader:
                     # Join the row into a single string
                     row_str = ','.join(row)
-                    
+
                     # Find the position of 'json:'
                     json_start = row_str.find('json:')
                     if json_start != -1:
                         json_data = row_str[json_start + 5:].strip()
                         if json_data.startswith('"') and json_data.endswith('"'):
                             json_data = json_data[1:-1]  # Remove enclosing double quotes
-                        
+
                         # Replace any double quotes escaped with backslashes
-                        json_data = json_data.replace('\\"', '"')
-                        self.process_json_data(json_data)
+                        yield json_data.replace('\\"', '"')
 
         elif file_extension == '.txt':
             # Handle TXT file
@@ -656,115 +931,93 @@ class Drawer(BaseDataset):
                     line = line.strip()  # Remove any leading/trailing whitespace
                     if not line:
                         continue  # Skip empty lines
-                    self.process_json_data(line)
+                    yield line
 
         else:
             logging.error(f"Unsupported file format: {file_extension}")
-            return
-
-        # Optional: Plotting or any further processing can be added here
 
-    def process_json_data(self, json_data):
+    def index_dataset(self):
         """
-        Parses and processes JSON data to draw AI results on images.
+        Builds the frame index of `im_dir`, or loads it from its sidecar file, if `IMAGE.INDEX` is set.
 
-        Args:
-        - json_data: A string containing the JSON data to be processed.
+        Returns:
+            DatasetIndex: The index, or None if it is disabled or `im_dir` cannot be read.
         """
-        try:
-            if self.resize:
-                scale_w = self.resize_w / self.model_w
-                scale_h = self.resize_h / self.model_h
-            else:
-                scale_w = 1
-                scale_h = 1
-            # Parse JSON data
-            data = json.loads(json_data)
-
-
-            # Process each frame in the JSON data
-            for frame_id, frame_data in data['frame_ID'].items():
-                self.frame_ids.append(int(frame_id))
-
-                # Get image path
-                im_file = self.image_basename + frame_id + "." + self.image_format
-                im_path = os.path.join(self.im_dir, im_file)
-                im = cv2.imread(im_path)
-                im = cv2.resize(im, (self.model_w, self.model_h), interpolation=cv2.INTER_AREA)
-                if self.resize:
-                    im = cv2.resize(im, (self.resize_w, self.resize_h), interpolation=cv2.INTER_AREA)
-                cv2.putText(im, 'frame_ID:' + str(frame_id), (int(10 * scale_w), int(10 * scale_h)), cv2.FONT_HERSHEY_SIMPLEX, 0.45*scale_w, (0, 255, 255), int(1*scale_w), cv2.LINE_AA)
-                tailing_objs = frame_data.get('tailingObj', [])
-                vanish_objs = frame_data.get('vanishLine', [])
-                ADAS_objs = frame_data.get('ADAS', [])
-                detect_objs = frame_data.get('detectObj', {})
-                lane_info = frame_data.get("LaneInfo", [])
-                ADAS_detection_objs = frame_data.get("ADASDetectObj", [])
-                track_objs = frame_data.get("trackObj", [])
-
-                # Draw AI results if flags are set
-                if self.show_devicemode:
-                    x = int((self.model_w * 2.0 / 5.0) * scale_w)
-                    y = int((self.model_h / 20.0) * scale_h) 
-                    font = cv2.FONT_HERSHEY_SIMPLEX
-                    color = (255, 255, 255)
-                    mode = 'Unknown'
-                    if self.mode in ['eval', 'evaluation']:
-                        mode = 'Online evaluation(Historical)'
-                    elif self.mode == 'online':
-                        mode = 'Online'
-                    elif self.mode == 'offline':
-                        mode = 'Offline'
-                    cv2.putText(im, 'Stream mode : ' + mode, (x, y), font, 0.50, color, 1, cv2.LINE_AA)
-
-                if ADAS_detection_objs and self.show_adas_detection:
-                    self.draw_adas_detection_obj(ADAS_detection_objs, im)
-
-                # Draw detected objects
-                if detect_objs and self.show_detectobjs:
-                    self.draw_detect_objs(detect_objs, im)
+        if self.dataset_index is None and self.image_index and os.path.isdir(self.im_dir):
+            try:
+                self.dataset_index = DatasetIndex(self.im_dir, self.image_basename, self.image_format).load()
+            except OSError as e:
+                logging.warning(f"⚠️ Could not index {self.im_dir}: {e}")
+        return self.dataset_index
+
+    def frame_path(self, frame_id):
+        """
+        Gets the image file of a frame in `im_dir`, from the dataset index when it is built.
 
+        Args:
+            frame_id (str): The frame ID.
 
-                if track_objs and self.show_trackobjs:
-                    self.draw_track_objs(track_objs, im)
+        Returns:
+            str: The image path, or None if the dataset index has no image for the frame.
+        """
+        if self.dataset_index is not None:
+            return self.dataset_index.path(frame_id)
+        return os.path.join(self.im_dir, f"{self.image_basename}{frame_id}.{self.image_format}")
 
+    def iter_frame_paths(self, json_lines):
+        """
+        Gets the image files of the frames of log lines, in drawing order. Malformed lines are skipped.
 
-                # Draw tailing objects
-                if tailing_objs and self.show_tailingobjs:
-                    self.draw_tailing_obj(tailing_objs, im)
-                else:
-                    self.distances.append(float('nan'))  # Handle missing values
+        Args:
+            json_lines (iterable): JSON data of the log lines.
 
-                
-            
-                # Draw vanishing lines
-                if vanish_objs and self.show_vanishline:
-                    self.draw_vanish_objs(vanish_objs, im)
+        Yields:
+            str: The image path of each frame.
+        """
+        for json_data in json_lines:
+            try:
+                frame_ids = list(json.loads(json_data)['frame_ID'])
+            except (json.JSONDecodeError, KeyError, TypeError):
+                continue
+            for frame_id in frame_ids:
+                image_path = self.frame_path(frame_id)
+                if image_path is not None:
+                    yield image_path
+
+    def read_frame(self, image_path):
+        """
+        Loads the image of a frame, through the image loader when one is running.
 
-                # Draw ADAS objects
-                if ADAS_objs and self.show_adasobjs:
-                    self.draw_ADAS_objs(ADAS_objs, im)
+        Args:
+            image_path (str): The image path, None for a frame missing from the dataset index.
 
-                # Draw lane lines if LaneInfo is present
-                if lane_info and lane_info[0]["isDetectLine"] and self.show_laneline:
-                    self.draw_laneline_objs(lane_info, im)
+        Returns:
+            numpy.ndarray: The frame at the output size, or None if it is not found.
+        """
+        if image_path is None:
+            return None
+        if self.image_loader is not None:
+            return self.image_loader.get(image_path)
+        return self.load_frame(image_path, indexed=self.dataset_index is not None)
 
+    def process_json_data(self, json_data):
+        """
+        Parses and processes JSON data to draw AI results on images.
 
+        Args:
+        - json_data: A string containing the JSON data to be processed.
+        """
+        try:
+            for frame_id, im, frame_data, alert in self.render_json_data(json_data):
                 # Display and/or save images if flags are set
                 if self.show_airesultimage:
-                    if self.resize:
-                        im = cv2.resize(im, (self.resize_w, self.resize_h), interpolation=cv2.INTER_AREA)
-                    cv2.imshow("Offline visualization", im)
-                    if self.ADAS_FCW or self.ADAS_LDW:
-                        if self.sleep_zeroonadas:
-                            cv2.waitKey(0)
-                        else:
-                            cv2.waitKey(self.sleep_onadas)
-                    else:
-                        cv2.waitKey(self.sleep)
+                    self.show_offline_result(im, alert)
 
                 if self.save_airesultimage:
-                    self.img_saver.save_image(im, frame_ID=frame_id)
+                    self.img_saver.save_image(im, frame_ID=frame_id, copy=False)
+
+                if self.video_sink is not None:
+                    self.video_sink.write(im, copy=False)
 
                 if self.save_jsonlog:
                     self.img_saver.save_json_log_txt(frame_data)
@@ -774,6 +1027,119 @@ class Drawer(BaseDataset):
         except Exception as e:
             logging.error(f"Unexpected error: {e}")
 
+    def show_offline_result(self, im, alert):
+        """
+        Displays an offline rendered frame, waiting longer when an ADAS alert is raised.
+
+        Args:
+            im (numpy.ndarray): The rendered frame.
+            alert (bool): Whether an ADAS alert is raised on the frame.
+        """
+        cv2.imshow("Offline visualization", im)
+        if alert:
+            if self.sleep_zeroonadas:
+                cv2.waitKey(0)
+            else:
+                cv2.waitKey(self.sleep_onadas)
+        else:
+            cv2.waitKey(self.sleep)
+
+    def render_json_data(self, json_data):
+        """
+        Parses one line of an offline log and draws the AI results of each of its frames.
+
+        Appends the frame IDs to `self.frame_ids` and the tailing distances to `self.distances`.
+
+        Args:
+            json_data (str): JSON formatted string containing log data.
+
+        Yields:
+            tuple: The frame ID, the annotated image, the frame data and whether an ADAS alert is raised.
+
+        Raises:
+            json.JSONDecodeError: If the JSON data is malformed.
+        """
+        scale_w = self.scale_w
+        scale_h = self.scale_h
+        # Parse JSON data
+        data = json.loads(json_data)
+
+        # Process each frame in the JSON data
+        for frame_id, frame_data in data['frame_ID'].items():
+            self.frame_ids.append(int(frame_id))
+
+            # Get image path
+            im_path = self.frame_path(frame_id)
+            im = self.read_frame(im_path)
+            if im is None:
+                raise FileNotFoundError(f"Image not found: {im_path or f'frame_ID {frame_id}'}")
+            cv2.putText(im, 'frame_ID:' + str(frame_id), (int(10 * scale_w), int(10 * scale_h)), cv2.FONT_HERSHEY_SIMPLEX, 0.45*scale_w, (0, 255, 255), int(1*scale_w), cv2.LINE_AA)
+            tailing_objs = frame_data.get('tailingObj', [])
+            vanish_objs = frame_data.get('vanishLine', [])
+            ADAS_objs = frame_data.get('ADAS', [])
+            detect_objs = frame_data.get('detectObj', {})
+            lane_info = frame_data.get("LaneInfo", [])
+            ADAS_detection_objs = frame_data.get("ADASDetectObj", [])
+            track_objs = frame_data.get("trackObj", [])
+
+            # Per-frame state, so a frame does not depend on the frame drawn before it: the
+            # detections skip the box of this frame's tailing object, which is drawn after them,
+            # and the alert only follows this frame's ADAS result
+            self.ADAS_FCW = self.ADAS_LDW = False
+            self.tailingObj_x1 = self.tailingObj_y1 = None
+            if tailing_objs and self.show_tailingobjs:
+                self.tailingObj_x1 = int(tailing_objs[0].get('tailingObj.x1', 0) * scale_w)
+                self.tailingObj_y1 = int(tailing_objs[0].get('tailingObj.y1', 0) * scale_h)
+
+            # Draw AI results if flags are set
+            if self.show_devicemode:
+                x = int((self.model_w * 2.0 / 5.0) * scale_w)
+                y = int((self.model_h / 20.0) * scale_h) 
+                font = cv2.FONT_HERSHEY_SIMPLEX
+                color = (255, 255, 255)
+                mode = 'Unknown'
+                if self.mode in ['eval', 'evaluation']:
+                    mode = 'Online evaluation(Historical)'
+                elif self.mode == 'online':
+                    mode = 'Online'
+                elif self.mode == 'offline':
+                    mode = 'Offline'
+                cv2.putText(im, 'Stream mode : ' + mode, (x, y), font, 0.50, color, 1, cv2.LINE_AA)
+
+            if ADAS_detection_objs and self.show_adas_detection:
+                self.draw_adas_detection_obj(ADAS_detection_objs, im)
+
+            # Draw detected objects
+            if detect_objs and self.show_detectobjs:
+                self.draw_detect_objs(detect_objs, im)
+
+
+            if track_objs and self.show_trackobjs:
+                self.draw_track_objs(track_objs, im)
+
+
+            # Draw tailing objects
+            if tailing_objs and self.show_tailingobjs:
+                self.draw_tailing_obj(tailing_objs, im)
+            else:
+                self.distances.append(float('nan'))  # Handle missing values
+
+            
+        
+            # Draw vanishing lines
+            if vanish_objs and self.show_vanishline:
+                self.draw_vanish_objs(vanish_objs, im)
+
+            # Draw ADAS objects
+            if ADAS_objs and self.show_adasobjs:
+                self.draw_ADAS_objs(ADAS_objs, im)
+
+            # Draw lane lines if LaneInfo is present
+            if lane_info and lane_info[0]["isDetectLine"] and self.show_laneline:
+                self.draw_laneline_objs(lane_info, im)
+
+            yield frame_id, im, frame_data, bool(self.ADAS_FCW or self.ADAS_LDW)
+
     # def draw_AI_result_to_images(self):
     #     """
     #     Processes a .txt file to extract and visualize AI results by overlaying information onto images.
@@ -1070,74 +1436,19 @@ class Drawer(BaseDataset):
         if "DUA" in ADAS_detection_objs:
             detect_DUA_objs = ADAS_detection_objs["DUA"]
 
-        # Create an overlay for the filled polygon
-        overlay = image.copy()
-
-        if self.resize:
-            scale_w = self.resize_w / self.model_w
-            scale_h = self.resize_h / self.model_h
-        else:
-            scale_w = 1
-            scale_h = 1
-
-
-        if detect_DCA_objs:
-            for obj in detect_DCA_objs:
-                x1, y1 = int(obj["ADASDetectObj.x1"]*scale_w), int(obj["ADASDetectObj.y1"]*scale_h)
-                x2, y2 = int(obj["ADASDetectObj.x2"]*scale_w), int(obj["ADASDetectObj.y2"]*scale_h)
-                confidence = obj["ADASDetectObj.confidence"]
-                label = obj["ADASDetectObj.label"]
-                
-                cv2.rectangle(overlay, (x1, y1), (x2, y2), (255, 128, 0), self.adas_detection_thickness)
-                if self.adas_detection_show_label:
-                    cv2.putText(overlay, f"{label} ({confidence:.2f})", (x1, y1 - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.35, self.DCA_color, 1)
-
-        if detect_DLA_objs:
-            for obj in detect_DLA_objs:
-                x1, y1 = int(obj["ADASDetectObj.x1"]*scale_w), int(obj["ADASDetectObj.y1"]*scale_h)
-                x2, y2 = int(obj["ADASDetectObj.x2"]*scale_w), int(obj["ADASDetectObj.y2"]*scale_h)
-                confidence = obj["ADASDetectObj.confidence"]
-                label = obj["ADASDetectObj.label"]
-                
-                cv2.rectangle(overlay, (x1, y1), (x2, y2), (255, 0, 128), self.adas_detection_thickness)
-                if self.adas_detection_show_label:
-                    cv2.putText(overlay, f"{label} ({confidence:.2f})", (x1, y1 - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.35, self.DLA_color, 1)
-
-
-        if detect_DMA_objs:
-            for obj in detect_DMA_objs:
-                x1, y1 = int(obj["ADASDetectObj.x1"]*scale_w), int(obj["ADASDetectObj.y1"]*scale_h)
-                x2, y2 = int(obj["ADASDetectObj.x2"]*scale_w), int(obj["ADASDetectObj.y2"]*scale_h)
-                confidence = obj["ADASDetectObj.confidence"]
-                label = obj["ADASDetectObj.label"]
-                
-                cv2.rectangle(overlay, (x1, y1), (x2, y2), (0, 128, 255), self.adas_detection_thickness)
-                if self.adas_detection_show_label:
-                    cv2.putText(overlay, f"{label} ({confidence:.2f})", (x1, y1 - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.35, self.DMA_color, 1)
-
-
-        if detect_DUA_objs:
-            for obj in detect_DUA_objs:
-                x1, y1 = int(obj["ADASDetectObj.x1"]*scale_w), int(obj["ADASDetectObj.y1"]*scale_h)
-                x2, y2 = int(obj["ADASDetectObj.x2"]*scale_w), int(obj["ADASDetectObj.y2"]*scale_h)
-                confidence = obj["ADASDetectObj.confidence"]
-                label = obj["ADASDetectObj.label"]
-                
-                cv2.rectangle(overlay, (x1, y1), (x2, y2), (128, 0, 255), self.adas_detection_thickness)
-                if self.adas_detection_show_label:
-                    cv2.putText(overlay, f"{label} ({confidence:.2f})", (x1, y1 - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.35, self.DUA_color, 1)
+        shapes, labels = self._adas_detection_shapes(((detect_DCA_objs, self.DCA_color),
+                                                      (detect_DLA_objs, self.DLA_color),
+                                                      (detect_DMA_objs, self.DMA_color),
+                                                      (detect_DUA_objs, self.DUA_color)))
 
-        # Blend the overlay with the original image
+        # Blend the boxes and labels with the original image, within their bounding rectangle only
         alpha = self.adas_detection_alpha  # Transparency factor
-        cv2.addWeighted(overlay, alpha, image, 1 - alpha, 0, image)
+        rect = self.shapes_rect([boxes for boxes, _ in shapes], labels, margin=self.adas_detection_thickness)
+        self.blend_shapes(image, alpha, rect, lambda target: self._draw_adas_detection_shapes(target, shapes, labels))
 
     def draw_track_objs(self, track_objs, image):
-        if self.resize:
-            scale_w = self.resize_w / self.model_w
-            scale_h = self.resize_h / self.model_h
-        else:
-            scale_w = 1
-            scale_h = 1
+        scale_w = self.scale_w
+        scale_h = self.scale_h
         for obj in track_objs:
             trackObj_x1, trackObj_y1 = int(obj["trackObj.x1"]*scale_w), int(obj["trackObj.y1"]*scale_h)
             trackObj_x2, trackObj_y2 = int(obj["trackObj.x2"]*scale_w), int(obj["trackObj.y2"]*scale_h)
@@ -1488,12 +1799,8 @@ class Drawer(BaseDataset):
         Returns:
         - None. The image `im` is modified in place with the bounding box and labels drawn on it.
         """
-        if self.resize:
-            scale_w = self.resize_w / self.model_w
-            scale_h = self.resize_h / self.model_h
-        else:
-            scale_w = 1
-            scale_h = 1
+        scale_w = self.scale_w
+        scale_h = self.scale_h
 
         distance_to_camera = tailing_objs[0].get('tailingObj.distanceToCamera', None)
         tailingObj_id = tailing_objs[0].get('tailingObj.id', None)
@@ -1626,10 +1933,10 @@ class Drawer(BaseDataset):
         2. For each detected object:
         - Extract the label, bounding box coordinates (x1, y1, x2, y2), and confidence score.
         - Skip drawing the bounding box if it matches the specified tailing object coordinates (`self.tailingObj_x1` and `self.tailingObj_y1`).
-        - Otherwise, draw the bounding box around the detected object using a specific color based on the label:
+        - Otherwise, draw the bounding boxes of the object type with a single polylines call, in a color based on the type:
             - `VEHICLE`: Orange color.
             - `HUMAN`: Light orange color.
-        - Add the label and confidence score text above the bounding box.
+        3. Add the label and confidence score text above every bounding box, after all boxes are drawn.
 
         Attributes:
         - `self`: The instance of the class this method belongs to. Used to access the instance variables `self.show_tailingobjs`, `self.tailingObj_x1`, and `self.tailingObj_y1`.
@@ -1637,43 +1944,29 @@ class Drawer(BaseDataset):
         Returns:
         - None. The image `im` is modified in place with the bounding boxes and labels drawn on it.
         """
-        if self.resize:
-            scale_w = self.resize_w / self.model_w
-            scale_h = self.resize_h / self.model_h
-        else:
-            scale_w = 1
-            scale_h = 1
+        scale_h = self.scale_h
 
 
-        # Draw detectObj bounding boxes
+        # Draw detectObj bounding boxes, one polylines call per object type
+        labels = []
         for obj_type, obj_list in detect_objs.items():
-            for obj in obj_list:
-                label = obj.get(f'detectObj.label', '')
-                x1 = int(obj.get(f'detectObj.x1', 0) * scale_w)
-                y1 = int(obj.get(f'detectObj.y1', 0) * scale_h)
-                x2 = int(obj.get(f'detectObj.x2', 0) * scale_w)
-                y2 = int(obj.get(f'detectObj.y2', 0) * scale_h)
-                confidence = obj.get(f'detectObj.confidence', 0.0)
-                
-                if self.show_tailingobjs and self.tailingObj_x1==x1 and self.tailingObj_y1==y1:
-                    # Draw bounding box
-                    continue
-                else:
-                    # Draw bounding box
-                    if label == "VEHICLE":
-                        color=(255,200,0)
-                    elif label=="HUMAN":
-                        color=(0,128,255)
-                    cv2.rectangle(im, (x1, y1), (x2, y2), color=color, thickness=int(1*scale_h))
-                    cv2.putText(im, f'{label} {confidence:.2f}', (x1, y1-10), cv2.FONT_HERSHEY_SIMPLEX, 0.15*scale_h, color, int(1), cv2.LINE_AA)
+            if not obj_list:
+                continue
+            boxes = self.box_array(obj_list, "detectObj")
+            if self.show_tailingobjs:
+                # Skip the box of the tailing object, it is drawn by draw_tailing_obj
+                keep = ~((boxes[:, 0] == self.tailingObj_x1) & (boxes[:, 1] == self.tailingObj_y1))
+                obj_list = [obj for obj, k in zip(obj_list, keep) if k]
+                boxes = boxes[keep]
+            color = self.detect_colors.get(obj_type, (255, 200, 0))
+            self.draw_box_array(im, boxes, color, int(1*scale_h))
+            labels.extend(self.box_labels(obj_list, boxes, "detectObj", 0.15*scale_h, color,
+                                          text_format="{label} {confidence:.2f}", line_type=cv2.LINE_AA))
+        self.draw_labels(im, labels)
 
     def draw_vanish_objs(self,vanish_objs,im):
-        if self.resize:
-            scale_w = self.resize_w / self.model_w
-            scale_h = self.resize_h / self.model_h
-        else:
-            scale_w = 1
-            scale_h = 1
+        scale_w = self.scale_w
+        scale_h = self.scale_h
         vanishLineY = int(vanish_objs[0].get('vanishLineY', None) * scale_h)
         # logging.info(f'vanishLineY:{vanishLineY}')
         x2 = int(im.shape[1] * scale_w)
@@ -1706,8 +1999,8 @@ class Drawer(BaseDataset):
         2. Compute the width of the lane at the carhood and far points.
         3. Calculate the main lane points by shifting the left and right carhood and far points towards the center.
         4. Create an array of points defining the lane polygon and another for the main lane polygon.
-        5. Create an overlay image and fill the main lane polygon with a green color.
-        6. Blend the overlay with the original image using a transparency factor.
+        5. Fill the main lane polygon with a green color on the reused overlay buffer.
+        6. Blend the overlay with the original image using a transparency factor, within the lane's bounding rectangle only.
         7. Optionally draw the polygon border and direction line (commented out in the code).
         8. Draw the left and right lane lines on the image:
         - Left lane line: Drawn in blue.
@@ -1719,12 +2012,8 @@ class Drawer(BaseDataset):
         Returns:
         - None. The image `im` is modified in place with the lane lines drawn on it.
         """
-        if self.resize:
-            scale_w = self.resize_w / self.model_w
-            scale_h = self.resize_h / self.model_h
-        else:
-            scale_w = 1
-            scale_h = 1
+        scale_w = self.scale_w
+        scale_h = self.scale_h
 
         pLeftCarhood = (int(lane_info[0]["pLeftCarhood.x"]*scale_w), int(lane_info[0]["pLeftCarhood.y"]*scale_h))
         pLeftFar = (int(lane_info[0]["pLeftFar.x"]*scale_w), int(lane_info[0]["pLeftFar.y"]*scale_h))
@@ -1747,17 +2036,17 @@ class Drawer(BaseDataset):
         # Reshape points array for polylines function
         points = points.reshape((-1, 1, 2))
 
-        # Create an overlay for the filled polygon
-        overlay = im.copy()
-        cv2.fillPoly(overlay, [points_mainlane], color=(0, 255, 0))  # Green filled polygon
-        # Draw left lane line
-        cv2.line(overlay, pLeftCarhood, pLeftFar, (255, 0, 0), self.laneline_thickness)  # Blue line
-        # Draw right lane line
-        cv2.line(overlay, pRightCarhood, pRightFar, (0, 0, 255), self.laneline_thickness)  # Red line
+        def draw(overlay):
+            cv2.fillPoly(overlay, [points_mainlane], color=(0, 255, 0))  # Green filled polygon
+            # Draw left lane line
+            cv2.line(overlay, pLeftCarhood, pLeftFar, (255, 0, 0), self.laneline_thickness)  # Blue line
+            # Draw right lane line
+            cv2.line(overlay, pRightCarhood, pRightFar, (0, 0, 255), self.laneline_thickness)  # Red line
 
-        # Blend the overlay with the original image
+        # Blend the overlay with the original image, within the lane's bounding rectangle only
         alpha = self.alpha  # Transparency factor
-        cv2.addWeighted(overlay, alpha, im, 1 - alpha, 0, im)
+        rect = self.shapes_rect([points, points_mainlane], margin=self.laneline_thickness)
+        self.blend_shapes(im, alpha, rect, draw)
 
         # Optionally, draw the polygon border
         # cv2.polylines(image, [points], isClosed=True, color=(0, 0, 0), thickness=2)  # Black border
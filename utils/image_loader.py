@@ -0,0 +1,134 @@
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+
+class PrefetchImageLoader:
+    def __init__(self, load, ahead=8, workers=4, cache_size=32):
+        """Load the upcoming frames of a log on a thread pool, into an LRU cache.
+
+        plan() gives the sequence of image paths the caller will ask for; the next
+        `ahead` of them are loaded in the background, so disk reads and decoding
+        overlap with drawing. Loaded frames stay in an LRU cache, so going back to
+        a recent frame does not read it again.
+
+        Args:
+            load (callable): Loads one frame, called as load(path) from the pool threads
+                (e.g. Drawer.load_frame). Returns the image or None.
+            ahead (int, optional): Frames loaded ahead of the current one. Defaults to 8.
+            workers (int, optional): Loader threads. Defaults to 4.
+            cache_size (int, optional): Frames kept for going back. Defaults to 32.
+        """
+        self.load = load
+        self.ahead = ahead
+        self.cache_size = cache_size
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='ImageLoader')
+        self.lock = threading.Lock()
+
+        self.cache = OrderedDict()    # Path to loaded image, least recently used first
+        self.pending = OrderedDict()  # Path to Future, in plan order
+        self.upcoming = iter(())
+
+        # Statistics
+        self.hits = 0      # Frames returned from the cache
+        self.ready = 0     # Prefetched frames that were loaded in time
+        self.waits = 0     # Prefetched frames still loading when asked for
+        self.misses = 0    # Frames loaded on request, outside of the plan
+
+    def plan(self, paths):
+        """Set the sequence of upcoming image paths and start loading its first frames.
+
+        Args:
+            paths (iterable): Image paths, in the order they will be asked for. Consumed
+                lazily, `ahead` paths at a time.
+        """
+        with self.lock:
+            self.upcoming = iter(paths)
+            self._fill()
+
+    def get(self, path):
+        """Get a frame, from the cache, from its prefetch or by loading it now.
+
+        Args:
+            path (str): Image path.
+
+        Returns:
+            numpy.ndarray: A copy of the frame, which the caller may draw on, or None if
+                it could not be loaded.
+        """
+        with self.lock:
+            image = self.cache.get(path)
+            if image is not None:
+                self.cache.move_to_end(path)
+                self.hits += 1
+                self._fill()
+                return image.copy()
+            future = self._take(path)
+            self._fill()
+
+        if future is None:
+            self.misses += 1
+            image = self.load(path)
+        else:
+            if future.done():
+                self.ready += 1
+            else:
+                self.waits += 1
+            image = future.result()
+
+        if image is None:
+            return None
+        with self.lock:
+            self._store(path, image)
+        return image.copy()
+
+    def close(self):
+        """Stop the loader threads and drop the cache."""
+        with self.lock:
+            for future in self.pending.values():
+                future.cancel()
+            self.pending.clear()
+            self.cache.clear()
+            self.upcoming = iter(())
+        self.pool.shutdown(wait=True)
+        logging.info(f"🗂️ Image loader: {self.ready} prefetched in time, {self.waits} waited, "
+                     f"{self.hits} cached, {self.misses} loaded on request")
+
+    def stats(self):
+        """Get the loader counters.
+
+        Returns:
+            dict: Cache hits, prefetched frames loaded in time or waited for, frames loaded
+                on request and cached frames.
+        """
+        with self.lock:
+            return {'hits': self.hits, 'ready': self.ready, 'waits': self.waits, 'misses': self.misses,
+                    'cached': len(self.cache)}
+
+    def _take(self, path):
+        """Remove the prefetch of path; prefetches planned before it were skipped by the caller."""
+        if path not in self.pending:
+            return None
+        while True:
+            skipped, future = self.pending.popitem(last=False)
+            if skipped == path:
+                return future
+            if future.done() and not future.cancelled() and future.exception() is None and future.result() is not None:
+                self._store(skipped, future.result())
+            else:
+                future.cancel()
+
+    def _fill(self):
+        while len(self.pending) < self.ahead:
+            path = next(self.upcoming, None)
+            if path is None:
+                return
+            if path not in self.cache and path not in self.pending:
+                self.pending[path] = self.pool.submit(self.load, path)
+
+    def _store(self, path, image):
+        self.cache[path] = image
+        self.cache.move_to_end(path)
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
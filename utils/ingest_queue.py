@@ -0,0 +1,196 @@
+import queue
+import threading
+from collections import deque
+
+
+class IngestQueue:
+    POLICIES = ('block', 'drop_oldest', 'latest_only')
+
+    def __init__(self, maxsize=0, policy='block', on_drop=None, log_backlog=1024):
+        """Bounded queue between the socket receiver and the visualizer.
+
+        Overload policies, applied when the queue holds `maxsize` items:
+            block:       the receiver waits for the consumer (TCP backpressure to the device).
+            drop_oldest: the oldest item is discarded.
+            latest_only: only the newest frame keeps its image; older frames are downgraded
+                         to log-only items (data['log_only'] = True) so every JSON log still
+                         reaches the log writer. Log-only items do not count against `maxsize`;
+                         they are bounded by `log_backlog` instead, and the receiver waits for
+                         the consumer when that many are queued, so no log is ever discarded.
+
+        Args:
+            maxsize (int, optional): Maximum number of queued items, 0 for unbounded. Defaults to 0.
+            policy (str, optional): One of POLICIES. Defaults to 'block'.
+            on_drop (callable, optional): Called with an item whose image is discarded, e.g. to
+                return its receive buffer. Defaults to None.
+            log_backlog (int, optional): Maximum number of queued items without an image under
+                'latest_only', 0 for unbounded. Defaults to 1024.
+
+        Raises:
+            ValueError: If the policy is unknown.
+        """
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown overload policy '{policy}', expected one of {self.POLICIES}")
+
+        self.maxsize = maxsize
+        self.policy = policy
+        self.on_drop = on_drop
+        self.log_backlog = log_backlog
+
+        self.items = deque()
+        self.latest = None  # The queued item that keeps its image (latest_only)
+        self.condition = threading.Condition()
+        self.closed = False
+
+        # Statistics
+        self.counters = {
+            'received': 0,     # Items put by the receiver
+            'delivered': 0,    # Items returned by get()
+            'blocked': 0,      # Puts that had to wait for the consumer (block, full log backlog)
+            'dropped': 0,      # Items discarded entirely (drop_oldest, closed queue)
+            'downgraded': 0,   # Frames whose image was discarded but whose log was kept (latest_only)
+            'max_depth': 0,    # Highest number of queued items seen
+            'log_depth': 0,    # Queued items without an image (latest_only)
+            'max_log_depth': 0,  # Highest number of queued items without an image seen (latest_only)
+        }
+
+    def put(self, item, block=True):
+        """Add an item, applying the overload policy when the queue is full.
+
+        Args:
+            item (dict): The received data.
+            block (bool, optional): Wait for the consumer when the 'block' policy finds the queue
+                full, or 'latest_only' finds the log backlog full. 'drop_oldest' never waits.
+                Defaults to True.
+
+        Returns:
+            bool: True if the item was queued, False if it was dropped because the queue is closed.
+
+        Raises:
+            queue.Full: If block is False and the item would have to wait. The item is not counted.
+        """
+        with self.condition:
+            if not block and self.policy != 'drop_oldest' and self._full() and not self.closed:
+                raise queue.Full
+            self.counters['received'] += 1
+
+            if self._full():
+                if self.policy == 'drop_oldest':
+                    self._drop_oldest()
+                else:
+                    self.counters['blocked'] += 1
+                    self.condition.wait_for(lambda: not self._full() or self.closed)
+
+            if self.closed:
+                self._discard(item)
+                return False
+
+            if self.policy == 'latest_only' and item.get('image') is not None:
+                if self.latest is not None:
+                    self._downgrade(self.latest)
+                self.latest = item
+            self.items.append(item)
+            self.counters['max_depth'] = max(self.counters['max_depth'], len(self.items))
+            self._count_logs()
+            self.condition.notify_all()
+            return True
+
+    def put_nowait(self, item):
+        """Add an item without waiting, see put().
+
+        Raises:
+            queue.Full: If the 'block' policy finds the queue full.
+        """
+        return self.put(item, block=False)
+
+    def get(self, block=True, timeout=None):
+        """Remove and return the oldest item.
+
+        Args:
+            block (bool, optional): Wait for an item when the queue is empty. Defaults to True.
+            timeout (float, optional): Maximum seconds to wait, None to wait forever. Defaults to None.
+
+        Returns:
+            dict: The received data.
+
+        Raises:
+            queue.Empty: If no item is available in time, or the queue is closed and drained.
+        """
+        with self.condition:
+            if block:
+                self.condition.wait_for(lambda: self.items or self.closed, timeout)
+            if not self.items:
+                raise queue.Empty
+
+            item = self.items.popleft()
+            if item is self.latest:
+                self.latest = None
+            self.counters['delivered'] += 1
+            self._count_logs()
+            self.condition.notify_all()
+            return item
+
+    def qsize(self):
+        """Get the number of queued items.
+
+        Returns:
+            int: The number of queued items.
+        """
+        with self.condition:
+            return len(self.items)
+
+    def empty(self):
+        """Check if the queue is empty.
+
+        Returns:
+            bool: True if no item is queued, False otherwise.
+        """
+        return self.qsize() == 0
+
+    def close(self):
+        """Wake a receiver blocked on a full queue and the consumers waiting for an item.
+
+        Items put afterwards are dropped; queued items can still be taken, then get()
+        raises queue.Empty at once instead of waiting.
+        """
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+    def stats(self):
+        """Get the queue statistics.
+
+        Returns:
+            dict: The policy, the current depth and the counters.
+        """
+        with self.condition:
+            return dict(self.counters, policy=self.policy, maxsize=self.maxsize, depth=len(self.items))
+
+    def _full(self):
+        if self.policy == 'latest_only':
+            # At most one queued item keeps its image, only the log backlog is bounded
+            return self.log_backlog > 0 and self._log_depth() >= self.log_backlog
+        return self.maxsize > 0 and len(self.items) >= self.maxsize
+
+    def _log_depth(self):
+        return len(self.items) - (self.latest is not None)
+
+    def _count_logs(self):
+        if self.policy == 'latest_only':
+            depth = self.counters['log_depth'] = self._log_depth()
+            self.counters['max_log_depth'] = max(self.counters['max_log_depth'], depth)
+
+    def _drop_oldest(self):
+        self._discard(self.items.popleft())
+
+    def _downgrade(self, item):
+        if self.on_drop:
+            self.on_drop(item)
+        item['image'] = None
+        item['log_only'] = True
+        self.counters['downgraded'] += 1
+
+    def _discard(self, item):
+        if self.on_drop and item.get('image') is not None:
+            self.on_drop(item)
+        self.counters['dropped'] += 1
@@ -0,0 +1,224 @@
+import json
+import time
+import logging
+import threading
+from collections import deque
+
+# Per-frame timing spans of the online path, in milliseconds:
+#
+#   transport     device timestamp -> host receive (protocol version >= 2, clocks must be in sync)
+#   accept        connection accepted -> session ready (legacy: -> first frame byte)
+#   recv_header   rest of the frame header once its first byte arrived
+#   recv_image    image payload
+#   recv_log      image path and JSON log payloads
+#   queue_wait    host receive -> taken off the ingest queue
+#   decode        JPEG decode
+#   json_parse    json.loads of the log and field extraction
+#   resize        image load and resize to the output size
+#   draw_*        one span per Drawer layer (adas_detection, adas, vanish_line, detect_objs,
+#                 track_objs, tailing_objs, lane, text)
+#   display       imshow + waitKey
+#   save_image    rendered (and raw) image writes
+#   save_video    handing the rendered frame to the result video writer thread
+#   log_append    JSON log append
+#   frame_total   host receive -> frame fully handled
+
+
+class _NullSpan:
+    """Span used when profiling is disabled: does nothing."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def lap(self, name):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    def __init__(self, tracker, name):
+        self.tracker = tracker
+        self.name = name
+        self.start = time.perf_counter()
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.tracker.record(self.name, 1000 * (time.perf_counter() - self.start))
+        return False
+
+    def lap(self, name):
+        """Record the time since the previous lap (or the start) under a span name.
+
+        Args:
+            name (str): The span name.
+        """
+        now = time.perf_counter()
+        self.tracker.record(name, 1000 * (now - self.start))
+        self.start = now
+
+
+class LatencyTracker:
+    def __init__(self, enabled=False, window=1000, report_interval=10, dump_file=None):
+        """Rolling per-span latency histograms.
+
+        Every span keeps its last `window` samples, the report gives their percentiles.
+        Recording is thread-safe, so receiver threads, pipeline stages and the main
+        thread share one tracker (the module-level `tracker`).
+
+        Args:
+            enabled (bool, optional): Record samples. When False, span() and laps() return
+                a no-op and record() returns at once. Defaults to False.
+            window (int, optional): Samples kept per span. Defaults to 1000.
+            report_interval (float, optional): Seconds between reports, 0 to only report on
+                demand. Defaults to 10.
+            dump_file (str, optional): JSON lines file every report is appended to. Defaults to None.
+        """
+        self.lock = threading.Lock()
+        self.configure(enabled, window, report_interval, dump_file)
+
+    def configure(self, enabled=False, window=1000, report_interval=10, dump_file=None):
+        """Change the settings and clear the samples. See __init__ for the arguments."""
+        with self.lock:
+            self.enabled = enabled
+            self.window = window
+            self.report_interval = report_interval
+            self.dump_file = dump_file or None
+            self.samples = {}
+            self.counts = {}
+            self.last_report = time.time()
+
+    def record(self, name, ms):
+        """Add a sample to a span.
+
+        Args:
+            name (str): The span name.
+            ms (float): The duration in milliseconds.
+        """
+        if not self.enabled:
+            return
+        with self.lock:
+            samples = self.samples.get(name)
+            if samples is None:
+                samples = self.samples[name] = deque(maxlen=self.window)
+                self.counts[name] = 0
+            samples.append(ms)
+            self.counts[name] += 1
+
+    def span(self, name):
+        """Time a block of code.
+
+        Args:
+            name (str): The span name.
+
+        Returns:
+            context manager: Records the duration of the `with` block.
+        """
+        return _Span(self, name) if self.enabled else _NULL_SPAN
+
+    def laps(self):
+        """Time consecutive steps of a function without re-indenting them.
+
+        Returns:
+            object: Call lap(name) after each step to record the time since the previous one.
+        """
+        return _Span(self, None) if self.enabled else _NULL_SPAN
+
+    def record_frame(self, data):
+        """Record the transport and queue wait spans of a frame taken off the ingest queue.
+
+        Also emits the periodic report when it is due.
+
+        Args:
+            data (dict): The received data, with 'recv_timestamp_us' and 'device_timestamp_us'.
+        """
+        if not self.enabled or not data:
+            return
+        now_us = time.time() * 1e6
+        recv_us = data.get('recv_timestamp_us')
+        if recv_us:
+            self.record('queue_wait', (now_us - recv_us) / 1000)
+            if data.get('device_timestamp_us'):
+                self.record('transport', (recv_us - data['device_timestamp_us']) / 1000)
+        self.maybe_report()
+
+    def record_frame_done(self, data):
+        """Record the frame_total span of a frame that was fully handled.
+
+        Args:
+            data (dict): The received data, with 'recv_timestamp_us'.
+        """
+        if not self.enabled or not data or not data.get('recv_timestamp_us'):
+            return
+        self.record('frame_total', (time.time() * 1e6 - data['recv_timestamp_us']) / 1000)
+
+    def stats(self):
+        """Get the percentiles of every span over its rolling window.
+
+        Returns:
+            dict: Span name to total count, window size, mean, p50, p95, p99 and max (ms).
+        """
+        with self.lock:
+            snapshot = {name: (sorted(samples), self.counts[name]) for name, samples in self.samples.items()}
+
+        report = {}
+        for name, (ordered, count) in snapshot.items():
+            if not ordered:
+                continue
+            n = len(ordered)
+            report[name] = {
+                'count': count,
+                'window': n,
+                'mean': round(sum(ordered) / n, 3),
+                'p50': round(ordered[min(n - 1, int(0.50 * n))], 3),
+                'p95': round(ordered[min(n - 1, int(0.95 * n))], 3),
+                'p99': round(ordered[min(n - 1, int(0.99 * n))], 3),
+                'max': round(ordered[-1], 3),
+            }
+        return report
+
+    def maybe_report(self):
+        """Report if the report interval elapsed since the last report."""
+        if self.report_interval and time.time() - self.last_report >= self.report_interval:
+            self.report()
+
+    def report(self):
+        """Log the span percentiles and append them to the dump file."""
+        self.last_report = time.time()
+        stats = self.stats()
+        if not stats:
+            return
+        for name, span in stats.items():
+            logging.info(f"⏱️ {name:22} n={span['count']:<7} p50={span['p50']:>8.2f}ms "
+                         f"p95={span['p95']:>8.2f}ms p99={span['p99']:>8.2f}ms max={span['max']:>8.2f}ms")
+        if self.dump_file:
+            try:
+                with open(self.dump_file, 'a') as f:
+                    f.write(json.dumps({'time': self.last_report, 'spans': stats}) + '\n')
+            except OSError as e:
+                logging.error(f"❌ Failed to write latency report to {self.dump_file}: {e}")
+
+
+# Shared by the receivers, the visualizers and the Drawers
+tracker = LatencyTracker()
+
+
+def configure(config):
+    """Configure the shared tracker from the PROFILE settings.
+
+    Args:
+        config: Configuration object containing the profile_* parameters.
+    """
+    tracker.configure(enabled=config.profile_enabled,
+                      window=config.profile_window,
+                      report_interval=config.profile_report_interval,
+                      dump_file=config.profile_dump_file)
+    if tracker.enabled:
+        logging.info(f"⏱️ Latency profiling enabled (window {tracker.window}, report every {tracker.report_interval}s)")
@@ -0,0 +1,124 @@
+import time
+import logging
+import multiprocessing as mp
+
+# Drawer of the worker process, created by _init_worker
+_drawer = None
+
+
+def _init_worker(config):
+    """Create the Drawer of a render worker.
+
+    Args:
+        config: Configuration object containing necessary parameters.
+    """
+    global _drawer
+    from utils.drawer import Drawer
+    _drawer = Drawer(config)
+    _drawer.index_dataset()  # Read from the sidecar file written by the main process
+
+
+def _render_line(task):
+    """Render the frames of one log line in a worker.
+
+    Args:
+        task (tuple): The JSON data of the line, whether to return the images encoded (to save
+            them) and whether to return them decoded (to show them or write the result video).
+
+    Returns:
+        tuple: The rendered frames as (frame ID, encoded image, image, frame data, alert), the
+            frame IDs and tailing distances for the distance plot, and an error message or None.
+    """
+    import cv2
+    json_data, encode, raw = task
+    frames = []
+    error = None
+    try:
+        for frame_id, im, frame_data, alert in _drawer.render_json_data(json_data):
+            encoded = None
+            if encode:
+                ok, buffer = cv2.imencode(f'.{_drawer.image_format}', im)
+                encoded = buffer.tobytes() if ok else None
+            frames.append((frame_id, encoded, im if raw else None, frame_data, alert))
+    except Exception as e:
+        error = str(e)
+    result = (frames, _drawer.frame_ids, _drawer.distances, error)
+    _drawer.frame_ids, _drawer.distances = [], []
+    return result
+
+
+class OfflineRenderer:
+    def __init__(self, drawer, processes, chunksize=8, report_interval=5):
+        """Render an offline log in worker processes.
+
+        Every worker parses, loads, draws and encodes whole log lines with its own Drawer.
+        The results come back in log order, so images, JSON logs and the distance plot
+        data are written as by the single process path. Drawer.render_json_data resets
+        its per-frame state (tailing box, ADAS alert) at every frame, so a frame renders
+        the same whichever worker draws it; the images are saved through ImageSaver.
+
+        Args:
+            drawer (Drawer): The Drawer of the main process: configuration, outputs and display.
+            processes (int): Number of worker processes.
+            chunksize (int, optional): Log lines sent to a worker at once. Defaults to 8.
+            report_interval (float, optional): Seconds between progress reports. Defaults to 5.
+        """
+        self.drawer = drawer
+        self.processes = processes
+        self.chunksize = chunksize
+        self.report_interval = report_interval
+
+        # Statistics
+        self.lines = 0
+        self.frames = 0
+        self.errors = 0
+
+    def run(self, json_lines):
+        """Render every line and write the results in order.
+
+        Args:
+            json_lines (iterable): JSON data of the log lines.
+
+        Returns:
+            float: Elapsed seconds.
+        """
+        drawer = self.drawer
+        encode = drawer.save_airesultimage
+        raw = drawer.show_airesultimage or drawer.video_sink is not None
+        tasks = ((json_data, encode, raw) for json_data in json_lines)
+
+        start = time.perf_counter()
+        last_report = start
+        ctx = mp.get_context('spawn')  # Same start method on every platform
+        logging.info(f"🧩 Rendering offline with {self.processes} processes")
+        with ctx.Pool(self.processes, initializer=_init_worker, initargs=(drawer.args,)) as pool:
+            for frames, frame_ids, distances, error in pool.imap(_render_line, tasks, self.chunksize):
+                self.lines += 1
+                drawer.frame_ids.extend(frame_ids)
+                drawer.distances.extend(distances)
+                if error is not None:
+                    self.errors += 1
+                    logging.error(f"Unexpected error: {error}")
+
+                for frame_id, encoded, im, frame_data, alert in frames:
+                    if encoded is not None:
+                        drawer.img_saver.save_encoded(encoded, frame_ID=frame_id)
+                    if im is not None:
+                        if drawer.show_airesultimage:
+                            drawer.show_offline_result(im, alert)
+                        if drawer.video_sink is not None:
+                            drawer.video_sink.write(im, copy=False)
+                    if drawer.save_jsonlog:
+                        drawer.img_saver.save_json_log_txt(frame_data)
+                    self.frames += 1
+
+                now = time.perf_counter()
+                if self.report_interval and now - last_report >= self.report_interval:
+                    last_report = now
+                    logging.info(f"🖼️ Rendered {self.frames} frames from {self.lines} lines "
+                                 f"({self.frames / (now - start):.1f} fps)")
+
+        elapsed = time.perf_counter() - start
+        logging.info(f"🏁 Rendered {self.frames} frames in {elapsed:.2f}s "
+                     f"({self.frames / max(elapsed, 1e-9):.1f} fps, {self.processes} processes, {self.errors} errors)")
+        return elapsed
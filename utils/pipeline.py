@@ -0,0 +1,155 @@
+import time
+import queue
+import logging
+import threading
+
+_STOP = object()  # Sentinel pushed through the stages on shutdown
+
+
+class Stage:
+    def __init__(self, name, func, queue_size=4):
+        """One step of a StagedPipeline, served by a dedicated worker thread.
+
+        Args:
+            name (str): Stage name used in the occupancy report.
+            func (callable): Called with each item; its return value is forwarded to the
+                outputs, None drops the item.
+            queue_size (int, optional): Capacity of the input queue. Defaults to 4.
+        """
+        self.name = name
+        self.func = func
+        self.input = queue.Queue(maxsize=queue_size)
+        self.outputs = []  # Stages or plain queues the results are forwarded to
+        self.thread = None
+
+        # Statistics
+        self.processed = 0
+        self.errors = 0
+        self.busy_time = 0.0
+        self.max_depth = 0
+
+    def connect(self, output):
+        """Forward the results of this stage to another stage or queue.
+
+        Args:
+            output (Stage or queue.Queue): The consumer of the results.
+
+        Returns:
+            Stage or queue.Queue: The output, to chain calls.
+        """
+        self.outputs.append(output)
+        return output
+
+    def put(self, item):
+        self.max_depth = max(self.max_depth, self.input.qsize() + 1)
+        self.input.put(item)
+
+    def _forward(self, item):
+        for output in self.outputs:
+            output.put(item)
+
+    def _run(self):
+        while True:
+            item = self.input.get()
+            if item is _STOP:
+                self._forward(_STOP)
+                return
+
+            start = time.perf_counter()
+            try:
+                result = self.func(item)
+            except Exception as e:
+                self.errors += 1
+                result = None
+                logging.error(f"❌ Stage '{self.name}': {e}", exc_info=True)
+            self.busy_time += time.perf_counter() - start
+            self.processed += 1
+
+            if result is not None:
+                self._forward(result)
+
+
+class StagedPipeline:
+    def __init__(self, stages):
+        """Run stages on separate threads with bounded queues in between.
+
+        Stages are wired with Stage.connect() before start(). The first stage receives
+        the items given to put(); a stage with several outputs feeds all of them, and a
+        stage without outputs is a sink (e.g. a writer). Throughput is bounded by the
+        slowest stage instead of the sum of all stages.
+
+        Args:
+            stages (list): The stages, the entry stage first.
+        """
+        self.stages = stages
+        self.start_time = None
+
+    def start(self):
+        """Start one worker thread per stage."""
+        self.start_time = time.perf_counter()
+        for stage in self.stages:
+            stage.thread = threading.Thread(target=stage._run, name=f"pipeline-{stage.name}", daemon=True)
+            stage.thread.start()
+
+    def put(self, item):
+        """Feed an item to the entry stage, blocking while its queue is full.
+
+        Args:
+            item (Any): The item to process.
+        """
+        self.stages[0].put(item)
+
+    def close(self):
+        """Mark the end of the input. Queued items are still processed, then the
+        end-of-stream marker reaches every output queue (see is_stop)."""
+        self.stages[0].put(_STOP)
+
+    def join(self):
+        """Wait for every stage to finish. Output queues must be drained meanwhile."""
+        for stage in self.stages:
+            stage.thread.join()
+
+    def stop(self):
+        """Drain the queued items, then stop every stage in order."""
+        self.close()
+        self.join()
+
+    def occupancy(self):
+        """Get the per-stage statistics.
+
+        Busy is the fraction of wall time the stage spent working: the stage close to
+        1.0 is the bottleneck.
+
+        Returns:
+            dict: Stage name to processed items, errors, busy fraction, mean time per item,
+                current and maximum queue depth.
+        """
+        elapsed = max(time.perf_counter() - self.start_time, 1e-9) if self.start_time else 1e-9
+        report = {}
+        for stage in self.stages:
+            report[stage.name] = {
+                'processed': stage.processed,
+                'errors': stage.errors,
+                'busy': round(stage.busy_time / elapsed, 3),
+                'ms_per_item': round(1000 * stage.busy_time / stage.processed, 2) if stage.processed else 0.0,
+                'depth': stage.input.qsize(),
+                'max_depth': stage.max_depth,
+            }
+        return report
+
+    def log_occupancy(self):
+        """Log the per-stage statistics."""
+        for name, stats in self.occupancy().items():
+            logging.info(f"📊 Stage {name:8}: {stats}")
+
+    @staticmethod
+    def is_stop(item):
+        """Check if an item taken from an output queue is the end-of-stream marker.
+
+        Args:
+            item (Any): The item.
+
+        Returns:
+            bool: True if the pipeline was stopped.
+        """
+        return item is _STOP
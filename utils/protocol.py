@@ -0,0 +1,160 @@
+import struct
+
+# Wire protocol shared by the LI80 sender (SDK_Code/socket.cpp) and the host receivers.
+#
+# Version 0 (legacy) : one frame per TCP connection, the JSON log is terminated by
+#                      the connection close (or a trailing '\r\n\r\n').
+# Version 1 (session): the device opens the connection with SESSION_MAGIC and the
+#                      requested version, the host answers with the accepted version
+#                      and the connection then carries an unbounded sequence of frames.
+#                      Every field, including the JSON log, is length-prefixed.
+# Version 2 (envelope): like version 1, but every frame starts with a fixed-size
+#                      ENVELOPE_HEADER carrying all field sizes, so the host reads
+#                      the payloads straight into preallocated buffers.
+# Version 3 (device id): like version 2, but right after the handshake the device sends
+#                      its id (length-prefixed UTF-8) so one host can tell devices apart.
+
+SESSION_MAGIC = b'ADSS'  # First 4 bytes of a session handshake (never a plausible frame_index)
+
+PROTOCOL_VERSION_LEGACY = 0
+PROTOCOL_VERSION_SESSION = 1
+PROTOCOL_VERSION_ENVELOPE = 2
+PROTOCOL_VERSION_DEVICE_ID = 3
+PROTOCOL_VERSION_MAX = PROTOCOL_VERSION_DEVICE_ID
+
+DEVICE_ID_MAX_SIZE = 255
+
+JSON_LOG_TERMINATOR = b'\r\n\r\n'
+
+FRAME_MAGIC = b'ADFR'  # First 4 bytes of every envelope header
+# magic, version, flags, frame_index, device timestamp (us), image size, image path size, log size
+ENVELOPE_HEADER = struct.Struct('>4sHHIQIII')
+
+
+def pack_uint32(value):
+    """Pack an unsigned integer as 4 big-endian bytes.
+
+    Args:
+        value (int): The value to pack.
+
+    Returns:
+        bytes: The packed value.
+    """
+    return struct.pack('>I', value)
+
+
+def unpack_uint32(data):
+    """Unpack 4 big-endian bytes into an unsigned integer.
+
+    Args:
+        data (bytes): The bytes to unpack.
+
+    Returns:
+        int: The unpacked value.
+    """
+    return struct.unpack('>I', data)[0]
+
+
+def negotiate_version(requested_version, max_version=PROTOCOL_VERSION_MAX):
+    """Pick the protocol version used for a session.
+
+    Args:
+        requested_version (int): The highest version offered by the device.
+        max_version (int): The highest version accepted by the host.
+
+    Returns:
+        int: The accepted version, PROTOCOL_VERSION_LEGACY if no session is possible.
+    """
+    return max(PROTOCOL_VERSION_LEGACY, min(requested_version, max_version, PROTOCOL_VERSION_MAX))
+
+
+def build_session_request(version=PROTOCOL_VERSION_MAX):
+    """Build the handshake a device sends to open a session.
+
+    Args:
+        version (int): The highest version the device supports.
+
+    Returns:
+        bytes: SESSION_MAGIC followed by the requested version.
+    """
+    return SESSION_MAGIC + pack_uint32(version)
+
+
+def build_device_id(device_id):
+    """Build the device id a device sends after the handshake (protocol version >= 3).
+
+    Args:
+        device_id (str): The device id.
+
+    Returns:
+        bytes: The length-prefixed UTF-8 device id.
+
+    Raises:
+        ValueError: If the encoded id is longer than DEVICE_ID_MAX_SIZE bytes.
+    """
+    data = device_id.encode('utf-8')
+    if len(data) > DEVICE_ID_MAX_SIZE:
+        raise ValueError(f"Device id longer than {DEVICE_ID_MAX_SIZE} bytes: {device_id!r}")
+    return pack_uint32(len(data)) + data
+
+
+def pack_envelope_header(frame_index, image_size, path_size, log_size, timestamp_us=0, flags=0,
+                         version=PROTOCOL_VERSION_ENVELOPE):
+    """Pack the envelope header that precedes a frame in protocol version 2.
+
+    Args:
+        frame_index (int): The frame index on the device.
+        image_size (int): Size of the encoded image in bytes (0 for log-only frames).
+        path_size (int): Size of the UTF-8 image path in bytes (0 when not sent).
+        log_size (int): Size of the UTF-8 JSON log in bytes.
+        timestamp_us (int, optional): Device timestamp in microseconds. Defaults to 0.
+        flags (int, optional): Reserved flags. Defaults to 0.
+        version (int, optional): Envelope version. Defaults to PROTOCOL_VERSION_ENVELOPE.
+
+    Returns:
+        bytes: The packed header.
+    """
+    return ENVELOPE_HEADER.pack(FRAME_MAGIC, version, flags, frame_index, timestamp_us,
+                                image_size, path_size, log_size)
+
+
+def unpack_envelope_header(data):
+    """Unpack an envelope header.
+
+    Args:
+        data (bytes-like): Exactly ENVELOPE_HEADER.size bytes.
+
+    Returns:
+        dict: The header fields.
+
+    Raises:
+        ValueError: If the header does not start with FRAME_MAGIC.
+    """
+    magic, version, flags, frame_index, timestamp_us, image_size, path_size, log_size = ENVELOPE_HEADER.unpack(data)
+    if magic != FRAME_MAGIC:
+        raise ValueError(f"Invalid envelope magic: {magic!r}")
+    return {
+        'version': version,
+        'flags': flags,
+        'frame_index': frame_index,
+        'timestamp_us': timestamp_us,
+        'image_size': image_size,
+        'path_size': path_size,
+        'log_size': log_size,
+    }
+
+
+def find_json_log_terminator(buffer, start=0):
+    """Find JSON_LOG_TERMINATOR in a growing receive buffer.
+
+    Callers pass the length of the buffer before the last chunk was appended as `start`,
+    so a terminator split across two chunks is still found without rescanning the buffer.
+
+    Args:
+        buffer (bytearray): The received bytes.
+        start (int, optional): Offset of the newly appended chunk. Defaults to 0.
+
+    Returns:
+        int: Index of the terminator, or -1 if not found.
+    """
+    return buffer.find(JSON_LOG_TERMINATOR, max(0, start - len(JSON_LOG_TERMINATOR) + 1))
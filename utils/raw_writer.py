@@ -0,0 +1,115 @@
+import os
+import queue
+import logging
+import threading
+
+# File extension of the encoded formats recognized from their first bytes
+_SIGNATURES = ((b'\xff\xd8', 'jpg'), (b'\x89PNG', 'png'))
+
+
+class RawFrameWriter:
+    def __init__(self, image_format='jpg', basename='frame_', container='files', queue_size=64):
+        """Archive received frames as their encoded bytes, on a writer thread.
+
+        The bytes sent by the camera are written as they are, so raw frames are not
+        decoded and re-encoded. With the 'files' container every frame is one image
+        file; with 'mjpeg' the JPEG frames of a directory are appended to one
+        raw.mjpeg stream (playable with ffmpeg -f mjpeg) and raw.idx lists the
+        frame index, offset and size of every frame.
+
+        Args:
+            image_format (str, optional): Extension of frames whose format is not recognized. Defaults to 'jpg'.
+            basename (str, optional): File name prefix of the 'files' container. Defaults to 'frame_'.
+            container (str, optional): 'files' or 'mjpeg'. Defaults to 'files'.
+            queue_size (int, optional): Frames waiting for the writer thread before write() blocks. Defaults to 64.
+        """
+        if container not in ('files', 'mjpeg'):
+            raise ValueError(f"Unsupported raw image container: {container}")
+        self.image_format = image_format
+        self.basename = basename
+        self.container = container
+
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.thread = None
+        self.lock = threading.Lock()
+        self.closed = False
+        self.streams = {}  # Directory to open (stream file, index file) of the 'mjpeg' container
+
+        # Statistics
+        self.frames = 0
+        self.bytes = 0
+        self.errors = 0
+
+    def write(self, encoded, frame_index, save_dir):
+        """Queue an encoded frame for the writer thread, blocking while the queue is full.
+
+        Args:
+            encoded (bytes-like): The encoded image. It is copied, so pooled receive
+                buffers can be released after the call.
+            frame_index (int): Index of the frame, used in the file name.
+            save_dir (str): Directory of the raw frames.
+        """
+        with self.lock:
+            if self.closed:
+                return
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._write_loop, name='RawFrameWriter', daemon=True)
+                self.thread.start()
+        self.queue.put((bytes(encoded), frame_index, save_dir))
+
+    def close(self):
+        """Write the queued frames and close the open streams."""
+        with self.lock:
+            if self.closed:
+                return
+            self.closed = True
+            thread = self.thread
+        if thread is None:
+            return
+        self.queue.put(None)
+        thread.join()
+        logging.info(f"💾 Archived {self.frames} raw frames ({self.bytes / 1e6:.1f} MB, {self.errors} errors)")
+
+    def stats(self):
+        """Get the writer counters.
+
+        Returns:
+            dict: Frames and bytes written, errors and queued frames.
+        """
+        return {'frames': self.frames, 'bytes': self.bytes, 'errors': self.errors, 'queued': self.queue.qsize()}
+
+    def _write_loop(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            encoded, frame_index, save_dir = item
+            try:
+                if self.container == 'mjpeg' and encoded[:2] == b'\xff\xd8':
+                    self._append(encoded, frame_index, save_dir)
+                else:
+                    self._write_file(encoded, frame_index, save_dir)
+                self.frames += 1
+                self.bytes += len(encoded)
+            except OSError as e:
+                self.errors += 1
+                logging.error(f"❌ Failed to save raw frame {frame_index} to {save_dir}: {e}")
+        for stream, index in self.streams.values():
+            stream.close()
+            index.close()
+        self.streams.clear()
+
+    def _write_file(self, encoded, frame_index, save_dir):
+        extension = next((ext for signature, ext in _SIGNATURES if encoded.startswith(signature)), self.image_format)
+        with open(os.path.join(save_dir, f'{self.basename}{frame_index}.{extension}'), 'wb') as f:
+            f.write(encoded)
+
+    def _append(self, encoded, frame_index, save_dir):
+        files = self.streams.get(save_dir)
+        if files is None:
+            os.makedirs(save_dir, exist_ok=True)
+            files = self.streams[save_dir] = (open(os.path.join(save_dir, 'raw.mjpeg'), 'ab'),
+                                              open(os.path.join(save_dir, 'raw.idx'), 'a'))
+        stream, index = files
+        index.write(f'{frame_index} {stream.tell()} {len(encoded)}\n')
+        stream.write(encoded)
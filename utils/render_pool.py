@@ -0,0 +1,244 @@
+import queue
+import logging
+import threading
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import numpy as np
+
+
+def _render_worker(config, slot_names, slot_shape, tasks, results):
+    """Worker process: decode JPEG frames, draw the AI results and write the rendered
+    image into the shared memory slot chosen by the parent.
+
+    Args:
+        config: Configuration object containing necessary parameters.
+        slot_names (list): Names of the shared memory slots.
+        slot_shape (tuple): Shape of the rendered image (height, width, channels).
+        tasks (multiprocessing.Queue): Tasks of this worker, (seq, slot, encoded image, JSON log,
+            device image path or None) tuples, None to stop.
+        results (multiprocessing.Queue): (seq, slot, result metadata, error) tuples.
+    """
+    import cv2
+    from utils.drawer import Drawer
+    from utils import latency
+
+    # Worker spans (decode, draw layers) are reported by each worker
+    latency.configure(config)
+    drawer = Drawer(config)
+    slots = [shared_memory.SharedMemory(name=name) for name in slot_names]
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            seq, slot, encoded, json_log, image_path = task
+            try:
+                with latency.tracker.span('decode'):
+                    image = drawer.decode_frame(encoded)
+                if image is None:
+                    raise ValueError("Failed to decode image from buffer.")
+                result = drawer.render_json_log(json_log, img_buffer=image, device_image_path=image_path)
+
+                rendered = result.pop('image')
+                if rendered.shape != slot_shape:
+                    rendered = cv2.resize(rendered, (slot_shape[1], slot_shape[0]), interpolation=cv2.INTER_AREA)
+                np.ndarray(slot_shape, np.uint8, buffer=slots[slot].buf)[:] = rendered
+                results.put((seq, slot, result, None))
+            except Exception as e:
+                results.put((seq, slot, None, str(e)))
+            latency.tracker.maybe_report()
+    finally:
+        for shm in slots:
+            shm.close()
+
+
+class RenderPool:
+    def __init__(self, config, processes, slots=None):
+        """Decode and render frames in worker processes.
+
+        Encoded frames go to the workers through a queue; rendered frames come back in
+        shared memory slots instead of being pickled, and are returned by get() in
+        submission order (the frame_index order of the stream). A slot stays reserved
+        until release() is called, which bounds the number of frames in flight.
+
+        Every worker has its own task queue, so the frames a worker holds are known: when a
+        worker process dies (crash in cv2, OOM kill), its frames are returned as failed
+        frames, their slots are freed and a new worker takes its place.
+
+        Args:
+            config: Configuration object containing necessary parameters.
+            processes (int): Number of worker processes.
+            slots (int, optional): Number of shared memory slots. Defaults to 2 * processes.
+        """
+        self.processes = processes
+        # Same output size as Drawer.out_w/out_h
+        self.slot_shape = (config.resize_h, config.resize_w, 3) if config.resize else (config.model_h, config.model_w, 3)
+        slot_size = int(np.prod(self.slot_shape))
+        slots = slots or 2 * processes
+
+        self.shm = [shared_memory.SharedMemory(create=True, size=slot_size) for _ in range(slots)]
+        self.free_slots = queue.Queue()
+        for slot in range(slots):
+            self.free_slots.put(slot)
+
+        self.config = config
+        self.ctx = mp.get_context('spawn')  # The parent runs socket threads, do not fork them
+        self.results = self.ctx.Queue()
+        self.workers = [None] * processes
+        self.tasks = [None] * processes
+        self.assigned = [set() for _ in range(processes)]  # Sequence numbers sent to each worker
+
+        # Reordering
+        self.lock = threading.Lock()
+        self.next_seq = 0   # Sequence number of the next submitted frame
+        self.next_out = 0   # Sequence number of the next frame returned by get()
+        self.ready = {}     # Finished frames waiting for their turn
+        self.inflight = {}  # Received data, slot and worker of the frames being rendered
+        self.restarts = 0   # Workers replaced after they died
+
+    def start(self):
+        """Start the worker processes."""
+        for i in range(self.processes):
+            self._start_worker(i)
+        logging.info(f"🧩 Render pool started with {self.processes} processes and {len(self.shm)} slots")
+
+    def submit(self, data):
+        """Send a received frame to the workers, blocking while every slot is in use.
+
+        The encoded image is copied out of the receive buffer, which is released.
+        Log-only frames skip the workers but keep their place in the order.
+
+        Args:
+            data (dict): Dictionary containing image data and JSON log.
+        """
+        if data.get('log_only') or data.get('image') is None:
+            with self.lock:
+                self.ready[self.next_seq] = {'data': data, 'result': None, 'slot': None}
+                self.next_seq += 1
+            return
+
+        slot = self.free_slots.get()
+        encoded = bytes(data['image'])
+        if data.get('buffer') is not None:
+            data['buffer'].release()
+        data['buffer'] = None
+        data['image'] = None
+
+        with self.lock:
+            seq = self.next_seq
+            self.next_seq += 1
+            # The worker holding the fewest frames
+            worker = min(range(self.processes), key=lambda i: len(self.assigned[i]))
+            self.assigned[worker].add(seq)
+            self.inflight[seq] = {'data': data, 'slot': slot, 'worker': worker}
+            tasks = self.tasks[worker]
+        tasks.put((seq, slot, encoded, data['log'], data.get('image_path')))
+
+    def get(self, timeout=None):
+        """Get the next rendered frame in submission order.
+
+        Args:
+            timeout (float, optional): Maximum seconds to wait for a worker result. Dead workers
+                are looked for when the wait times out, so callers should pass one. Defaults to None.
+
+        Returns:
+            dict: The received data ('data'), the render result ('result', None for log-only
+                or failed frames, its 'image' is a view of the shared memory slot) and the
+                slot ('slot'), or None if the next frame is not ready in time.
+        """
+        while True:
+            with self.lock:
+                frame = self.ready.pop(self.next_out, None)
+                if frame is not None:
+                    self.next_out += 1
+                    return frame
+
+            try:
+                seq, slot, result, error = self.results.get(timeout=timeout)
+            except queue.Empty:
+                self._check_workers()
+                return None
+
+            with self.lock:
+                entry = self.inflight.pop(seq, None)
+                if entry is None:
+                    continue  # Already failed when its worker was found dead
+                self.assigned[entry['worker']].discard(seq)
+            data = entry['data']
+            if error is not None:
+                logging.error(f"❌ Render worker failed on frame {data.get('frame_index')}: {error}")
+                self.free_slots.put(slot)
+                result, slot = None, None
+            else:
+                result['image'] = np.ndarray(self.slot_shape, np.uint8, buffer=self.shm[slot].buf)
+            with self.lock:
+                self.ready[seq] = {'data': data, 'result': result, 'slot': slot}
+
+    def release(self, frame):
+        """Hand the shared memory slot of a frame back to the workers.
+
+        Args:
+            frame (dict): A frame returned by get(); its image must not be used afterwards.
+        """
+        if frame['slot'] is not None:
+            frame['result']['image'] = None
+            self.free_slots.put(frame['slot'])
+            frame['slot'] = None
+
+    def pending(self):
+        """Get the number of submitted frames not yet returned by get().
+
+        Returns:
+            int: The number of pending frames.
+        """
+        with self.lock:
+            return self.next_seq - self.next_out
+
+    def close(self, timeout=5.0):
+        """Stop the workers and free the shared memory.
+
+        Args:
+            timeout (float, optional): Seconds to wait for each worker to finish its frames
+                before it is terminated. Defaults to 5.0.
+        """
+        for worker, tasks in zip(self.workers, self.tasks):
+            if worker.is_alive():
+                tasks.put(None)
+        for worker, tasks in zip(self.workers, self.tasks):
+            worker.join(timeout)
+            if worker.is_alive():
+                logging.warning(f"⚠️ Render worker {worker.pid} did not stop, terminating it")
+                worker.terminate()
+                worker.join(timeout)
+            tasks.cancel_join_thread()  # Tasks left for a dead worker must not block the exit
+        for shm in self.shm:
+            shm.close()
+            shm.unlink()
+        if self.restarts:
+            logging.warning(f"⚠️ Render pool replaced {self.restarts} workers that died")
+
+    def _start_worker(self, i):
+        self.tasks[i] = self.ctx.Queue()
+        self.workers[i] = self.ctx.Process(
+            target=_render_worker,
+            args=(self.config, [shm.name for shm in self.shm], self.slot_shape, self.tasks[i], self.results),
+            daemon=True)
+        self.workers[i].start()
+
+    def _check_workers(self):
+        """Fail the frames of dead workers, free their slots and start new workers in their place."""
+        for i, worker in enumerate(self.workers):
+            if worker.exitcode is None:
+                continue
+            with self.lock:
+                lost = sorted(self.assigned[i])
+                self.assigned[i].clear()
+                for seq in lost:
+                    entry = self.inflight.pop(seq)
+                    self.free_slots.put(entry['slot'])
+                    self.ready[seq] = {'data': entry['data'], 'result': None, 'slot': None}
+            logging.error(f"❌ Render worker {worker.pid} died (exit code {worker.exitcode}), "
+                          f"failed {len(lost)} frames, starting a new worker")
+            self.tasks[i].cancel_join_thread()
+            self.restarts += 1
+            self._start_worker(i)
@@ -0,0 +1,294 @@
+import os
+import json
+import time
+import heapq
+import queue
+import logging
+import threading
+from collections import deque
+
+
+class _Stream:
+    def __init__(self):
+        """Reordering state and loss counters of one device."""
+        self.next_index = None  # Next frame_index to emit, None until the stream starts
+        self.pending = []       # Heap of (frame_index, arrival, seq, data)
+        self.pending_indexes = set()
+        self.skipped = deque(maxlen=256)  # Recent (first, last) index ranges given up as lost
+        self.gap_log = deque(maxlen=100)  # Recent gaps for the loss report
+
+        # Statistics
+        self.counters = {
+            'received': 0,     # Frames pushed
+            'emitted': 0,      # Frames returned in order
+            'gaps': 0,         # Times the stream skipped missing frames
+            'lost': 0,         # Frame indexes never received
+            'duplicates': 0,   # Frames whose index was already pending or emitted (dropped)
+            'late': 0,         # Frames arriving after their index was given up as lost (dropped)
+            'restarts': 0,     # frame_index jumped far back or a new session started (the device restarted)
+            'discarded': 0,    # Frames still held when the server stopped
+            'max_pending': 0,  # Highest number of frames held for reordering
+        }
+
+    def was_skipped(self, frame_index):
+        return any(first <= frame_index <= last for first, last in self.skipped)
+
+
+class ReorderBuffer:
+    def __init__(self, source, budget_ms=100, max_pending=32, restart_window=None, on_drop=None, depth=None):
+        """Return received frames in frame_index order and account for lost frames.
+
+        Frames are held per device until the missing frames before them arrive, for at
+        most `budget_ms` after their arrival (or until `max_pending` frames are held).
+        Then the missing indexes are counted as lost and the stream moves on. Frames
+        arriving for an index that was already emitted or given up are dropped, which
+        keeps the saved logs monotonic. Items without a frame_index (log-only sockets)
+        pass through unchanged.
+
+        A stream starts at the smallest index received within the budget of its first
+        frame, so frames reordered at the start are not dropped. It starts again when
+        an item is marked 'session_start' (the device opened a new session) or when
+        frame_index jumps back further than `restart_window`.
+
+        Args:
+            source (callable): Returns the next received item, called as source(timeout=seconds)
+                and raising queue.Empty when nothing arrived in time (e.g. IngestQueue.get).
+            budget_ms (float, optional): Maximum time a frame waits for a missing predecessor. Defaults to 100.
+            max_pending (int, optional): Maximum frames held per device. Defaults to 32.
+            restart_window (int, optional): A frame_index more than this far behind the stream, and
+                not given up as lost, starts a new stream instead of being dropped as a duplicate.
+                Defaults to max_pending.
+            on_drop (callable, optional): Called with every dropped item, e.g. to return its
+                receive buffer. Defaults to None.
+            depth (callable, optional): Returns the ingest queue depth, recorded with every gap to
+                tell host-side backlog from camera-side drops. Defaults to None.
+        """
+        self.source = source
+        self.budget = budget_ms / 1000
+        self.max_pending = max_pending
+        self.restart_window = max_pending if restart_window is None else restart_window
+        self.on_drop = on_drop
+        self.depth = depth
+
+        self.streams = {}
+        self.ready = deque()  # Items ready to be returned, in order
+        self.seq = 0          # Tie breaker for the heaps
+        self.lock = threading.Lock()
+        self.start_time = time.time()
+
+    def get(self, timeout=None):
+        """Return the next frame in order.
+
+        Args:
+            timeout (float, optional): Maximum seconds to wait, None to wait forever. Defaults to None.
+
+        Returns:
+            dict: The received data.
+
+        Raises:
+            queue.Empty: If no frame is ready in time.
+        """
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        polled = False
+        while True:
+            with self.lock:
+                self._release_expired(time.perf_counter())
+                if self.ready:
+                    return self.ready.popleft()
+                if polled and deadline is not None and time.perf_counter() >= deadline:
+                    raise queue.Empty
+
+                # Wait for a new item, but not past the budget of the frames already held
+                wait = self._next_expiry()
+                if deadline is not None:
+                    remaining = max(0.0, deadline - time.perf_counter())
+                    wait = remaining if wait is None else min(wait, remaining)
+            try:
+                item = self.source(timeout=wait)
+            except queue.Empty:
+                polled = True
+                if wait is None:
+                    raise  # Nothing held and the source is closed
+                continue
+            polled = True
+            with self.lock:
+                self._push(item)
+
+    def flush(self, discard=False):
+        """Give up on every missing frame and return all held frames in order.
+
+        Args:
+            discard (bool, optional): The frames will not be consumed (the server is stopping):
+                count them as discarded and hand them to on_drop. Defaults to False.
+
+        Returns:
+            list: The held items.
+        """
+        with self.lock:
+            for stream in self.streams.values():
+                self._release_all(stream)
+            items = list(self.ready)
+            self.ready.clear()
+            if discard:
+                for item in items:
+                    stream = self.streams.get(item.get('device_id'))
+                    if stream is not None and item.get('frame_index') is not None:
+                        stream.counters['discarded'] += 1
+        if discard:
+            for item in items:
+                self._drop(item)
+        return items
+
+    def pending(self):
+        """Get the number of frames held for reordering or ready to be returned.
+
+        Returns:
+            int: The number of frames.
+        """
+        with self.lock:
+            return len(self.ready) + sum(len(stream.pending) for stream in self.streams.values())
+
+    def stats(self):
+        """Get the per-device loss counters.
+
+        Returns:
+            dict: Device id to counters.
+        """
+        with self.lock:
+            return {device_id: dict(stream.counters) for device_id, stream in self.streams.items()}
+
+    def report(self):
+        """Build the loss report of the session.
+
+        Returns:
+            dict: Session start and end, the reorder settings and, per device, the counters,
+                the loss rate and the most recent gaps.
+        """
+        with self.lock:
+            devices = {}
+            for device_id, stream in self.streams.items():
+                counters = dict(stream.counters)
+                expected = counters['emitted'] + counters['lost']
+                devices[device_id or 'unknown'] = {
+                    **counters,
+                    'loss_rate': round(counters['lost'] / expected, 6) if expected else 0.0,
+                    'recent_gaps': list(stream.gap_log),
+                }
+        return {
+            'start': self.start_time,
+            'end': time.time(),
+            'budget_ms': self.budget * 1000,
+            'max_pending': self.max_pending,
+            'devices': devices,
+        }
+
+    def write_report(self, path):
+        """Write the loss report as JSON.
+
+        Args:
+            path (str): The report file.
+        """
+        report = self.report()
+        try:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            with open(path, 'w') as f:
+                json.dump(report, f, indent=2)
+        except OSError as e:
+            logging.error(f"❌ Failed to write the loss report to {path}: {e}")
+            return
+        for device_id, device in report['devices'].items():
+            logging.info(f"📉 Frames from {device_id}: {device['emitted']} emitted, {device['lost']} lost in "
+                         f"{device['gaps']} gaps, {device['duplicates']} duplicates, {device['late']} late")
+        logging.info(f"📉 Loss report written to {path}")
+
+    def _push(self, item):
+        frame_index = item.get('frame_index')
+        if frame_index is None:
+            self.ready.append(item)
+            return
+
+        stream = self.streams.get(item.get('device_id'))
+        if stream is None:
+            stream = self.streams[item.get('device_id')] = _Stream()
+        counters = stream.counters
+        counters['received'] += 1
+
+        if item.pop('session_start', False) and (stream.next_index is not None or stream.pending):
+            # A new session of the device: release the old stream and follow the new one
+            self._restart(stream)
+        elif stream.next_index is not None and frame_index < stream.next_index:
+            if stream.next_index - frame_index > self.restart_window and not stream.was_skipped(frame_index):
+                # The device restarted its numbering: release the old stream and follow the new one
+                logging.warning(f"⚠️ frame_index of {item.get('device_id')} went back from "
+                                f"{stream.next_index} to {frame_index}, restarting the stream")
+                self._restart(stream)
+            else:
+                counters['late' if stream.was_skipped(frame_index) else 'duplicates'] += 1
+                self._drop(item)
+                return
+        elif frame_index in stream.pending_indexes:
+            counters['duplicates'] += 1
+            self._drop(item)
+            return
+
+        heapq.heappush(stream.pending, (frame_index, time.perf_counter(), self.seq, item))
+        stream.pending_indexes.add(frame_index)
+        self.seq += 1
+        counters['max_pending'] = max(counters['max_pending'], len(stream.pending))
+        self._emit_in_order(stream)
+
+    def _restart(self, stream):
+        self._release_all(stream)
+        stream.next_index = None
+        stream.skipped.clear()
+        stream.counters['restarts'] += 1
+
+    def _release_all(self, stream):
+        while stream.pending:
+            self._skip_to(stream, stream.pending[0][0])
+            self._emit_in_order(stream)
+
+    def _emit_in_order(self, stream):
+        while stream.pending and stream.pending[0][0] == stream.next_index:
+            frame_index, _, _, item = heapq.heappop(stream.pending)
+            stream.pending_indexes.discard(frame_index)
+            stream.next_index += 1
+            stream.counters['emitted'] += 1
+            self.ready.append(item)
+
+    def _release_expired(self, now):
+        for stream in self.streams.values():
+            while stream.pending and (now - min(p[1] for p in stream.pending) >= self.budget
+                                      or len(stream.pending) > self.max_pending):
+                self._skip_to(stream, stream.pending[0][0])
+                self._emit_in_order(stream)
+
+    def _next_expiry(self):
+        arrivals = [p[1] for stream in self.streams.values() for p in stream.pending]
+        if not arrivals:
+            return None
+        return max(0.0, min(arrivals) + self.budget - time.perf_counter())
+
+    def _skip_to(self, stream, frame_index):
+        """Give up on the missing frames before frame_index (or start the stream there)."""
+        if stream.next_index is None:
+            stream.next_index = frame_index
+            return
+        missing = frame_index - stream.next_index
+        if missing <= 0:
+            return
+        stream.counters['gaps'] += 1
+        stream.counters['lost'] += missing
+        stream.skipped.append((stream.next_index, frame_index - 1))
+        stream.gap_log.append({
+            'time': time.time(),
+            'first': stream.next_index,
+            'last': frame_index - 1,
+            'missing': missing,
+            'queue_depth': self.depth() if self.depth else None,
+        })
+        stream.next_index = frame_index
+
+    def _drop(self, item):
+        if self.on_drop:
+            self.on_drop(item)
@@ -5,6 +5,8 @@ import csv
 from pathlib import Path
 import logging
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 class ImageSaver:
@@ -19,6 +21,23 @@ class ImageSaver:
         self._create_directory(self.current_csv_dir)
         self.image_format = args.image_format
         self.save_dir = None
+
+        # Asynchronous saving: images are encoded and written by a thread pool (cv2.imwrite
+        # releases the GIL), at most async_queue_size of them waiting or being written
+        self.async_workers = args.save_async_workers
+        self.executor = None
+        self.slots = None
+        self.pending = 0
+        self.idle = threading.Condition()
+        if self.async_workers > 0:
+            self.executor = ThreadPoolExecutor(max_workers=self.async_workers, thread_name_prefix='ImageSaver')
+            self.slots = threading.BoundedSemaphore(max(args.save_async_queue_size, self.async_workers))
+
+        # Statistics
+        self.saved = 0
+        self.failed = 0
+        self.write_seconds = 0.0  # Time spent encoding and writing
+        self.blocked_seconds = 0.0  # Time callers waited for a free queue slot
         logging.info(f"ImageSaver initialized with base_dir={base_dir} and image_format={self.image_format}")
 
 
@@ -64,11 +83,46 @@ class ImageSaver:
         logging.info(f"Custom directory set to {self.custom_dir}")
 
 
-    def save_image(self, image, frame_ID, basename=None , save_dir = None, im_format=None):
-        """Save the image to the current directory."""
+    def save_image(self, image, frame_ID, basename=None , save_dir = None, im_format=None, copy=True):
+        """Save the image to the current directory.
+
+        With asynchronous saving (SAVE.ASYNC_WORKERS), the image is queued for the writer
+        threads and this blocks only while the queue is full.
+
+        Args:
+            image (numpy.ndarray): The image.
+            frame_ID (int or str): Frame ID, used in the file name.
+            basename (str, optional): File name prefix. Defaults to "frame_".
+            save_dir (str, optional): Directory of the image. Defaults to the current directory.
+            im_format (str, optional): Image format. Defaults to the configured format.
+            copy (bool, optional): Copy the image before queueing it, needed when the caller
+                reuses or draws on it after the call. Defaults to True.
+        """
+        image_path = self._image_path(frame_ID, basename, save_dir, im_format)
+        if image_path is None:
+            return
+        if self.executor is not None and copy:
+            image = image.copy()
+        self._submit(self._write_image, image_path, image)
+
+    def save_encoded(self, encoded, frame_ID, basename=None, save_dir=None, im_format=None):
+        """Save an already encoded image where save_image would save it, without decoding it.
+
+        Args:
+            encoded (bytes): The encoded image, in the format of the file name.
+            frame_ID (int or str): Frame ID, used in the file name.
+            basename (str, optional): File name prefix. Defaults to "frame_".
+            save_dir (str, optional): Directory of the image. Defaults to the current directory.
+            im_format (str, optional): Image format. Defaults to the configured format.
+        """
+        image_path = self._image_path(frame_ID, basename, save_dir, im_format)
+        if image_path is not None:
+            self._submit(self._write_encoded, image_path, encoded)
+
+    def _image_path(self, frame_ID, basename=None, save_dir=None, im_format=None):
         try:
             # Determine where to save the image
-            self.save_dirs = save_dir if save_dir is not None else self.current_dir
+            save_dirs = save_dir if save_dir is not None else self.current_dir
 
             # logging.error(f"self.custom_dir is {self.custom_dir}")
             # logging.error(f"self.current_dir is {self.current_dir}")
@@ -80,14 +134,100 @@ class ImageSaver:
                 img_format = self.image_format
             else:
                 img_format = im_format
-            image_path = os.path.join(self.save_dirs, f'{BaseName}{frame_ID}.{img_format}')
+            return os.path.join(save_dirs, f'{BaseName}{frame_ID}.{img_format}')
+        except Exception as e:
+            logging.error(f"Error saving image: {e}")
+            return None
+
+    def _submit(self, write, image_path, image):
+        """Write an image now, or queue it for the writer threads with asynchronous saving."""
+        if self.executor is None:
+            write(image_path, image)
+            return
+
+        start = time.perf_counter()
+        self.slots.acquire()
+        with self.idle:
+            self.blocked_seconds += time.perf_counter() - start
+            self.pending += 1
+        try:
+            self.executor.submit(self._write_queued, write, image_path, image)
+        except Exception as e:
+            self._done()
+            logging.error(f"Error saving image: {e}")
+
+    def flush(self):
+        """Wait until every queued image is written."""
+        with self.idle:
+            self.idle.wait_for(lambda: self.pending == 0)
+
+    def close(self):
+        """Write the queued images and stop the writer threads."""
+        if self.executor is None:
+            return
+        self.flush()
+        self.executor.shutdown(wait=True)
+        self.executor = None
+        logging.info(f"💾 Saved {self.saved} images ({self.failed} failed, "
+                     f"{self.saved / max(self.write_seconds, 1e-9):.1f} images/s per writer thread, "
+                     f"callers blocked {self.blocked_seconds:.2f}s)")
+
+    def stats(self):
+        """Get the saving counters.
+
+        Returns:
+            dict: Saved and failed images, queued images, seconds spent writing and seconds
+                callers waited for the queue.
+        """
+        with self.idle:
+            pending = self.pending
+        return {'saved': self.saved, 'failed': self.failed, 'queued': pending,
+                'write_seconds': self.write_seconds, 'blocked_seconds': self.blocked_seconds}
+
+    def _write_queued(self, write, image_path, image):
+        try:
+            write(image_path, image)
+        finally:
+            self._done()
+
+    def _done(self):
+        self.slots.release()
+        with self.idle:
+            self.pending -= 1
+            if self.pending == 0:
+                self.idle.notify_all()
+
+    def _write_image(self, image_path, image):
+        start = time.perf_counter()
+        try:
             success = cv2.imwrite(image_path, image)
-            # if success:
-            #     logging.info(f"Image saved to {image_path}")
-            if not success:
-                logging.error(f"Failed to save image to {image_path}")
         except Exception as e:
             logging.error(f"Error saving image: {e}")
+            success = False
+        # if success:
+        #     logging.info(f"Image saved to {image_path}")
+        self._count(start, success, image_path)
+
+    def _write_encoded(self, image_path, encoded):
+        start = time.perf_counter()
+        try:
+            with open(image_path, 'wb') as f:
+                f.write(encoded)
+            success = True
+        except OSError as e:
+            logging.error(f"Error saving image: {e}")
+            success = False
+        self._count(start, success, image_path)
+
+    def _count(self, start, success, image_path):
+        with self.idle:
+            self.write_seconds += time.perf_counter() - start
+            if success:
+                self.saved += 1
+            else:
+                self.failed += 1
+        if not success:
+            logging.error(f"Failed to save image to {image_path}")
 
   
 
@@ -108,6 +248,7 @@ class ImageSaver:
 
     def save_video(self, output_filename='video.mp4', fps=7):
         """Encode the images in the current directory into a video file."""
+        self.flush()
         # Get list of image files in the directory
         image_files = sorted(Path(self.current_dir).glob(f'frame_*.{self.image_format}'))
         
@@ -6,23 +6,67 @@ import logging
 import queue
 import signal
 import threading
+from utils.protocol import (
+    SESSION_MAGIC,
+    PROTOCOL_VERSION_LEGACY,
+    PROTOCOL_VERSION_SESSION,
+    PROTOCOL_VERSION_ENVELOPE,
+    PROTOCOL_VERSION_DEVICE_ID,
+    PROTOCOL_VERSION_MAX,
+    DEVICE_ID_MAX_SIZE,
+    ENVELOPE_HEADER,
+    pack_uint32,
+    negotiate_version,
+    unpack_envelope_header,
+    find_json_log_terminator,
+)
+from utils.buffer_pool import BufferPool
+from utils.ingest_queue import IngestQueue
+from utils.capture import CaptureWriter
+from utils.reorder_buffer import ReorderBuffer
+from utils import latency
 
 class RemoteSocket:
-    def __init__(self, server_ip, server_port, recv_data_keys):
+    def __init__(self, server_ip, server_port, recv_data_keys, max_protocol_version=PROTOCOL_VERSION_MAX,
+                 buffer_pool_size=8, queue_size=0, overload_policy='block', log_backlog=1024, capture_path=None,
+                 reorder_budget_ms=0, reorder_max_pending=32, loss_report_path=None, session_timeout=60):
         """Initialize the RemoteSocket instance.
 
         Args:
             server_ip (str): The IP address of the server.
             server_port (int): The port number for the server.
             recv_data_keys (list): The keys of the data to receive.
+            max_protocol_version (int, optional): Highest protocol version accepted from the device.
+                Set to PROTOCOL_VERSION_LEGACY to refuse sessions. Defaults to PROTOCOL_VERSION_MAX.
+            buffer_pool_size (int, optional): Number of reusable image receive buffers. Defaults to 8.
+            queue_size (int, optional): Maximum number of received items waiting for the consumer,
+                0 for unbounded. Defaults to 0.
+            overload_policy (str, optional): What to do when the queue is full, see IngestQueue.
+                Defaults to 'block'.
+            log_backlog (int, optional): Maximum number of queued log-only items under 'latest_only'
+                before the receiver waits, 0 for unbounded. Defaults to 1024.
+            capture_path (str, optional): Record every received frame to this capture file.
+                Defaults to None.
+            reorder_budget_ms (float, optional): Return frames in frame_index order, holding a frame
+                at most this long for missing predecessors; 0 to return them in arrival order.
+                Defaults to 0.
+            reorder_max_pending (int, optional): Maximum frames held per device for reordering. Defaults to 32.
+            loss_report_path (str, optional): Write the per-device loss report (gaps, duplicates,
+                late frames) to this file when the server stops. Needs reordering. Defaults to None.
+            session_timeout (float, optional): Seconds a connection may stay silent before it is
+                closed, 0 to wait forever. Sessions are served on their own threads, so an idle
+                session does not hold up new connections. Defaults to 60.
         """
         # Socket server configuration
         self.server = None          # Server socket object
         self.server_ip = server_ip  # IP address of the server
 
         # Socket client configuration
-        self.client = None        # Client socket object
+        self.client = None        # Client socket object (connection served by the accept thread)
         self.client_ip = None     # IP address of the connected client
+        self.session_timeout = session_timeout
+        self.sessions = {}        # Session socket to the thread serving it
+        self.sessions_lock = threading.Lock()
 
         # Server port
         self.port = server_port   # Port number for the server
@@ -31,8 +75,22 @@ class RemoteSocket:
         self.running = False       # Flag to indicate if the server is running
 
         # Data management
-        self.data_queue = queue.Queue()  # Queue to store received data
         self.recv_data_keys = recv_data_keys
+        self.buffer_pool = BufferPool(buffer_pool_size)  # Image buffers, returned by release_data()
+        self.data_queue = IngestQueue(queue_size, overload_policy, on_drop=self.release_data,
+                                      log_backlog=log_backlog)  # Queue to store received data
+        self.capture_path = capture_path
+        self.capture = None  # Session recording, opened by start_server()
+        self.reorder = None  # Reorders the queued frames and counts the lost ones
+        if reorder_budget_ms > 0:
+            self.reorder = ReorderBuffer(self.data_queue.get, reorder_budget_ms, reorder_max_pending,
+                                         on_drop=self.release_data, depth=self.data_queue.qsize)
+        self.loss_report_path = loss_report_path
+        self.ready_event = threading.Event()  # Set by the first received frame (and by stop)
+        self.received_any = False
+
+        # Protocol
+        self.max_protocol_version = max_protocol_version
 
         # Threading
         self.thread = None        # Thread for data collection
@@ -58,6 +116,7 @@ class RemoteSocket:
 
             self.server.bind((self.server_ip, self.port))
             self.server.listen(5)
+            self.server.settimeout(1.0)  # Wake up accept() regularly to check the stop flag
 
             self.thread = threading.Thread(
                 target=self._recv_data_loop, daemon=True
@@ -69,6 +128,8 @@ class RemoteSocket:
             error_message = str(e)
 
         if connection_successful:
+            if self.capture_path and self.capture is None:
+                self.capture = CaptureWriter(self.capture_path)
             print(f"✅ {name.capitalize():13} Build Socket Server \t \033[32mSuccessful\033[0m")
             print(f"🔌 Socket server started on {self.server_ip}:{self.port}")
             return True
@@ -82,16 +143,40 @@ class RemoteSocket:
         """
         self.stop_thread = True
 
-        #
+        # Unblock a receiver waiting for room in the queue
+        self.data_queue.close()
+        self.ready_event.set()  # Wake wait_ready()
+
+        # Unblock the connection waiting for the next frame
+        if self.client:
+            self._shutdown_client(self.client)
+
         if self.thread:
             self.thread.join()
 
+        # No session starts once the accept thread is done
+        with self.sessions_lock:
+            sessions = list(self.sessions.items())
+        for client, thread in sessions:
+            self._shutdown_client(client)
+            thread.join()
+
         if self.server:
             self.server.close()
 
         if self.client:
             self.client.close()
 
+        logging.info(f"📊 Ingest queue: {self.data_queue.stats()}")
+        if self.reorder:
+            # Frames still held for reordering will not be consumed, return their buffers
+            self.reorder.flush(discard=True)
+            if self.loss_report_path:
+                self.reorder.write_report(self.loss_report_path)
+
+        if self.capture:
+            self.capture.close()
+
     def is_ready(self):
         """Check if the server has received data.
 
@@ -108,99 +193,527 @@ class RemoteSocket:
         """
         return not self.stop_thread
 
-    def get_data(self):
+    def get_data(self, timeout=None):
         """Retrieve data from the data queue.
 
+        Args:
+            timeout (float, optional): Maximum seconds to wait, None to wait forever. Defaults to None.
+
+        Returns:
+            Any: The next item in the data queue, or None if nothing arrived in time.
+        """
+        try:
+            if self.reorder:
+                return self.reorder.get(timeout=timeout)
+            return self.data_queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    # Consumer API name for get_data()
+    get = get_data
+
+    def wait_ready(self, timeout=None):
+        """Wait for the first received frame without polling.
+
+        Args:
+            timeout (float, optional): Maximum seconds to wait, None to wait forever. Defaults to None.
+
+        Returns:
+            bool: True once a frame was received, False on timeout or when the server stopped first.
+        """
+        self.ready_event.wait(timeout)
+        return self.received_any
+
+    def get_batch(self, max_n, timeout=None):
+        """Retrieve up to max_n queued items in one wakeup.
+
+        Waits for the first item, then takes the items already queued without waiting.
+
+        Args:
+            max_n (int): Maximum number of items to return.
+            timeout (float, optional): Maximum seconds to wait for the first item, None to wait
+                forever. Defaults to None.
+
         Returns:
-            Any: The next item in the data queue.
+            list: The items, empty if nothing arrived in time or the server stopped.
+        """
+        batch = []
+        data = self.get_data(timeout)
+        while data is not None:
+            batch.append(data)
+            if len(batch) >= max_n:
+                break
+            data = self.get_data(0)
+        return batch
+
+    def __iter__(self):
+        """Iterate over the received items until the server stops and the queue is drained.
+
+        Yields:
+            dict: The next received item.
         """
-        return self.data_queue.get()
+        while True:
+            data = self.get_data(0.5)
+            if data is not None:
+                yield data
+            elif not self.is_running():
+                return
+
+    def release_data(self, data):
+        """Return the image buffer of a received item to the buffer pool.
+
+        Call it once the image has been decoded; data['image'] must not be used afterwards.
+
+        Args:
+            data (dict): An item returned by get_data().
+        """
+        if data and data.get('buffer') is not None:
+            data['buffer'].release()
+            data['buffer'] = None
+            data['image'] = None
 
     def _recv_data_loop(self):
         """Main loop for receiving data from clients.
-        Accepts client connections and processes incoming data.
+        Accepts client connections and processes incoming data. A connection either
+        opens a session (many frames), served on its own thread, or carries a single
+        legacy frame, received on this thread so legacy frames keep their order.
         """
         while not self.stop_thread:
             try:
                 self.client, addr = self.server.accept()
-                # logging.info(f"Connection from {addr}")
+            except socket.timeout:
+                continue
+            except OSError as e:
+                if not self.stop_thread:
+                    print(f"Error accepting client: {e}")
+                break
 
-                if self.recv_data_keys == ["log"]:
-                    recv_data, recv_success = self._recv_log(self.client)
-                elif self.recv_data_keys == ["frame_index", "image", "image_path", "log"]:
-                    recv_data, recv_success = self._recv_image_and_log_and_impath(self.client)
+            try:
+                self._configure_client(self.client)
+                # logging.info(f"Connection from {addr}")
+                laps = latency.tracker.laps()
+
+                head = self._recv_exact(self.client, 4, log_eof=False)
+                if head is None:
+                    continue
+
+                if bytes(head) == SESSION_MAGIC:
+                    client, self.client = self.client, None  # The session thread owns the socket
+                    thread = threading.Thread(target=self._serve_session, args=(client, addr, laps), daemon=True)
+                    with self.sessions_lock:
+                        self.sessions[client] = thread
+                    thread.start()
                 else:
-                    recv_data, recv_success = self._recv_image_and_log(self.client)
-
-                if recv_success:
-                    self.data_queue.put(recv_data)
-
-                self.client.close() # Alister add 2024-08-31 (if did not add this, Ctrl + C will not close socket....server port will not release)
+                    laps.lap('accept')
+                    recv_data, recv_success = self._recv_legacy_frame(self.client, head)
+                    if recv_success:
+                        recv_data['device_id'] = addr[0]
+                        self._enqueue(recv_data)
+
+                    self.client.close() # Alister add 2024-08-31 (if did not add this, Ctrl + C will not close socket....server port will not release)
+            except socket.timeout:
+                logging.warning(f"⏱️ Connection from {addr} silent for {self.session_timeout}s, closing it")
             except Exception as e:
                 print(f"Error handling client: {e}")
             finally:
                 if self.client:
                     self.client.close()
+                    self.client = None
+
+    def _configure_client(self, client):
+        """Bound how long a connection may stay silent and detect dead peers with TCP keepalive.
+
+        Args:
+            client (socket.socket): The accepted client socket.
+        """
+        client.settimeout(self.session_timeout or None)
+        client.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        # Linux: probe after 10s of silence, every 5s, give up after 3 unanswered probes
+        for option, value in (('TCP_KEEPIDLE', 10), ('TCP_KEEPINTVL', 5), ('TCP_KEEPCNT', 3)):
+            if hasattr(socket, option):
+                client.setsockopt(socket.IPPROTO_TCP, getattr(socket, option), value)
+
+    def _serve_session(self, client, addr, laps):
+        """Serve one session on its own thread and close it.
+
+        Args:
+            client (socket.socket): The client socket that sent SESSION_MAGIC.
+            addr (tuple): The address of the client.
+            laps: Latency laps started when the connection was accepted.
+        """
+        try:
+            self._recv_session(client, addr, laps)
+        except socket.timeout:
+            logging.warning(f"⏱️ Session with {addr} silent for {self.session_timeout}s, closing it")
+        except Exception as e:
+            print(f"Error handling client: {e}")
+        finally:
+            with self.sessions_lock:
+                self.sessions.pop(client, None)
+            client.close()
+
+    def _recv_legacy_frame(self, client, head):
+        """Receive the single frame of a legacy (one frame per connection) client.
+
+        Args:
+            client (socket.socket): The client socket to receive data from.
+            head (bytearray): The first 4 bytes already read from the connection.
+
+        Returns:
+            tuple: A tuple containing the received data (dict) and a success flag (bool).
+        """
+        if self.recv_data_keys == ["log"]:
+            return self._recv_log(client, prefix=bytes(head))
+
+        frame_index = struct.unpack('>I', head)[0]
+        if self.recv_data_keys == ["frame_index", "image", "image_path", "log"]:
+            return self._recv_image_and_log_and_impath(client, frame_index=frame_index)
+        return self._recv_image_and_log(client, frame_index=frame_index)
+
+    def _recv_session(self, client, addr, laps):
+        """Negotiate the protocol version and receive frames until the device closes the session.
+
+        Args:
+            client (socket.socket): The client socket that sent SESSION_MAGIC.
+            addr (tuple): The address of the client.
+            laps: Latency laps started when the connection was accepted.
+        """
+        requested_version = self._recv_int(client)
+        if requested_version is None:
+            return
+
+        version = negotiate_version(requested_version, self.max_protocol_version)
+        client.sendall(pack_uint32(version))
+        if version < PROTOCOL_VERSION_SESSION:
+            logging.info(f"🔁 Session refused for {addr}, falling back to one frame per connection")
+            return
+
+        device_id = addr[0]
+        if version >= PROTOCOL_VERSION_DEVICE_ID:
+            device_id = self._recv_device_id(client)
+            if device_id is None:
+                return
+        laps.lap('accept')
+
+        logging.info(f"🔗 Session v{version} opened with {device_id} ({addr})")
+        frames = 0
+        buffers = {
+            'header': bytearray(ENVELOPE_HEADER.size),
+            'image_path': bytearray(256),
+            'log': bytearray(64 * 1024),
+        }
+        while not self.stop_thread:
+            if version >= PROTOCOL_VERSION_ENVELOPE:
+                recv_data, recv_success = self._recv_envelope_frame(client, buffers)
+            else:
+                recv_data, recv_success = self._recv_session_frame(client)
+            if recv_data is None:
+                break
+            if recv_success:
+                recv_data['device_id'] = device_id
+                if frames == 0:
+                    recv_data['session_start'] = True  # Restarts the reordering of the device
+                self._enqueue(recv_data)
+                frames += 1
+        logging.info(f"🔒 Session with {device_id} closed after {frames} frames")
+
+    def _recv_device_id(self, client):
+        """Receive the device id sent after the handshake (protocol version >= 3).
+
+        Args:
+            client (socket.socket): The client socket to receive data from.
+
+        Returns:
+            str: The device id, or None if it could not be received.
+        """
+        size = self._recv_int(client)
+        if size is None or size > DEVICE_ID_MAX_SIZE:
+            logging.error(f"❌ Invalid device id size: {size}")
+            return None
+        device_id = self._recv_exact(client, size)
+        return device_id.decode('utf-8') if device_id is not None else None
 
-    def _recv_exact(self, sock, size):
+    def _recv_session_frame(self, client):
+        """Receive one length-prefixed frame of a session.
+
+        Args:
+            client (socket.socket): The client socket to receive data from.
+
+        Returns:
+            tuple: A tuple containing the received data (dict), or None when the session ended,
+                and a success flag (bool).
+        """
+        recv_data = None
+        try:
+            if self.recv_data_keys == ["log"]:
+                log_size = self._recv_int(client, log_eof=False)
+                if log_size is None:
+                    return None, False
+                laps = latency.tracker.laps()
+                log = self._recv_exact(client, log_size)
+                if log is None:
+                    return None, False
+                laps.lap('recv_log')
+                return {'log': log.decode('utf-8').strip()}, True
+
+            recv_data = {key: None for key in self.recv_data_keys}
+
+            recv_data['frame_index'] = self._recv_int(client, log_eof=False)
+            if recv_data['frame_index'] is None:
+                return None, False
+            laps = latency.tracker.laps()
+
+            size = self._recv_int(client)
+            laps.lap('recv_header')
+            if size is None or not self._recv_image(client, size, recv_data):
+                logging.error(f"❌ Failed to receive the complete image data for frame {recv_data['frame_index']}")
+                return None, False
+            laps.lap('recv_image')
+
+            if 'image_path' in recv_data:
+                impath_size = self._recv_int(client)
+                image_path = self._recv_exact(client, impath_size) if impath_size is not None else None
+                if image_path is None:
+                    self.release_data(recv_data)
+                    return None, False
+                recv_data['image_path'] = image_path.decode('utf-8')
+
+            log_size = self._recv_int(client)
+            log = self._recv_exact(client, log_size) if log_size is not None else None
+            if log is None:
+                self.release_data(recv_data)
+                return None, False
+            recv_data['log'] = log.decode('utf-8').strip()
+            laps.lap('recv_log')
+            return recv_data, True
+
+        except socket.timeout:
+            # The session stayed silent, _serve_session closes it
+            self.release_data(recv_data)
+            raise
+        except socket.error as e:
+            if not self.stop_thread:
+                logging.error(f"🔴 Socket error: {e}")
+            self.release_data(recv_data)
+            return None, False
+        except Exception as e:
+            logging.error(f"⚠️ Unexpected error: {e}", exc_info=True)
+            self.release_data(recv_data)
+            return None, False
+
+    def _recv_envelope_frame(self, client, buffers):
+        """Receive one frame of a session that uses the envelope header (protocol version 2).
+
+        The header and the variable-size fields are read with recv_into into buffers that
+        live for the whole session. The image goes into a buffer leased from the buffer
+        pool, as it is handed over to the consumer.
+
+        Args:
+            client (socket.socket): The client socket to receive data from.
+            buffers (dict): Preallocated 'header', 'image_path' and 'log' buffers of the session.
+
+        Returns:
+            tuple: A tuple containing the received data (dict), or None when the session ended,
+                and a success flag (bool).
+        """
+        recv_data = None
+        try:
+            # With profiling on, wait for the first byte alone so recv_header excludes the idle time
+            header_view = memoryview(buffers['header'])
+            first = 1 if latency.tracker.enabled else ENVELOPE_HEADER.size
+            if not self._recv_into(client, header_view[:first], log_eof=False):
+                return None, False
+            laps = latency.tracker.laps()
+            if not self._recv_into(client, header_view[first:]):
+                return None, False
+            header = unpack_envelope_header(header_view)
+            laps.lap('recv_header')
+
+            recv_data = {key: None for key in self.recv_data_keys}
+            if 'frame_index' in recv_data:
+                recv_data['frame_index'] = header['frame_index']
+            recv_data['device_timestamp_us'] = header['timestamp_us']
+
+            if 'image' in recv_data:
+                if not self._recv_image(client, header['image_size'], recv_data):
+                    logging.error(f"❌ Failed to receive the complete image data for frame {header['frame_index']}")
+                    return None, False
+            elif self._recv_field(client, buffers, 'image', header['image_size']) is None:
+                return None, False
+            laps.lap('recv_image')
+
+            image_path = self._recv_field(client, buffers, 'image_path', header['path_size'])
+            if image_path is None:
+                self.release_data(recv_data)
+                return None, False
+            if 'image_path' in recv_data:
+                recv_data['image_path'] = str(image_path, 'utf-8')
+
+            log = self._recv_field(client, buffers, 'log', header['log_size'])
+            if log is None:
+                self.release_data(recv_data)
+                return None, False
+            recv_data['log'] = str(log, 'utf-8').strip()
+            laps.lap('recv_log')
+            return recv_data, True
+
+        except ValueError as e:
+            # The stream is out of sync, the session cannot continue
+            logging.error(f"🔴 Envelope error: {e}")
+            self.release_data(recv_data)
+            return None, False
+        except socket.timeout:
+            # The session stayed silent, _serve_session closes it
+            self.release_data(recv_data)
+            raise
+        except socket.error as e:
+            if not self.stop_thread:
+                logging.error(f"🔴 Socket error: {e}")
+            self.release_data(recv_data)
+            return None, False
+        except Exception as e:
+            logging.error(f"⚠️ Unexpected error: {e}", exc_info=True)
+            self.release_data(recv_data)
+            return None, False
+
+    def _recv_field(self, sock, buffers, key, size):
+        """Receive a variable-size field into the reusable session buffer for that field.
+
+        Args:
+            sock (socket.socket): The socket to receive data from.
+            buffers (dict): The session buffers, grown in place when a field does not fit.
+            key (str): The field name.
+            size (int): The size of the field in bytes.
+
+        Returns:
+            memoryview: A view of the received bytes, or None if the connection closed prematurely.
+        """
+        if len(buffers.setdefault(key, bytearray())) < size:
+            buffers[key] = bytearray(max(size, 2 * len(buffers[key])))
+        view = memoryview(buffers[key])[:size]
+        return view if self._recv_into(sock, view) else None
+
+    def _recv_image(self, sock, size, recv_data):
+        """Receive an image into a buffer leased from the buffer pool.
+
+        On success recv_data['image'] is a memoryview of the leased buffer and
+        recv_data['buffer'] the lease, returned with release_data().
+
+        Args:
+            sock (socket.socket): The socket to receive data from.
+            size (int): The size of the image in bytes.
+            recv_data (dict): The frame being received.
+
+        Returns:
+            bool: True if the image was received, False if the connection closed prematurely.
+        """
+        lease = self.buffer_pool.acquire(size)
+        try:
+            received = self._recv_into(sock, lease.view)
+        except BaseException:
+            # Not in recv_data yet, so release_data() cannot return it
+            lease.release()
+            raise
+        if not received:
+            lease.release()
+            return False
+        recv_data['image'] = lease.view
+        recv_data['buffer'] = lease
+        return True
+
+    def _shutdown_client(self, client):
+        """Shut down a client socket so that a blocking receive returns immediately.
+
+        Args:
+            client (socket.socket): The client socket to shut down.
+        """
+        try:
+            client.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+    def _recv_exact(self, sock, size, log_eof=True):
         """Receive an exact number of bytes from the socket.
 
         Args:
             sock (socket.socket): The socket to receive data from.
             size (int): The exact number of bytes to receive.
+            log_eof (bool, optional): Log an error when the connection closes before
+                the first byte. Defaults to True.
 
         Returns:
             bytearray: The received data, or None if the connection closed prematurely.
         """
         buffer = bytearray(size)
-        view = memoryview(buffer)
+        if not self._recv_into(sock, memoryview(buffer), log_eof=log_eof):
+            return None
+        return buffer
+
+    def _recv_into(self, sock, view, log_eof=True):
+        """Fill a writable buffer with bytes from the socket.
+
+        Args:
+            sock (socket.socket): The socket to receive data from.
+            view (memoryview): The buffer to fill completely.
+            log_eof (bool, optional): Log an error when the connection closes before
+                the first byte. Defaults to True.
+
+        Returns:
+            bool: True if the buffer was filled, False if the connection closed prematurely.
+        """
+        size = len(view)
         bytes_received = 0
         while bytes_received < size:
             nbytes = sock.recv_into(view[bytes_received:], size - bytes_received)
             if nbytes == 0:
-                logging.error(f"Connection closed. Received {bytes_received} out of {size} bytes.")
-                return None
+                if log_eof or bytes_received:
+                    logging.error(f"Connection closed. Received {bytes_received} out of {size} bytes.")
+                return False
             bytes_received += nbytes
-        return buffer
+        return True
 
-    def _recv_int(self, sock, size=4):
+    def _recv_int(self, sock, size=4, log_eof=True):
         """Receive an integer from the socket.
 
         Args:
             sock (socket.socket): The socket to receive data from.
             size (int, optional): The number of bytes to receive. Defaults to 4.
+            log_eof (bool, optional): Log an error when the connection is already closed. Defaults to True.
 
         Returns:
             int: The received integer, or None if the reception failed.
         """
-        data = self._recv_exact(sock, size)
+        data = self._recv_exact(sock, size, log_eof=log_eof)
         return struct.unpack('>I', data)[0] if data else None
 
-    def _recv_json(self, sock):
+    def _recv_json(self, sock, prefix=b''):
         """Receive JSON data from the socket.
 
         Args:
             sock (socket.socket): The socket to receive data from.
+            prefix (bytes, optional): Bytes of the log already read from the socket. Defaults to b''.
 
         Returns:
             str: The received JSON data as a string.
         """
-        json_data = b''
+        json_data = bytearray(prefix)
         while True:
             chunk = sock.recv(4096)
             if not chunk:
                 break
+            start = len(json_data)
             json_data += chunk
-            if b'\r\n\r\n' in chunk:
+            if find_json_log_terminator(json_data, start) != -1:
                 break
         return json_data.decode('utf-8').strip()
 
-    def _recv_log(self, client):
+    def _recv_log(self, client, prefix=b''):
         """
         Receive a log from the client socket.
 
         Args:
             client (socket.socket): The client socket to receive data from.
+            prefix (bytes, optional): Bytes of the log already read from the socket. Defaults to b''.
 
         Returns:
             tuple: A tuple containing:
@@ -212,7 +725,7 @@ class RemoteSocket:
         }
         try:
             # Read the remaining data for JSON log
-            recv_data['log'] = self._recv_json(self.client)
+            recv_data['log'] = self._recv_json(client, prefix=prefix)
             return recv_data, True
         except socket.error as e:
             # Handle socket-related errors
@@ -227,11 +740,12 @@ class RemoteSocket:
             logging.error(f"Unexpected error: {e}", exc_info=True)
             return None, True
 
-    def _recv_image_and_log(self, client):
+    def _recv_image_and_log(self, client, frame_index=None):
         """Receive an image and associated log data from a client.
 
         Args:
             client (socket.socket): The client socket to receive data from.
+            frame_index (int, optional): The frame_index if already read from the socket. Defaults to None.
 
         Returns:
             tuple: A tuple containing the received data (dict) and a success flag (bool).
@@ -243,41 +757,47 @@ class RemoteSocket:
         }
         try:
             # Receive the frame_index
-            recv_data['frame_index'] = self._recv_int(client)
+            recv_data['frame_index'] = frame_index if frame_index is not None else self._recv_int(client)
             #logging.info(f"🎞️ Received frame index: {recv_data['frame_index']}")
 
+            laps = latency.tracker.laps()
             size = self._recv_int(client)
             #logging.info(f"📏 Expected image size: {size} bytes")
+            laps.lap('recv_header')
 
             # Receive the image data
-            recv_data['image'] = self._recv_exact(client, size)
-
-            if recv_data['image'] is None or len(recv_data['image']) != size:
-                logging.error(f"❌ Failed to receive the complete image data. Received {len(recv_data['image'] or b'')} bytes out of {size}")
+            if not self._recv_image(client, size, recv_data):
+                logging.error(f"❌ Failed to receive the complete image data ({size} bytes)")
                 return recv_data, False
+            laps.lap('recv_image')
 
             #logging.info(f"✅ Successfully received the complete image data. Total bytes: {len(recv_data['image'])}")
 
             # Read the remaining data for JSON log
             recv_data['log'] = self._recv_json(client)
+            laps.lap('recv_log')
             return recv_data, True
 
         except socket.error as e:
             logging.error(f"🔴 Socket error: {e}")
+            self.release_data(recv_data)
             return None, False
         except IOError as e:
             logging.error(f"🔴 I/O error: {e}")
+            self.release_data(recv_data)
             return None, False
         except Exception as e:
             logging.error(f"⚠️ Unexpected error: {e}", exc_info=True)
+            self.release_data(recv_data)
             return None, False
 
 
-    def _recv_image_and_log_and_impath(self, client):
+    def _recv_image_and_log_and_impath(self, client, frame_index=None):
         """Receive an image and associated log data from a client.
 
         Args:
             client (socket.socket): The client socket to receive data from.
+            frame_index (int, optional): The frame_index if already read from the socket. Defaults to None.
 
         Returns:
             tuple: A tuple containing the received data (dict) and a success flag (bool).
@@ -291,18 +811,19 @@ class RemoteSocket:
 
         try:
             # Receive the frame_index
-            recv_data['frame_index'] = self._recv_int(client)
+            recv_data['frame_index'] = frame_index if frame_index is not None else self._recv_int(client)
             logging.info(f"🎞️ Received frame index: {recv_data['frame_index']}")
 
+            laps = latency.tracker.laps()
             size = self._recv_int(client)
             logging.info(f"📏 Expected image size: {size} bytes")
+            laps.lap('recv_header')
 
             # Receive the image data
-            recv_data['image'] = self._recv_exact(client, size)
-
-            if recv_data['image'] is None or len(recv_data['image']) != size:
-                logging.error(f"❌ Failed to receive the complete image data. Received {len(recv_data['image'] or b'')} bytes out of {size}")
+            if not self._recv_image(client, size, recv_data):
+                logging.error(f"❌ Failed to receive the complete image data ({size} bytes)")
                 return recv_data, False
+            laps.lap('recv_image')
 
             logging.info(f"✅ Successfully received the complete image data. Total bytes: {len(recv_data['image'])}")
 
@@ -317,19 +838,37 @@ class RemoteSocket:
 
             # Read the remaining data for JSON log
             recv_data['log'] = self._recv_json(client)
+            laps.lap('recv_log')
             return recv_data, True
 
         except socket.error as e:
             logging.error(f"🔴 Socket error: {e}")
+            self.release_data(recv_data)
             return None, False
         except IOError as e:
             logging.error(f"🔴 I/O error: {e}")
+            self.release_data(recv_data)
             return None, False
         except Exception as e:
             logging.error(f"⚠️ Unexpected error: {e}", exc_info=True)
+            self.release_data(recv_data)
             return None, False
 
 
+    def _enqueue(self, recv_data):
+        """Timestamp a received frame, record it to the capture file and queue it.
+
+        Args:
+            recv_data (dict): The received data.
+        """
+        recv_data['recv_timestamp_us'] = int(time.time() * 1e6)
+        if self.capture:
+            self.capture.write(recv_data)
+        self.data_queue.put(recv_data)
+        if not self.received_any:
+            self.received_any = True
+            self.ready_event.set()
+
     def _signal_handler(self, signum, frame):
         """Handle interrupt signals to gracefully shut down the server.
 
@@ -339,9 +878,14 @@ class RemoteSocket:
         """
         print("\nReceived interrupt signal. Shutting down...")
         self.stop_thread = True
+        self.data_queue.close()
+        self.ready_event.set()  # Wake wait_ready()
         if self.server:
             self.server.close()
         if self.client:
             self.client.close()
+        with self.sessions_lock:
+            for client in self.sessions:
+                self._shutdown_client(client)
 
 
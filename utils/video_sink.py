@@ -0,0 +1,153 @@
+import os
+import cv2
+import time
+import queue
+import logging
+import threading
+import subprocess
+
+
+class VideoSink:
+    def __init__(self, save_dir, fps=15, codec='mp4v', backend='opencv', segment_seconds=0,
+                 queue_size=32, basename='result'):
+        """Write annotated frames straight into video files on a writer thread.
+
+        The writer is opened on the first frame, at its size; later frames of another size
+        are resized to it. With `segment_seconds`, a new file is started every time that
+        much video (frames / fps) was written.
+
+        Args:
+            save_dir (str): Directory of the video files.
+            fps (float, optional): Frame rate of the videos. Defaults to 15.
+            codec (str, optional): FourCC for the 'opencv' backend (e.g. 'mp4v', 'XVID'), encoder
+                name for the 'ffmpeg' backend (e.g. 'libx264'). Defaults to 'mp4v'.
+            backend (str, optional): 'opencv' for cv2.VideoWriter, 'ffmpeg' to pipe raw frames
+                to an ffmpeg process. Defaults to 'opencv'.
+            segment_seconds (float, optional): Video length of one file, 0 for a single file. Defaults to 0.
+            queue_size (int, optional): Frames waiting for the writer thread before write() blocks. Defaults to 32.
+            basename (str, optional): File name prefix. Defaults to 'result'.
+        """
+        if backend not in ('opencv', 'ffmpeg'):
+            raise ValueError(f"Unsupported video backend: {backend}")
+        self.save_dir = save_dir
+        self.fps = fps
+        self.codec = codec
+        self.backend = backend
+        self.segment_frames = int(segment_seconds * fps) if segment_seconds else 0
+        self.basename = basename
+        self.extension = 'avi' if backend == 'opencv' and codec.upper() in ('XVID', 'MJPG', 'DIVX') else 'mp4'
+
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.thread = None
+        self.lock = threading.Lock()
+        self.closed = False
+
+        # Current file
+        self.writer = None
+        self.process = None
+        self.size = None
+        self.segment_written = 0
+
+        # Statistics
+        self.frames = 0
+        self.files = []
+        self.errors = 0
+
+    def write(self, image, copy=True):
+        """Queue a frame for the writer thread, blocking while the queue is full.
+
+        Args:
+            image (numpy.ndarray): BGR frame.
+            copy (bool, optional): Copy the frame, needed when its buffer is reused after the
+                call (e.g. render pool slots). Defaults to True.
+        """
+        with self.lock:
+            if self.closed:
+                return
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._write_loop, name='VideoSink', daemon=True)
+                self.thread.start()
+        self.queue.put(image.copy() if copy else image)
+
+    def close(self):
+        """Write the queued frames and close the current file."""
+        with self.lock:
+            if self.closed:
+                return
+            self.closed = True
+            thread = self.thread
+        if thread is None:
+            return
+        self.queue.put(None)
+        thread.join()
+        logging.info(f"🎞️ Wrote {self.frames} frames to {len(self.files)} video file(s) in {self.save_dir}")
+
+    def stats(self):
+        """Get the sink counters.
+
+        Returns:
+            dict: Frames written, files, errors and queued frames.
+        """
+        return {'frames': self.frames, 'files': list(self.files), 'errors': self.errors, 'queued': self.queue.qsize()}
+
+    def _write_loop(self):
+        while True:
+            image = self.queue.get()
+            if image is None:
+                break
+            try:
+                self._write_frame(image)
+            except Exception as e:
+                self.errors += 1
+                logging.error(f"❌ Video write failed: {e}")
+                self._close_file()
+        self._close_file()
+
+    def _write_frame(self, image):
+        if self.size is None:
+            self.size = (image.shape[1], image.shape[0])
+        elif (image.shape[1], image.shape[0]) != self.size:
+            image = cv2.resize(image, self.size, interpolation=cv2.INTER_AREA)
+
+        if self.segment_frames and self.segment_written >= self.segment_frames:
+            self._close_file()
+        if self.writer is None and self.process is None:
+            self._open_file()
+
+        if self.process is not None:
+            self.process.stdin.write(image.tobytes())
+        else:
+            self.writer.write(image)
+        self.segment_written += 1
+        self.frames += 1
+
+    def _open_file(self):
+        os.makedirs(self.save_dir, exist_ok=True)
+        stamp = time.strftime('%Y%m%d_%H%M%S')
+        path = os.path.join(self.save_dir, f'{self.basename}_{stamp}_{len(self.files):03d}.{self.extension}')
+        width, height = self.size
+        if self.backend == 'ffmpeg':
+            command = ['ffmpeg', '-y', '-loglevel', 'error',
+                       '-f', 'rawvideo', '-pix_fmt', 'bgr24', '-s', f'{width}x{height}', '-r', str(self.fps), '-i', '-',
+                       '-c:v', self.codec, '-pix_fmt', 'yuv420p', path]
+            self.process = subprocess.Popen(command, stdin=subprocess.PIPE)
+        else:
+            self.writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*self.codec), self.fps, (width, height))
+            if not self.writer.isOpened():
+                self.writer = None
+                raise IOError(f"Cannot open video writer for {path} (codec {self.codec})")
+        self.files.append(path)
+        self.segment_written = 0
+        logging.info(f"🎞️ Writing annotated video to {path}")
+
+    def _close_file(self):
+        if self.process is not None:
+            try:
+                self.process.stdin.close()
+                self.process.wait()
+            except OSError as e:
+                logging.error(f"❌ ffmpeg did not finish cleanly: {e}")
+            self.process = None
+        if self.writer is not None:
+            self.writer.release()
+            self.writer = None